@@ -2,58 +2,199 @@
 """
 Flask backend for AI Interview Application
 Main application entry point
+
+create_app() builds the application. Importing this module is cheap: the
+route modules are imported when an app is created, the OpenAI SDK when the
+first client is built, and Alembic only for CLI commands. The database schema
+is managed by migrations (`flask --app app init-db`) instead of being created
+on import. Background threads are started per process with
+start_background_threads(), so a preloading server can fork workers first.
 """
 
 import os
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
-from flask_migrate import Migrate
+
+# Load environment variables from .env file (if available) before any
+# module reads its settings
+load_dotenv()
 
 # Import models and database
 from models.user import db
 from models import *
+from utils.db_config import configure_engine, engine_options
 
-# Import modules
-from routes.transcription import transcription_routes
-from routes.response_generation import response_routes
-from routes.text_to_speech import tts_routes
-from routes.auth import auth_routes
+# Create missing tables when the app is created, for local development
+AUTO_CREATE_SCHEMA = os.environ.get("AUTO_CREATE_SCHEMA", "false").lower() == "true"
+# Start job workers and maintenance threads when the app is created
+# (gunicorn.conf.py turns this off and starts them after forking instead)
+START_BACKGROUND_THREADS = os.environ.get("START_BACKGROUND_THREADS", "true").lower() == "true"
 
-# Load environment variables from .env file (if available)
-load_dotenv()
+def register_blueprints(app):
+    """Import the route modules and register their blueprints"""
+    from routes.transcription import transcription_routes
+    from routes.response_generation import response_routes
+    from routes.text_to_speech import tts_routes
+    from routes.auth import auth_routes
+    from routes.jobs import job_routes
+    from routes.interviews import interview_routes
+    from routes.metrics import metrics_routes
+    from routes.recordings import recording_routes
+    from routes.interview_turn import interview_turn_routes
+
+    # Register blueprints for different endpoint groups
+    app.register_blueprint(auth_routes)
+    app.register_blueprint(transcription_routes)
+    app.register_blueprint(response_routes)
+    app.register_blueprint(tts_routes)
+    app.register_blueprint(job_routes)
+    app.register_blueprint(interview_routes)
+    app.register_blueprint(metrics_routes)
+    app.register_blueprint(recording_routes)
+    app.register_blueprint(interview_turn_routes)
+
+def create_schema(app):
+    """Create missing tables without migrations (development only)"""
+    with app.app_context():
+        db.create_all()
+
+def start_background_threads(app):
+    """Start the job workers and maintenance threads for this process, once"""
+    from utils.job_queue import JOB_WORKERS, start_job_workers
+    from utils.metrics import start_metrics_flusher
+    from utils.question_audio import start_question_audio_scheduler
+    from utils.recording_store import start_recording_sweeper
+
+    # Run background jobs (interview scoring, question audio) off the request path
+    if JOB_WORKERS > 0:
+        start_job_workers(app)
+
+    # Remove abandoned uploads and expired recordings
+    start_recording_sweeper(app)
+
+    # Synthesize question audio ahead of upcoming interviews
+    start_question_audio_scheduler(app)
+
+    # Share this process's metrics with the other workers
+    start_metrics_flusher()
+
+def register_commands(app):
+    """Register the maintenance CLI commands"""
+
+    @app.cli.command("init-db")
+    def init_db():
+        """Create the database schema or upgrade it to the latest migration"""
+        from flask_migrate import stamp, upgrade
+        from sqlalchemy import inspect
+
+        inspector = inspect(db.engine)
+        if inspector.get_table_names() and not inspector.has_table("alembic_version"):
+            # Schema created by db.create_all() before migrations were applied
+            db.create_all()
+            stamp()
+            print("Existing schema completed and stamped with the latest migration")
+        else:
+            upgrade()
+
+    @app.cli.command("work-jobs")
+    def work_jobs():
+        """Run background job workers in the foreground"""
+        from utils.job_queue import JOB_WORKERS, start_job_workers
+        workers = start_job_workers(app, max(JOB_WORKERS, 1))
+        for worker in workers:
+            worker.join()
+
+    @app.cli.command("sweep-recordings")
+    def sweep_recordings_command():
+        """Remove abandoned recording uploads and expired recordings once"""
+        from utils.recording_store import sweep_recordings
+        print(f"Removed {sweep_recordings()} recordings")
+
+    @app.cli.command("prewarm-question-audio")
+    def prewarm_question_audio_command():
+        """Queue question audio warmup for upcoming interviews once"""
+        from utils.question_audio import schedule_question_audio
+        print(f"Queued question audio for {schedule_question_audio()} interviews")
+
+def create_app(config=None, start_background=None):
+    """Create and configure the Flask application"""
+    from werkzeug.exceptions import RequestEntityTooLarge
+    from utils.audio_upload import MAX_AUDIO_UPLOAD_BYTES
+    from utils.jwt_manager import CachingJWTManager
+    from utils import metrics
+    from utils.token_denylist import token_denylist
+
+    # Initialize Flask app
+    app = Flask(__name__)
+
+    # Configure database
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URI', 'sqlite:///app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Configure JWT
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'dev-secret-key')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 3600  # 1 hour
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = 2592000  # 30 days
+
+    # Reject oversized bodies before werkzeug parses or spools them
+    app.config['MAX_CONTENT_LENGTH'] = MAX_AUDIO_UPLOAD_BYTES
+
+    app.config.update(config or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    # Initialize extensions
+    db.init_app(app)
+    jwt = CachingJWTManager(app)
+
+    # Alembic is slow to import and only needed by `flask db ...` commands
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        """Reject tokens revoked by logout"""
+        return token_denylist.is_revoked(jwt_payload["jti"])
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(e):
+        return jsonify({"error": "Request body too large"}), 413
+
+    # Configure CORS to allow requests from any origin during development
+    CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-# Initialize Flask app
-app = Flask(__name__)
+    register_blueprints(app)
+    register_commands(app)
 
-# Configure database
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URI', 'sqlite:///app.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Time every request and count its database queries
+    metrics.init_app(app)
+    metrics.instrument_sqlalchemy()
 
-# Configure JWT
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'dev-secret-key')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 3600  # 1 hour
-app.config['JWT_REFRESH_TOKEN_EXPIRES'] = 2592000  # 30 days
+    # Creating the engine does not connect, so this is safe before forking
+    with app.app_context():
+        configure_engine(db.engine)
 
-# Initialize extensions
-db.init_app(app)
-migrate = Migrate(app, db)
-jwt = JWTManager(app)
+    if AUTO_CREATE_SCHEMA:
+        create_schema(app)
 
-# Configure CORS to allow requests from any origin during development
-CORS(app, resources={r"/api/*": {"origins": "*"}})
+    if start_background is None:
+        start_background = START_BACKGROUND_THREADS
+    if start_background:
+        start_background_threads(app)
 
-# Register blueprints for different endpoint groups
-app.register_blueprint(auth_routes)
-app.register_blueprint(transcription_routes)
-app.register_blueprint(response_routes)
-app.register_blueprint(tts_routes)
+    return app
 
-# Create tables on startup if they don't exist
-with app.app_context():
-    db.create_all()
+def __getattr__(name):
+    """Create the module-level app on first access (`flask --app app`, `app:app`)"""
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
+    app = create_app()
+    create_schema(app)
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=True)
@@ -0,0 +1,429 @@
+
+"""
+ASGI entry point for the AI Interview backend
+
+The OpenAI-bound routes are served by native async handlers built on the
+AsyncOpenAI client, so a single process can hold hundreds of upstream calls in
+flight instead of blocking one worker per call. Every other request (auth,
+streaming modes, stored conversations, multipart uploads, sessions) is passed
+through to the Flask app.
+
+Run with: uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import base64
+import io
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask_jwt_extended import decode_token
+from werkzeug.datastructures import MultiDict
+
+from app import create_app
+from routes.response_generation import CompletionOptionsError, build_completion_params, completion_flight_key
+from utils.metrics import observe_request
+from utils.audio_transcode import prepare_for_whisper
+from utils.vad import transcribe_with_vad
+from utils.audio_upload import (
+    AUDIO_SPOOL_BYTES, MAX_AUDIO_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES, audio_filename, query_options
+)
+from utils.openai_client import (
+    client_manager, get_async_openai_client, get_openai_client, is_api_key_configured, upstream_timeout
+)
+from utils.response_cache import cached_response_key, response_cache
+from utils.single_flight import coalesce_async
+from utils.question_audio import get_question_audio
+from utils.speech import synthesize_speech_async
+from utils.token_denylist import token_denylist
+from utils.upstream_scheduler import (
+    UpstreamBusyError, estimate_chat_tokens, limit_priority, resolve_priority, schedule_async
+)
+
+# Threads available to the Flask app for requests that are passed through
+ASGI_WSGI_THREADS = int(os.environ.get("ASGI_WSGI_THREADS", 64))
+
+class ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    """
+    WSGI request run on a thread pool. asgiref runs WSGI apps thread
+    sensitively, which puts every request on one shared thread.
+    """
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self.run_wsgi_app_sync, thread_sensitive=False, executor=self.executor)(body)
+
+    def run_wsgi_app_sync(self, body):
+        environ = self.build_environ(self.scope, body)
+        output_iter = self.wsgi_application(environ, self.start_response)
+        bytes_sent = 0
+        try:
+            for output in output_iter:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                # Never send more than the Content-Length the app declared
+                if self.response_content_length is not None:
+                    output = output[:self.response_content_length - bytes_sent]
+                self.sync_send({"type": "http.response.body", "body": output, "more_body": True})
+                bytes_sent += len(output)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            # WSGI requires close(); the metrics middleware records the request there
+            if hasattr(output_iter, "close"):
+                output_iter.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({"type": "http.response.body"})
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi adapter running each request on its own pool thread"""
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolWsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+flask_app = create_app()
+wsgi_executor = ThreadPoolExecutor(max_workers=ASGI_WSGI_THREADS, thread_name_prefix="wsgi")
+wsgi_app = ThreadPoolWsgiToAsgi(flask_app, wsgi_executor)
+
+# Largest JSON body buffered by the native handlers
+MAX_BODY_BYTES = flask_app.config.get("MAX_CONTENT_LENGTH") or MAX_AUDIO_UPLOAD_BYTES
+
+class HTTPError(Exception):
+    """Error returned to the client as a JSON response"""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+class AsyncRequest:
+    """Minimal view of an ASGI HTTP request"""
+
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.mimetype = self.headers.get("content-type", "").split(";")[0].strip().lower()
+        self.args = MultiDict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        self.body = None
+        self._authenticated = None
+
+    def _check_token(self):
+        header = self.headers.get("authorization", "")
+        if not header.startswith("Bearer "):
+            return False
+        try:
+            with flask_app.app_context():
+                claims = decode_token(header[len("Bearer "):])
+                return claims.get("type") == "access" and not token_denylist.is_revoked(claims["jti"])
+        except Exception:
+            return False
+
+    async def authenticated(self):
+        """
+        Whether the request carries a valid, unrevoked access token. Checked
+        off the event loop, since a denylist sync queries the database.
+        """
+        if self._authenticated is None:
+            self._authenticated = await asyncio.get_running_loop().run_in_executor(None, self._check_token)
+        return self._authenticated
+
+    @property
+    def content_length(self):
+        value = self.headers.get("content-length")
+        return int(value) if value and value.isdigit() else None
+
+    async def iter_body(self):
+        """Yield request body chunks as they arrive"""
+        while True:
+            message = await self.receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError("Client disconnected", 400)
+            yield message.get("body", b"")
+            if not message.get("more_body", False):
+                return
+
+    async def read(self, max_bytes=MAX_BODY_BYTES):
+        """Buffer the full request body so it can be replayed to Flask"""
+        if self.content_length is not None and self.content_length > max_bytes:
+            raise HTTPError("Request body too large", 413)
+        chunks = []
+        size = 0
+        # Chunked bodies carry no Content-Length, so count while reading
+        async for chunk in self.iter_body():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPError("Request body too large", 413)
+            chunks.append(chunk)
+        self.body = b"".join(chunks)
+        return self.body
+
+    async def json(self):
+        """JSON object body, or None for an empty body"""
+        body = await self.read()
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            raise HTTPError("Invalid JSON body", 400)
+        if data is not None and not isinstance(data, dict):
+            raise HTTPError("JSON body must be an object", 400)
+        return data
+
+    async def spool(self, max_bytes):
+        """Stream the request body into a spooled temporary file"""
+        spool = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPOOL_BYTES)
+        size = 0
+        try:
+            async for chunk in self.iter_body():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPError("Audio upload too large", 413)
+                spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool, size
+
+    def replay_receive(self):
+        """Receive callable that hands the buffered body to the Flask app"""
+        body = self.body
+        
+        async def receive():
+            nonlocal body
+            if body is not None:
+                message = {"type": "http.request", "body": body, "more_body": False}
+                body = None
+                return message
+            return await self.receive()
+        
+        return receive
+
+def request_options(data):
+    """The options object of a JSON body"""
+    options = (data or {}).get("options", {})
+    if not isinstance(options, dict):
+        raise HTTPError("options must be an object", 400)
+    return options
+
+def get_client():
+    """Get the async OpenAI client or raise the matching HTTP error"""
+    if not is_api_key_configured():
+        raise HTTPError("OpenAI API key not configured", 401)
+    
+    client = get_async_openai_client()
+    if not client:
+        raise HTTPError("OpenAI client initialization failed", 500)
+    return client
+
+async def transcribe_audio(request):
+    """Transcribe audio using OpenAI Whisper API"""
+    
+    # Multipart uploads are parsed by werkzeug in the Flask app
+    if request.mimetype == "multipart/form-data":
+        return None
+    
+    client = get_client()
+    
+    if request.content_length is not None and request.content_length > MAX_AUDIO_UPLOAD_BYTES:
+        raise HTTPError("Audio upload too large", 413)
+    
+    if request.mimetype.startswith("audio/") or request.mimetype.startswith("video/"):
+        audio, size = await request.spool(MAX_AUDIO_UPLOAD_BYTES)
+        if size == 0:
+            audio.close()
+            raise HTTPError("Missing audio data", 400)
+        audio_file = (audio_filename(request.mimetype), audio, request.mimetype)
+        options = query_options(request.args)
+    else:
+        data = await request.json()
+        if not data or "audio_data" not in data:
+            raise HTTPError("Missing audio data", 400)
+        try:
+            audio_bytes = base64.b64decode(data["audio_data"])
+        except ValueError:
+            raise HTTPError("Invalid base64 audio data", 400)
+        mime_type = data.get("mime_type", "")
+        options = request_options(data)
+        audio_file = (audio_filename(mime_type), io.BytesIO(audio_bytes), mime_type or None)
+    
+    try:
+        loop = asyncio.get_running_loop()
+        priority = resolve_priority(options.get("priority"), await request.authenticated())
+        
+        # Segmented transcription uses the sync client on its own thread pool
+        segmented = await loop.run_in_executor(
+            None, transcribe_with_vad, get_openai_client(), audio_file, options, priority
+        )
+        if segmented is not None:
+            return segmented
+        
+        # ffmpeg runs in a subprocess; wait for it off the event loop
+        audio_file = await loop.run_in_executor(None, prepare_for_whisper, audio_file, options)
+        
+        response = await schedule_async(
+            lambda: client.audio.transcriptions.create(
+                file=audio_file,
+                model="whisper-1",
+                language=options.get("language"),
+                prompt=options.get("prompt"),
+                temperature=options.get("temperature", 0.2),
+                timeout=upstream_timeout("transcription")
+            ),
+            "whisper-1", priority=priority
+        )
+        return {"text": response.text}
+    finally:
+        audio_file[1].close()
+
+async def generate_response(request):
+    """Generate AI response using OpenAI GPT"""
+    
+    data = await request.json()
+    options = request_options(data)
+    
+    # Streaming mode and stored conversations (which need the caller's
+    # identity) are served by the Flask app
+    if data and (options.get("stream") or data.get("conversationId")):
+        return None
+    
+    client = get_client()
+    
+    if not data or "transcript" not in data:
+        raise HTTPError("Missing transcript", 400)
+    
+    try:
+        params = build_completion_params(data)
+    except CompletionOptionsError as e:
+        raise HTTPError(str(e), 400)
+    
+    cache_key = cached_response_key(params, options)
+    if cache_key:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return {"response": cached, "cached": True}
+    
+    priority = resolve_priority(options.get("priority"), await request.authenticated())
+    
+    async def fetch():
+        response = await schedule_async(
+            lambda: client.chat.completions.create(**params),
+            params["model"], estimate_chat_tokens(params), priority
+        )
+        return response.choices[0].message.content
+    
+    response_text = await coalesce_async(completion_flight_key(params), fetch)
+    
+    if cache_key:
+        response_cache.set(cache_key, response_text)
+    return {"response": response_text}
+
+async def text_to_speech(request):
+    """Convert text to speech using OpenAI TTS API"""
+    
+    data = await request.json()
+    options = request_options(data)
+    
+    # Streaming mode is served by the Flask app
+    if options.get("stream"):
+        return None
+    
+    client = get_client()
+    
+    if not data or "text" not in data:
+        raise HTTPError("Missing text", 400)
+    
+    options = limit_priority(options, await request.authenticated())
+    
+    # Question audio synthesized ahead of a scheduled interview
+    if data.get("interviewId"):
+        prewarmed = get_question_audio(data["interviewId"], data["text"], options)
+        if prewarmed is not None:
+            return {"audio_data": base64.b64encode(prewarmed).decode("utf-8"), "prewarmed": True}
+    
+    audio = await synthesize_speech_async(client, data["text"], options)
+    return {"audio_data": base64.b64encode(audio).decode("utf-8")}
+
+# Routes served natively; anything else goes to the Flask app
+ASYNC_ROUTES = {
+    "/api/transcribe": transcribe_audio,
+    "/api/generate-response": generate_response,
+    "/api/text-to-speech": text_to_speech
+}
+
+async def send_json(send, status, payload, headers=None):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            # Match the CORS policy the Flask app applies to /api/*
+            (b"access-control-allow-origin", b"*")
+        ] + [(k.encode("latin-1"), v.encode("latin-1")) for k, v in (headers or {}).items()]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            for client in client_manager.clients_for_shutdown():
+                await client.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    
+    handler = ASYNC_ROUTES.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+    if handler is None:
+        return await wsgi_app(scope, receive, send)
+    
+    request = AsyncRequest(scope, receive)
+    start = time.perf_counter()
+    status, headers = 200, None
+    try:
+        payload = await handler(request)
+    except HTTPError as e:
+        payload, status = {"error": str(e)}, e.status_code
+    except UpstreamBusyError as e:
+        payload, status, headers = {"error": str(e)}, 429, {"retry-after": str(math.ceil(e.retry_after))}
+    except Exception as e:
+        print(f"Async {scope['path']} error: {str(e)}")
+        payload, status = {"error": str(e)}, 500
+    
+    # Passed-through requests are recorded by the Flask metrics middleware
+    if payload is None:
+        return await wsgi_app(scope, request.replay_receive(), send)
+    
+    response_bytes = 0
+    
+    async def send_counted(message):
+        nonlocal response_bytes
+        response_bytes += len(message.get("body", b""))
+        await send(message)
+    
+    await send_json(send_counted, status, payload, headers)
+    observe_request(scope["method"], scope["path"], status, time.perf_counter() - start,
+                    request.content_length or len(request.body or b""), response_bytes)
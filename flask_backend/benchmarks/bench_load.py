@@ -0,0 +1,265 @@
+
+"""
+Load test for interview turns and login bursts
+
+Drives the backend over HTTP with concurrent clients and reports throughput
+and p50/p95/p99 latency per endpoint. Without --url the backend is started in
+this process on a threaded WSGI server, backed by the fake OpenAI server from
+fake_openai.py, so runs are repeatable and cost nothing.
+
+Scenarios:
+    interview-turn         transcribe -> generate-response -> text-to-speech
+    interview-turn-stream  the same with streamed responses, timing first sentence and first audio byte
+    interview-turn-combined  one POST /api/interview-turn, timing first audio
+    login-burst            POST /api/auth/login
+
+Usage (from flask_backend/):
+    python benchmarks/bench_load.py --scenario interview-turn --concurrency 16 --duration 30 --output before.json
+    python benchmarks/bench_load.py --scenario interview-turn --concurrency 16 --duration 30 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai import add_arguments, base_url, config_from_args, start_fake_openai
+from report import build_report, compare_reports, print_report
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "correct horse battery staple"
+
+ANSWERS = [
+    "In my last role I owned the on-call rotation and cut our pager volume in half.",
+    "I usually start by writing down what done looks like and who needs to sign off.",
+    "We had two weeks to ship, so I split the work into slices we could demo every other day.",
+    "I disagreed with the design at first, but after a spike we agreed on a simpler queue."
+]
+
+class Recorder:
+    """Thread-safe latency and error collection per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = {}
+
+    def record(self, name, seconds, ok=True):
+        with self.lock:
+            entry = self.results.setdefault(name, {"latencies": [], "errors": 0})
+            if ok:
+                entry["latencies"].append(seconds)
+            else:
+                entry["errors"] += 1
+
+    def timed(self, name, fn):
+        """Time fn(), recording status >= 400 or exceptions as errors"""
+        start = time.perf_counter()
+        try:
+            response = fn()
+        except httpx.HTTPError:
+            self.record(name, 0, ok=False)
+            return None
+        self.record(name, time.perf_counter() - start, response.status_code < 400)
+        return response
+
+def interview_turn(client, recorder, audio, iteration, worker_id, stream=False):
+    """One candidate answer: transcribe it, generate a reply and synthesize it"""
+    start = time.perf_counter()
+
+    response = recorder.timed("POST /api/transcribe", lambda: client.post(
+        "/api/transcribe", content=audio, headers={"Content-Type": "audio/webm"}))
+    if response is None or response.status_code >= 400:
+        return
+    transcript = f"{response.json()['text']} {ANSWERS[iteration % len(ANSWERS)]} ({iteration})"
+    payload = {"transcript": transcript, "currentQuestion": "Tell me about a hard deadline.",
+               "conversationId": f"bench-{worker_id}"}
+
+    if not stream:
+        response = recorder.timed("POST /api/generate-response", lambda: client.post(
+            "/api/generate-response", json=payload))
+        if response is None or response.status_code >= 400:
+            return
+        reply = response.json()["response"]
+        response = recorder.timed("POST /api/text-to-speech", lambda: client.post(
+            "/api/text-to-speech", json={"text": reply}))
+        if response is not None and response.status_code < 400:
+            recorder.record("turn interview-turn", time.perf_counter() - start)
+        return
+
+    # Streamed reply: time to the first complete sentence, then the whole reply
+    payload["options"] = {"stream": True}
+    request_start = time.perf_counter()
+    reply = None
+    with client.stream("POST", "/api/generate-response", json=payload) as response:
+        if response.status_code >= 400:
+            recorder.record("POST /api/generate-response (stream)", 0, ok=False)
+            return
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "sentence" and reply is None:
+                recorder.record("first sentence generate-response", time.perf_counter() - request_start)
+                reply = ""
+            elif line.startswith("data: ") and event == "done":
+                reply = json.loads(line[6:])["response"]
+    recorder.record("POST /api/generate-response (stream)", time.perf_counter() - request_start)
+
+    request_start = time.perf_counter()
+    first_byte = None
+    with client.stream("POST", "/api/text-to-speech", json={"text": reply, "options": {"stream": True}}) as response:
+        if response.status_code >= 400:
+            recorder.record("POST /api/text-to-speech (stream)", 0, ok=False)
+            return
+        for _ in response.iter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter() - request_start
+    recorder.record("first byte text-to-speech", first_byte or 0)
+    recorder.record("POST /api/text-to-speech (stream)", time.perf_counter() - request_start)
+    recorder.record("turn interview-turn-stream", time.perf_counter() - start)
+
+def combined_turn(client, recorder, audio, iteration, worker_id):
+    """One candidate answer through the single-request turn endpoint"""
+    start = time.perf_counter()
+    first_audio = None
+    params = {"currentQuestion": "Tell me about a hard deadline.", "conversationId": f"bench-{worker_id}"}
+    
+    with client.stream("POST", "/api/interview-turn", content=audio, params=params,
+                       headers={"Content-Type": "audio/webm"}) as response:
+        if response.status_code >= 400:
+            recorder.record("POST /api/interview-turn", 0, ok=False)
+            return
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+                if event == "audio" and first_audio is None:
+                    first_audio = time.perf_counter() - start
+                elif event == "error":
+                    recorder.record("POST /api/interview-turn", 0, ok=False)
+                    return
+    recorder.record("first audio interview-turn", first_audio or 0)
+    recorder.record("POST /api/interview-turn", time.perf_counter() - start)
+
+def login(client, recorder, email, password):
+    recorder.timed("POST /api/auth/login", lambda: client.post(
+        "/api/auth/login", json={"email": email, "password": password}))
+
+def start_local_backend(args):
+    """Start the fake OpenAI server and the Flask app in this process"""
+    fake = start_fake_openai(0, config_from_args(args))
+
+    # Settings are read from the environment when the app is imported
+    db_dir = tempfile.mkdtemp()
+    os.environ.update({
+        "OPENAI_BASE_URL": base_url(fake),
+        "OPENAI_API_KEY": "bench",
+        "DATABASE_URI": f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        "JOB_WORKERS": "0",
+        "AUTO_CREATE_SCHEMA": "true"
+    })
+    if not args.audio:
+        # Synthetic audio can't be decoded, so skip ffmpeg preprocessing
+        os.environ.setdefault("AUDIO_TRANSCODE_ENABLED", "false")
+        os.environ.setdefault("VAD_ENABLED", "false")
+    if not args.cache:
+        os.environ.setdefault("TTS_CACHE_ENABLED", "false")
+        os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import app
+    from models.candidate import Candidate
+    from models.user import db
+
+    with app.app_context():
+        user = Candidate(email=BENCH_EMAIL, first_name="Bench", last_name="User")
+        user.set_password(BENCH_PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", fake
+
+def run(args, url):
+    recorder = Recorder()
+    audio = open(args.audio, "rb").read() if args.audio else os.urandom(args.audio_bytes)
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    def worker(worker_id):
+        with httpx.Client(base_url=url, timeout=args.timeout) as client:
+            if args.scenario != "login-burst":
+                # Turns keep their history in a stored conversation, which needs a token
+                response = client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+                if response.status_code < 400:
+                    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+            iteration = 0
+            while (deadline is None and iteration < args.iterations) or (deadline and time.monotonic() < deadline):
+                if args.scenario == "login-burst":
+                    login(client, recorder, args.email, args.password)
+                elif args.scenario == "interview-turn-combined":
+                    combined_turn(client, recorder, audio, iteration, worker_id)
+                else:
+                    interview_turn(client, recorder, audio, iteration, worker_id,
+                                   stream=args.scenario == "interview-turn-stream")
+                iteration += 1
+
+    threads = [threading.Thread(target=worker, args=(f"{i}-{uuid.uuid4().hex[:6]}",)) for i in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.results, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="interview-turn",
+                        choices=["interview-turn", "interview-turn-stream", "interview-turn-combined", "login-burst"])
+    parser.add_argument("--url", help="benchmark a running backend instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=10, help="iterations per client when --duration is not set")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--audio", help="recording to upload (defaults to random bytes)")
+    parser.add_argument("--audio-bytes", type=int, default=100000)
+    parser.add_argument("--email", default=BENCH_EMAIL)
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--cache", action="store_true", help="keep TTS and response caches enabled")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="compare against an earlier JSON report")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    url, fake = (args.url, None) if args.url else start_local_backend(args)
+    results, elapsed = run(args, url)
+
+    meta = {"scenario": args.scenario, "concurrency": args.concurrency, "url": args.url or "local",
+            "fake_openai": vars(config_from_args(args)) if fake else None}
+    if fake:
+        meta["upstream_requests"] = dict(fake.RequestHandlerClass.counts)
+    report = build_report(results, elapsed, meta)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+
+"""
+Microbenchmark for password hashing and login throughput
+
+Measures raw verify speed per core for each hasher, then drives
+/api/auth/login with concurrent clients through the Flask test client while
+timing a cheap endpoint alongside, to show how a login burst affects other
+requests in the same process.
+
+Usage (from flask_backend/):
+    python benchmarks/bench_password_hashing.py --hasher bcrypt --rounds 12 --threads 8 --logins 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def bench_verify(hasher, iterations):
+    """Single-threaded verify rate, i.e. logins per second per core"""
+    password_hash = hasher.hash("correct horse battery staple")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        hasher.verify("correct horse battery staple", password_hash)
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+def bench_login(app, email, password, threads, logins):
+    """Concurrent logins plus a probe of a cheap endpoint running alongside"""
+    remaining = [logins]
+    lock = threading.Lock()
+    login_latencies = []
+    probe_latencies = []
+    done = threading.Event()
+
+    def login_worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            response = client.post("/api/auth/login", json={"email": email, "password": password})
+            login_latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.get_json()
+
+    def probe_worker():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/api/health")
+            probe_latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    probe = threading.Thread(target=probe_worker)
+    probe.start()
+    workers = [threading.Thread(target=login_worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+    return elapsed, login_latencies, probe_latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hasher", default="bcrypt", choices=["bcrypt", "werkzeug"])
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--method", default="scrypt", help="werkzeug hash method")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (0 hashes inline)")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent login clients")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--verify-iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    # Hasher settings are read from the environment at import time
+    db_dir = tempfile.mkdtemp()
+    os.environ["PASSWORD_HASHER"] = args.hasher
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["WERKZEUG_HASH_METHOD"] = args.method
+    os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ["AUTO_CREATE_SCHEMA"] = "true"
+    if args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+    from utils import password_hasher
+    from app import app
+    from models.candidate import Candidate
+    from models.user import db
+
+    cores = os.cpu_count() or 1
+    print(f"Hasher: {args.hasher} ({'rounds=%d' % args.rounds if args.hasher == 'bcrypt' else args.method})")
+    print(f"CPU cores: {cores}, hashing processes: {password_hasher.PASSWORD_HASH_WORKERS}")
+
+    for name, hasher in (("bcrypt", password_hasher.BcryptHasher(args.rounds)),
+                         ("werkzeug", password_hasher.WerkzeugHasher(args.method))):
+        rate = bench_verify(hasher, args.verify_iterations)
+        print(f"  {name:<9} verify: {rate:8.1f} checks/s per core")
+
+    email, password = "bench@example.com", "correct horse battery staple"
+    with app.app_context():
+        user = Candidate(email=email, first_name="Bench", last_name="User")
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+    elapsed, logins, probes = bench_login(app, email, password, args.threads, args.logins)
+    throughput = len(logins) / elapsed
+    busy_cores = min(cores, password_hasher.PASSWORD_HASH_WORKERS or cores)
+    print(f"Login: {len(logins)} logins in {elapsed:.2f}s with {args.threads} clients")
+    print(f"  throughput: {throughput:.1f} logins/s, {throughput / busy_cores:.1f} logins/s per hashing core")
+    print(f"  latency:    p50 {percentile(logins, 0.5) * 1000:.1f} ms, p95 {percentile(logins, 0.95) * 1000:.1f} ms")
+    if probes:
+        print(f"/api/health during burst: p50 {percentile(probes, 0.5) * 1000:.1f} ms, "
+              f"p95 {percentile(probes, 0.95) * 1000:.1f} ms, mean {statistics.mean(probes) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+
+"""
+Local stand-in for the OpenAI API used by the benchmarks
+
+Serves the three endpoints the backend calls (chat completions, with and
+without streaming, speech and transcriptions) with configurable latency, token
+pacing and a share of 429 responses. Point the backend at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any OPENAI_API_KEY.
+
+Usage (from flask_backend/):
+    python benchmarks/fake_openai.py --port 8100 --chat-latency 0.4 --token-interval 0.02 --rate-limit 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = ("That's a good example of working under pressure. How did you decide which "
+         "tasks to drop when the deadline moved? Let's move on to the next question.")
+
+class FakeConfig:
+    """Latency and error behavior of the fake server"""
+
+    def __init__(self, chat_latency=0.3, token_interval=0.02, speech_latency=0.3,
+                 transcription_latency=0.8, jitter=0.2, rate_limit=0.0, retry_after=1.0,
+                 speech_bytes_per_char=200):
+        self.chat_latency = chat_latency
+        self.token_interval = token_interval
+        self.speech_latency = speech_latency
+        self.transcription_latency = transcription_latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.speech_bytes_per_char = speech_bytes_per_char
+
+    def delay(self, seconds):
+        """Sleep for a latency with +/- jitter applied"""
+        if seconds > 0:
+            time.sleep(seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = FakeConfig()
+    counts = {}
+    counts_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, key):
+        with self.counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?")[0]
+        self._count(path)
+
+        if random.random() < self.config.rate_limit:
+            self._count("429")
+            return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                   {"Retry-After": str(self.config.retry_after)})
+
+        if path.endswith("/chat/completions"):
+            return self._chat(json.loads(body or b"{}"))
+        if path.endswith("/audio/speech"):
+            return self._speech(json.loads(body or b"{}"))
+        if path.endswith("/audio/transcriptions"):
+            return self._transcription(body)
+        self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    def _chat(self, request):
+        model = request.get("model", "gpt-4o-mini")
+        self.config.delay(self.config.chat_latency)
+
+        if not request.get("stream"):
+            return self._send_json(200, {
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140}
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in REPLY.split(" "):
+            chunk = {
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.config.delay(self.config.token_interval)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _speech(self, request):
+        self.config.delay(self.config.speech_latency)
+        audio = os.urandom(max(1, len(request.get("input", "")) * self.config.speech_bytes_per_char))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+    def _transcription(self, body):
+        # Scale latency with upload size, as Whisper does with audio length
+        self.config.delay(self.config.transcription_latency * max(1.0, len(body) / 1000000))
+        text = "I led the migration of our billing service and kept the release on schedule."
+        if b'name="response_format"\r\n\r\nverbose_json' in body:
+            return self._send_json(200, {
+                "text": text, "language": "english", "duration": 5.0,
+                "segments": [{"id": 0, "seek": 0, "start": 0.0, "end": 5.0, "text": text, "tokens": [],
+                              "temperature": 0.0, "avg_logprob": -0.2, "compression_ratio": 1.2,
+                              "no_speech_prob": 0.01}]
+            })
+        self._send_json(200, {"text": text})
+
+def start_fake_openai(port=0, config=None):
+    """Start the fake server on a background thread and return it"""
+    handler = type("ConfiguredHandler", (FakeOpenAIHandler,), {"config": config or FakeConfig(), "counts": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def add_arguments(parser):
+    """Fake server options shared with the load benchmark"""
+    parser.add_argument("--chat-latency", type=float, default=0.3, help="seconds before the first chat token")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="seconds between streamed tokens")
+    parser.add_argument("--speech-latency", type=float, default=0.3)
+    parser.add_argument("--transcription-latency", type=float, default=0.8, help="seconds per MB of audio (min 1 MB)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="relative latency jitter")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+
+def config_from_args(args):
+    return FakeConfig(
+        chat_latency=args.chat_latency, token_interval=args.token_interval,
+        speech_latency=args.speech_latency, transcription_latency=args.transcription_latency,
+        jitter=args.jitter, rate_limit=args.rate_limit, retry_after=args.retry_after
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_fake_openai(args.port, config_from_args(args))
+    print(f"Fake OpenAI API listening on {base_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+
+"""
+Latency reports for the benchmarks
+
+Reports are JSON files with per-endpoint throughput and p50/p95/p99 latency,
+tagged with the git commit they were measured on, so runs can be compared
+across commits.
+
+Usage (from flask_backend/):
+    python benchmarks/report.py baseline.json current.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (in milliseconds) of one endpoint"""
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def build_report(results, elapsed, meta):
+    """Assemble a report from {name: {"latencies": [...], "errors": n}}"""
+    return {
+        "meta": dict(meta, commit=git_commit(), timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                     elapsed_s=round(elapsed, 2)),
+        "endpoints": {name: summarize(data["latencies"], data["errors"], elapsed)
+                      for name, data in sorted(results.items())}
+    }
+
+def print_report(report):
+    meta = report["meta"]
+    print(f"Commit {meta.get('commit') or 'unknown'}, {meta.get('scenario')} "
+          f"x{meta.get('concurrency')} for {meta['elapsed_s']}s")
+    print(f"{'endpoint':<38} {'count':>6} {'err':>4} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, stats in report["endpoints"].items():
+        print(f"{name:<38} {stats['count']:>6} {stats['errors']:>4} {stats['throughput_rps']:>7.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+
+def compare_reports(baseline, current):
+    """Print latency and throughput changes between two reports"""
+    print(f"Baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}")
+    print(f"{'endpoint':<38} {'metric':>8} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<38} (new)")
+            continue
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before[metric], stats[metric]
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"{name:<38} {metric.replace('_ms', '').replace('throughput_', ''):>8} {old:>10.1f} {new:>10.1f} {change:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    compare_reports(baseline, current)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+
+"""
+Gunicorn settings for the Flask app
+
+Run from flask_backend/ with: gunicorn app:app
+
+The app is imported once in the master (preload_app) and workers are forked
+from it, so they start serving immediately and share the imported modules'
+memory. Threads don't survive fork, so the job workers and maintenance
+threads are started in each worker after it is forked, and database
+connections are never inherited from the master.
+"""
+
+import gc
+import os
+
+# Threads started in the master would be lost in the forked workers
+os.environ["START_BACKGROUND_THREADS"] = "false"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("GUNICORN_WORKERS", max((os.cpu_count() or 1) * 2, 2)))
+# Threads let a worker keep serving while others wait on OpenAI or stream responses
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# Per-process pools (password hashing) are sized by the number of workers
+os.environ["WEB_WORKER_PROCESSES"] = str(workers)
+preload_app = True
+
+# Imported lazily by the app, but worth sharing between workers
+PRELOAD_MODULES = ("openai",)
+
+def on_starting(server):
+    # Counts from a previous run would be added to this one's
+    from utils.metrics import clear_snapshots
+    clear_snapshots()
+
+def when_ready(server):
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+    
+    # Move everything imported so far out of the collector's reach, so the
+    # first collection in a worker doesn't touch (and copy) the shared pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    from app import app, start_background_threads
+    from models.user import db
+    
+    with app.app_context():
+        # Drop any pooled connections the master may hold without closing them
+        db.engine.dispose(close=False)
+    
+    start_background_threads(app)
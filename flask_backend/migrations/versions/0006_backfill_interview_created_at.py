@@ -0,0 +1,35 @@
+"""backfill interview created_at
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:02:47.316402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination orders by (created_at, id), which a NULL can't take part in
+    op.execute(
+        "UPDATE interviews SET created_at = COALESCE(scheduled_at, completed_at, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               nullable=True)
@@ -4,3 +4,7 @@ from .user import User
 from .candidate import Candidate
 from .employer import Employer
 from .interview import Interview
+from .job import Job
+from .revoked_token import RevokedToken
+from .recording import Recording
+from .conversation import StoredConversation
@@ -0,0 +1,25 @@
+import json
+from datetime import datetime
+from .user import db
+
+class StoredConversation(db.Model):
+    """Server-side history of one user's conversation for generate-response"""
+    __tablename__ = 'conversations'
+    __table_args__ = (db.UniqueConstraint('owner_id', 'conversation_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    conversation_id = db.Column(db.String(128), nullable=False)
+    memo = db.Column(db.Text, nullable=False, default='')
+    turns = db.Column(db.Text, nullable=False, default='[]') # JSON list of chat messages
+    summaries = db.Column(db.Integer, nullable=False, default=0)
+    summary_started_at = db.Column(db.DateTime) # set while a summary is running
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    @property
+    def turns_data(self):
+        return json.loads(self.turns or '[]')
+    
+    def __repr__(self):
+        return f'<StoredConversation {self.owner_id}:{self.conversation_id}>'
@@ -13,7 +13,7 @@ class Interview(db.Model):
     recording_url = db.Column(db.String(255))
     score = db.Column(db.Float)
     feedback = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     scheduled_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     
@@ -25,6 +25,14 @@ class Interview(db.Model):
     candidate = db.relationship('Candidate', back_populates='interviews')
     employer = db.relationship('Employer', back_populates='interviews')
     
+    # Composite indexes backing keyset pagination of the listing endpoints
+    __table_args__ = (
+        db.Index('ix_interviews_employer_created', 'employer_id', 'created_at', 'id'),
+        db.Index('ix_interviews_employer_status_created', 'employer_id', 'status', 'created_at', 'id'),
+        db.Index('ix_interviews_candidate_created', 'candidate_id', 'created_at', 'id'),
+        db.Index('ix_interviews_candidate_status_created', 'candidate_id', 'status', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         """Convert interview object to dictionary"""
         return {
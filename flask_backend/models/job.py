@@ -0,0 +1,57 @@
+
+import json
+from datetime import datetime
+from .user import db
+
+class Job(db.Model):
+    """Background job stored in the database so it survives restarts"""
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, succeeded, failed
+    idempotency_key = db.Column(db.String(255), unique=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    progress = db.Column(db.Text) # JSON checkpoint so retries can skip finished steps
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+    
+    @property
+    def payload_data(self):
+        """Decoded job payload"""
+        return json.loads(self.payload or '{}')
+    
+    @property
+    def progress_data(self):
+        """Decoded progress checkpoint"""
+        return json.loads(self.progress or '{}')
+    
+    def to_dict(self):
+        """Convert job object to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.payload_data,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
@@ -0,0 +1,41 @@
+
+from datetime import datetime
+from .user import db
+
+class Recording(db.Model):
+    """Interview recording uploaded in chunks and stored on disk by content hash"""
+    __tablename__ = 'recordings'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    upload_id = db.Column(db.String(36), unique=True, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='uploading') # uploading, complete
+    content_type = db.Column(db.String(100), nullable=False, default='video/webm')
+    expected_size = db.Column(db.BigInteger)
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    sha256 = db.Column(db.String(64), index=True) # set once the upload is complete
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.id'))
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    
+    @property
+    def url(self):
+        """Backend URL the recording is played back from"""
+        return f"/api/recordings/{self.id}"
+    
+    def to_dict(self):
+        """Convert recording object to dictionary"""
+        return {
+            'id': self.id,
+            'upload_id': self.upload_id,
+            'status': self.status,
+            'content_type': self.content_type,
+            'expected_size': self.expected_size,
+            'size': self.size,
+            'sha256': self.sha256,
+            'interview_id': self.interview_id,
+            'url': self.url if self.status == 'complete' else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
@@ -0,0 +1,17 @@
+
+from datetime import datetime
+from .user import db
+
+class RevokedToken(db.Model):
+    """JWT that was revoked before its expiry (e.g. on logout)"""
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False, default='access')
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
@@ -1,7 +1,8 @@
 
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import with_polymorphic
+from utils.password_hasher import hash_password, needs_rehash, verify_password
 
 # Initialize SQLAlchemy instance
 db = SQLAlchemy()
@@ -24,13 +25,34 @@ class User(db.Model):
         'polymorphic_identity': 'user'
     }
     
+    @classmethod
+    def _polymorphic(cls):
+        """User entity joined to every subclass table"""
+        return with_polymorphic(cls, '*')
+    
+    @classmethod
+    def find_by_email(cls, email):
+        """Find a user by email, loading subclass columns in the same query"""
+        user = cls._polymorphic()
+        return db.session.execute(db.select(user).where(user.email == email)).scalar_one_or_none()
+    
+    @classmethod
+    def find_by_id(cls, user_id):
+        """Find a user by id, loading subclass columns in the same query"""
+        user = cls._polymorphic()
+        return db.session.execute(db.select(user).where(user.id == user_id)).scalar_one_or_none()
+    
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
         
     def check_password(self, password):
         """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        """Whether the stored hash uses outdated hasher settings"""
+        return needs_rehash(self.password_hash)
         
     def to_dict(self):
         """Convert user object to dictionary"""
@@ -8,7 +8,7 @@ import datetime
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, 
-    jwt_required, get_jwt_identity, get_jwt
+    jwt_required, get_jwt_identity, get_jwt, decode_token
 )
 from werkzeug.security import generate_password_hash
 from email_validator import validate_email, EmailNotValidError
@@ -16,11 +16,22 @@ from email_validator import validate_email, EmailNotValidError
 from models.user import User, db
 from models.candidate import Candidate
 from models.employer import Employer
-from utils.openai_client import set_api_key, is_api_key_configured
+from utils.cache import LRUCache
+from utils.password_hasher import PasswordHashBusyError
+from utils.openai_client import set_api_key, is_api_key_configured, upstream_timeout
+from utils.response_cache import get_response_cache_stats
+from utils.single_flight import get_single_flight_stats
+from utils.token_denylist import token_denylist, get_token_denylist_stats
+from utils.tts_cache import get_tts_cache_stats
+from utils.upstream_scheduler import get_scheduler_stats
 
 # Create blueprint for auth routes
 auth_routes = Blueprint('auth', __name__)
 
+# Short-lived cache of serialized profiles for /api/auth/me
+AUTH_PROFILE_CACHE_TTL = int(os.environ.get("AUTH_PROFILE_CACHE_TTL", 30))
+profile_cache = LRUCache(max_entries=10000, ttl=AUTH_PROFILE_CACHE_TTL)
+
 @auth_routes.route("/api/set-api-key", methods=["POST"])
 def set_api_key_route():
     """Set the OpenAI API key"""
@@ -38,7 +49,8 @@ def set_api_key_route():
         response = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Test"}],
-            max_tokens=5
+            max_tokens=5,
+            timeout=upstream_timeout("chat")
         )
         return jsonify({"status": "ok", "message": "API key set successfully"})
     except Exception as e:
@@ -47,11 +59,25 @@ def set_api_key_route():
 @auth_routes.route("/api/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
+    # Borrow a pooled connection and always return it
+    try:
+        with db.engine.connect() as connection:
+            database_connected = db.engine.dialect.has_table(connection, 'users')
+    except Exception as e:
+        print(f"Health check database error: {str(e)}")
+        database_connected = False
+    
     health_status = {
         "status": "ok", 
         "message": "Backend is running",
         "api_key_configured": is_api_key_configured(),
-        "database_connected": db.engine.dialect.has_table(db.engine.connect(), 'users')
+        "database_connected": database_connected,
+        "tts_cache": get_tts_cache_stats(),
+        "response_cache": get_response_cache_stats(),
+        "single_flight": get_single_flight_stats(),
+        "upstream_scheduler": get_scheduler_stats(),
+        "token_denylist": get_token_denylist_stats(),
+        "jwt_verify_cache": current_app.extensions["flask-jwt-extended"].verify_cache_stats()
     }
     
     return jsonify(health_status)
@@ -92,8 +118,8 @@ def register_candidate():
         db.session.commit()
         
         # Generate tokens
-        access_token = create_access_token(identity=candidate.id)
-        refresh_token = create_refresh_token(identity=candidate.id)
+        access_token = create_access_token(identity=str(candidate.id))
+        refresh_token = create_refresh_token(identity=str(candidate.id))
         
         return jsonify({
             "message": "Candidate registered successfully",
@@ -102,6 +128,10 @@ def register_candidate():
             "refresh_token": refresh_token
         }), 201
         
+    except PasswordHashBusyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Registration failed: {str(e)}"}), 500
@@ -143,8 +173,8 @@ def register_employer():
         db.session.commit()
         
         # Generate tokens
-        access_token = create_access_token(identity=employer.id)
-        refresh_token = create_refresh_token(identity=employer.id)
+        access_token = create_access_token(identity=str(employer.id))
+        refresh_token = create_refresh_token(identity=str(employer.id))
         
         return jsonify({
             "message": "Employer registered successfully",
@@ -153,6 +183,10 @@ def register_employer():
             "refresh_token": refresh_token
         }), 201
         
+    except PasswordHashBusyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Registration failed: {str(e)}"}), 500
@@ -165,15 +199,24 @@ def login():
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({"error": "Missing email or password"}), 400
         
-    # Find user by email
-    user = User.query.filter_by(email=data['email']).first()
+    # Find user by email, with candidate/employer columns in one query
+    user = User.find_by_email(data['email'])
     
-    if not user or not user.check_password(data['password']):
-        return jsonify({"error": "Invalid email or password"}), 401
+    try:
+        if not user or not user.check_password(data['password']):
+            return jsonify({"error": "Invalid email or password"}), 401
+        
+        # Upgrade hashes made with an older hasher or cost factor
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+    except PasswordHashBusyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
         
     # Generate tokens
-    access_token = create_access_token(identity=user.id)
-    refresh_token = create_refresh_token(identity=user.id)
+    access_token = create_access_token(identity=str(user.id))
+    refresh_token = create_refresh_token(identity=str(user.id))
     
     return jsonify({
         "message": "Login successful",
@@ -188,7 +231,7 @@ def login():
 def refresh_token():
     """Refresh access token"""
     identity = get_jwt_identity()
-    access_token = create_access_token(identity=identity)
+    access_token = create_access_token(identity=str(identity))
     
     return jsonify({
         "message": "Token refreshed",
@@ -200,19 +243,43 @@ def refresh_token():
 def get_user_profile():
     """Get current user profile"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    profile = profile_cache.get(str(user_id)) if AUTH_PROFILE_CACHE_TTL > 0 else None
+    if profile is None:
+        user = User.find_by_id(int(user_id))
+        
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        profile = user.to_dict()
+        if AUTH_PROFILE_CACHE_TTL > 0:
+            profile_cache.set(str(user_id), profile)
         
     return jsonify({
-        "user": user.to_dict()
+        "user": profile
     }), 200
 
 @auth_routes.route("/api/auth/logout", methods=["POST"])
 @jwt_required()
 def logout():
     """Logout user (revoke token)"""
-    # In a more complete implementation, you would revoke the token here
-    # For now, we'll just return a success message
+    claims = get_jwt()
+    user_id = int(get_jwt_identity())
+    token_denylist.revoke(claims["jti"], claims["exp"], claims.get("type", "access"), user_id)
+    
+    # Revoke the refresh token too when the client sends it
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    if data.get("refresh_token"):
+        try:
+            refresh_claims = decode_token(data["refresh_token"])
+        except Exception:
+            return jsonify({"error": "Invalid refresh token"}), 400
+        if refresh_claims.get("type") != "refresh":
+            return jsonify({"error": "Invalid refresh token"}), 400
+        if str(refresh_claims["sub"]) != str(user_id):
+            return jsonify({"error": "Refresh token belongs to another user"}), 400
+        token_denylist.revoke(refresh_claims["jti"], refresh_claims["exp"], "refresh", user_id)
+    
     return jsonify({"message": "Logout successful"}), 200
@@ -0,0 +1,172 @@
+"""
+Combined interview turn route: transcription, response and speech in one request
+"""
+
+import base64
+import math
+from collections import deque
+from flask import Blueprint, request, jsonify
+from utils.audio_upload import AudioUploadError, read_audio_upload
+from utils.conversation_store import get_conversation
+from utils.openai_client import get_openai_client, is_api_key_configured
+from utils.response_cache import cached_response_key
+from utils.speech import AUDIO_MIME_TYPES, speech_params, synthesize_speech, tts_executor
+from utils.streaming import sse_event, sse_response
+from utils.jwt_manager import request_authenticated
+from utils.upstream_scheduler import UpstreamBusyError, limit_priority, resolve_priority
+from routes.response_generation import (
+    build_completion_params, completion_settings, conversation_owner, conversation_user_content,
+    stream_completion_events
+)
+from routes.transcription import transcribe_file
+
+# Create blueprint for the combined turn route
+interview_turn_routes = Blueprint('interview_turn', __name__)
+
+# Top-level upload options that configure transcription (query parameters for raw bodies)
+TRANSCRIPTION_OPTION_NAMES = ("language", "prompt", "temperature")
+
+def turn_fields(req):
+    """Non-audio fields of a turn, from the form, JSON body or query string"""
+    if req.mimetype == "multipart/form-data":
+        return req.form
+    if req.is_json:
+        return req.get_json(silent=True) or {}
+    return req.args
+
+def split_turn_options(options, authenticated):
+    """
+    Split turn options into transcription, response and speech options.
+    Raises ValueError if a section is not an object.
+    """
+    for name in ("transcription", "response", "speech"):
+        if not isinstance(options.get(name, {}), dict):
+            raise ValueError(f"options.{name} must be an object")
+    
+    priority = options.get("priority")
+    transcription = {name: options[name] for name in TRANSCRIPTION_OPTION_NAMES if name in options}
+    sections = [
+        {**transcription, **options.get("transcription", {})},
+        dict(options.get("response", {})),
+        dict(options.get("speech", {}))
+    ]
+    if priority is not None:
+        for section in sections:
+            section.setdefault("priority", priority)
+    return [limit_priority(section, authenticated) for section in sections]
+
+def stream_turn_events(client, transcript, data, conversation, speech_options):
+    """
+    Stream the response to a transcript, synthesizing each sentence as soon
+    as it is complete so audio for the first sentence is sent while the rest
+    of the response is still being generated
+    """
+    params = build_completion_params(data, conversation)
+    response_options = data.get("options", {})
+    priority = resolve_priority(response_options.get("priority"))
+    mime_type = AUDIO_MIME_TYPES.get(speech_params(speech_options)["response_format"], "application/octet-stream")
+    pending = deque()
+    result = {}
+    
+    def submit_sentence(index, sentence):
+        pending.append((index, tts_executor.submit(synthesize_speech, client, sentence, speech_options)))
+    
+    def finish_response(response_text):
+        result["response"] = response_text
+        if conversation is not None:
+            conversation.record(conversation_user_content(data), response_text, client)
+    
+    def audio_events(wait):
+        # Sentences are sent in order, so only the oldest one is checked
+        while pending and (wait or pending[0][1].done()):
+            index, future = pending.popleft()
+            audio = future.result()
+            yield sse_event("audio", {
+                "index": index,
+                "audio_data": base64.b64encode(audio).decode("utf-8"),
+                "mime_type": mime_type
+            })
+    
+    yield sse_event("transcript", {"text": transcript})
+    
+    try:
+        completion_events = stream_completion_events(
+            client, params, priority, cached_response_key(params, response_options),
+            on_done=finish_response, on_sentence=submit_sentence, done_event="response"
+        )
+        for event in completion_events:
+            yield event
+            yield from audio_events(wait=False)
+        
+        # The completion failed and already sent an error event
+        if "response" not in result:
+            return
+        
+        yield from audio_events(wait=True)
+        yield sse_event("done", {"transcript": transcript, "response": result["response"]})
+    
+    except Exception as e:
+        print(f"Interview turn speech error: {str(e)}")
+        yield sse_event("error", {"error": str(e)})
+    
+    finally:
+        # Client went away or synthesis failed: drop work that hasn't started
+        for _, future in pending:
+            future.cancel()
+
+@interview_turn_routes.route("/api/interview-turn", methods=["POST"])
+def interview_turn():
+    """Transcribe a candidate answer, then stream the reply text and its audio"""
+    
+    if not is_api_key_configured():
+        return jsonify({"error": "OpenAI API key not configured"}), 401
+    
+    client = get_openai_client()
+    if not client:
+        return jsonify({"error": "OpenAI client initialization failed"}), 500
+    
+    fields = turn_fields(request)
+    if not isinstance(fields, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    owner_id = conversation_owner() if fields.get("conversationId") else None
+    if fields.get("conversationId") and owner_id is None:
+        return jsonify({"error": "Stored conversations require authentication"}), 401
+    
+    # Same upload formats as /api/transcribe
+    try:
+        audio_file, options = read_audio_upload(request)
+    except AudioUploadError as e:
+        return jsonify({"error": str(e)}), e.status_code
+    
+    # Checked before transcribing, since the reply is built once the stream has started
+    try:
+        transcription_options, response_options, speech_options = split_turn_options(options, request_authenticated())
+        completion_settings(response_options)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        # Transcribe before streaming so upload and upstream errors keep their status codes
+        transcription = transcribe_file(
+            client, audio_file, transcription_options, resolve_priority(transcription_options.get("priority"))
+        )
+    
+    except UpstreamBusyError as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(math.ceil(e.retry_after))}
+    
+    except Exception as e:
+        print(f"Interview turn transcription error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    transcript = transcription["text"].strip()
+    if not transcript:
+        return jsonify({"error": "No speech detected", "transcript": ""}), 422
+    
+    data = {
+        "transcript": transcript,
+        "currentQuestion": fields.get("currentQuestion", ""),
+        "options": response_options
+    }
+    conversation = get_conversation(fields["conversationId"], owner_id) if owner_id is not None else None
+    
+    return sse_response(stream_turn_events(client, transcript, data, conversation, speech_options))
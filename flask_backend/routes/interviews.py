@@ -0,0 +1,130 @@
+
+"""
+Interview listing routes with keyset pagination
+"""
+
+import base64
+import json
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, tuple_
+
+from models.interview import Interview
+from models.user import User, db
+
+# Create blueprint for interview routes
+interview_routes = Blueprint('interviews', __name__)
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+# Lean projection for list views instead of the full to_dict()
+LIST_COLUMNS = (
+    Interview.id,
+    Interview.title,
+    Interview.status,
+    Interview.score,
+    Interview.created_at,
+    Interview.scheduled_at,
+    Interview.completed_at,
+    Interview.candidate_id,
+    Interview.employer_id
+)
+
+class ListingError(ValueError):
+    """Raised for invalid listing query parameters"""
+
+def encode_cursor(created_at, interview_id):
+    """Encode the (created_at, id) position of the last row on a page"""
+    raw = json.dumps([created_at.isoformat(), interview_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    """Decode a cursor back into (created_at, id)"""
+    try:
+        created_at, interview_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(interview_id)
+    except (ValueError, TypeError):
+        raise ListingError("Invalid cursor")
+
+def _is_user_type(user_id, user_type):
+    return db.session.execute(select(User.user_type).where(User.id == user_id)).scalar() == user_type
+
+def _parse_datetime(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ListingError(f"Invalid {name}: expected an ISO 8601 date")
+
+def list_interviews(owner_column, owner_id):
+    """Return one page of interviews for an owner, newest first"""
+    try:
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ListingError("Invalid limit")
+    
+    query = select(*LIST_COLUMNS).where(owner_column == owner_id)
+    
+    status = request.args.get("status")
+    if status:
+        query = query.where(Interview.status == status)
+    
+    created_from = _parse_datetime("created_from")
+    if created_from:
+        query = query.where(Interview.created_at >= created_from)
+    
+    created_to = _parse_datetime("created_to")
+    if created_to:
+        query = query.where(Interview.created_at < created_to)
+    
+    # Seek past the last row of the previous page instead of using OFFSET
+    cursor = request.args.get("cursor")
+    if cursor:
+        query = query.where(tuple_(Interview.created_at, Interview.id) < decode_cursor(cursor))
+    
+    query = query.order_by(Interview.created_at.desc(), Interview.id.desc()).limit(limit + 1)
+    rows = db.session.execute(query).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    interviews = []
+    for row in rows:
+        item = row._asdict()
+        for field in ("created_at", "scheduled_at", "completed_at"):
+            item[field] = item[field].isoformat() if item[field] else None
+        interviews.append(item)
+    
+    return {"interviews": interviews, "next_cursor": next_cursor}
+
+@interview_routes.route("/api/employers/me/interviews", methods=["GET"])
+@jwt_required()
+def list_employer_interviews():
+    """List the current employer's interviews"""
+    user_id = int(get_jwt_identity())
+    if not _is_user_type(user_id, "employer"):
+        return jsonify({"error": "Only employers can list employer interviews"}), 403
+    
+    try:
+        return jsonify(list_interviews(Interview.employer_id, user_id)), 200
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+
+@interview_routes.route("/api/candidates/me/interviews", methods=["GET"])
+@jwt_required()
+def list_candidate_interviews():
+    """List the current candidate's interviews"""
+    user_id = int(get_jwt_identity())
+    if not _is_user_type(user_id, "candidate"):
+        return jsonify({"error": "Only candidates can list candidate interviews"}), 403
+    
+    try:
+        return jsonify(list_interviews(Interview.candidate_id, user_id)), 200
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
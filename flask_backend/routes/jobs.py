@@ -0,0 +1,86 @@
+
+"""
+Background job routes for post-interview scoring and question audio warmup
+"""
+
+import time
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from models.interview import Interview
+from models.job import Job
+from models.user import db
+from utils.job_queue import enqueue_job
+from utils.question_audio import enqueue_question_audio
+
+# Registers the scoring job handler
+from utils.interview_scoring import is_allowed_recording_url
+
+# Create blueprint for job routes
+job_routes = Blueprint('jobs', __name__)
+
+@job_routes.route("/api/interviews/<int:interview_id>/score", methods=["POST"])
+@jwt_required()
+def score_interview(interview_id):
+    """Queue transcription, feedback and scoring for a completed interview"""
+    user_id = get_jwt_identity()
+    interview = db.session.get(Interview, interview_id)
+    
+    if not interview or str(interview.employer_id) != str(user_id):
+        return jsonify({"error": "Interview not found"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    if not interview.recording_url and not data.get("transcript"):
+        return jsonify({"error": "Interview has no recording or transcript"}), 400
+    if not data.get("transcript") and not is_allowed_recording_url(interview.recording_url):
+        return jsonify({"error": "Recording URL is not a stored recording or on an allowed host"}), 400
+    
+    # One scoring job per interview unless re-scoring is forced
+    idempotency_key = f"score_interview:{interview_id}"
+    if data.get("force"):
+        idempotency_key = f"{idempotency_key}:{int(time.time())}"
+    
+    try:
+        job = enqueue_job(
+            "score_interview",
+            {"interview_id": interview_id, "transcript": data.get("transcript"), "force": bool(data.get("force"))},
+            idempotency_key=idempotency_key,
+            owner_id=int(user_id)
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to queue scoring: {str(e)}"}), 500
+    
+    return jsonify({"job": job.to_dict()}), 202
+
+@job_routes.route("/api/interviews/<int:interview_id>/question-audio", methods=["POST"])
+@jwt_required()
+def prewarm_question_audio(interview_id):
+    """Queue synthesis of an interview's question audio ahead of time"""
+    user_id = get_jwt_identity()
+    interview = db.session.get(Interview, interview_id)
+    
+    if not interview or str(interview.employer_id) != str(user_id):
+        return jsonify({"error": "Interview not found"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        # Repeated requests return the queued job unless a rebuild is forced
+        job = enqueue_question_audio(interview, data.get("options"), force=bool(data.get("force")))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to queue question audio: {str(e)}"}), 500
+    
+    return jsonify({"job": job.to_dict()}), 202
+
+@job_routes.route("/api/jobs/<int:job_id>", methods=["GET"])
+@jwt_required()
+def get_job_status(job_id):
+    """Get the status of a background job"""
+    job = db.session.get(Job, job_id)
+    
+    if not job or str(job.owner_id) != str(get_jwt_identity()):
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify({"job": job.to_dict()}), 200
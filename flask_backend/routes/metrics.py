@@ -0,0 +1,21 @@
+"""
+Prometheus metrics endpoint
+"""
+
+import os
+from flask import Blueprint, Response, request, jsonify
+from utils.metrics import render_metrics
+
+# Create blueprint for metrics routes
+metrics_routes = Blueprint('metrics', __name__)
+
+# Optional bearer token required to scrape /metrics
+METRICS_AUTH_TOKEN = os.environ.get("METRICS_AUTH_TOKEN", "")
+
+@metrics_routes.route("/metrics", methods=["GET"])
+def metrics():
+    """Export request, upstream and database metrics in the Prometheus text format"""
+    if METRICS_AUTH_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_AUTH_TOKEN}":
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,151 @@
+"""
+Interview recording upload and playback routes
+"""
+
+import uuid
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.wsgi import get_input_stream
+
+from models.interview import Interview
+from models.recording import Recording
+from models.user import db
+from utils.recording_store import (
+    RECORDING_MAX_BYTES, RECORDING_MAX_CHUNK_BYTES, RecordingError, append_chunk, complete_upload, delete_recording,
+    is_media_type, recording_path, upload_offset
+)
+
+# Create blueprint for recording routes
+recording_routes = Blueprint('recordings', __name__)
+
+def _is_participant(interview, user_id):
+    return str(user_id) in (str(interview.candidate_id), str(interview.employer_id))
+
+def _get_upload(upload_id):
+    """Find an upload owned by the current user"""
+    recording = Recording.query.filter_by(upload_id=upload_id).first()
+    if not recording or str(recording.owner_id) != str(get_jwt_identity()):
+        return None
+    return recording
+
+@recording_routes.route("/api/interviews/<int:interview_id>/recordings", methods=["POST"])
+@jwt_required()
+def create_upload(interview_id):
+    """Start a resumable recording upload for an interview"""
+    user_id = get_jwt_identity()
+    interview = db.session.get(Interview, interview_id)
+    
+    if not interview or not _is_participant(interview, user_id):
+        return jsonify({"error": "Interview not found"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    expected_size = data.get("size")
+    if expected_size is not None and (not isinstance(expected_size, int) or expected_size < 0
+                                      or expected_size > RECORDING_MAX_BYTES):
+        return jsonify({"error": "Invalid or too large recording size"}), 400
+    
+    content_type = data.get("content_type") or "video/webm"
+    if not isinstance(content_type, str) or not is_media_type(content_type):
+        return jsonify({"error": "content_type must be an audio/* or video/* type"}), 400
+    
+    recording = Recording(
+        upload_id=str(uuid.uuid4()),
+        content_type=content_type,
+        expected_size=expected_size,
+        interview_id=interview_id,
+        owner_id=int(user_id)
+    )
+    db.session.add(recording)
+    db.session.commit()
+    
+    return jsonify({"upload": recording.to_dict(), "offset": 0}), 201
+
+@recording_routes.route("/api/recordings/uploads/<upload_id>", methods=["GET", "HEAD"])
+@jwt_required()
+def get_upload_offset(upload_id):
+    """Report how many bytes were received, so an interrupted upload can resume"""
+    recording = _get_upload(upload_id)
+    if not recording:
+        return jsonify({"error": "Upload not found"}), 404
+    
+    offset = upload_offset(recording)
+    return jsonify({"upload": recording.to_dict(), "offset": offset}), 200, {"Upload-Offset": str(offset)}
+
+@recording_routes.route("/api/recordings/uploads/<upload_id>", methods=["PATCH"])
+@jwt_required()
+def upload_chunk(upload_id):
+    """Append a raw chunk at the offset given by the Upload-Offset header"""
+    recording = _get_upload(upload_id)
+    if not recording:
+        return jsonify({"error": "Upload not found"}), 404
+    
+    offset = request.headers.get("Upload-Offset", type=int)
+    if offset is None:
+        return jsonify({"error": "Missing Upload-Offset header"}), 400
+    
+    try:
+        # Stream the body to disk instead of loading it into memory; chunks have
+        # their own limit, which may exceed MAX_CONTENT_LENGTH
+        stream = get_input_stream(request.environ, max_content_length=RECORDING_MAX_CHUNK_BYTES)
+        new_offset = append_chunk(recording, offset, stream, request.content_length)
+    except RecordingError as e:
+        return jsonify({"error": str(e), "offset": upload_offset(recording)}), e.status_code
+    
+    return jsonify({"offset": new_offset}), 200, {"Upload-Offset": str(new_offset)}
+
+@recording_routes.route("/api/recordings/uploads/<upload_id>/complete", methods=["POST"])
+@jwt_required()
+def finish_upload(upload_id):
+    """Finish an upload and attach the recording to its interview"""
+    recording = _get_upload(upload_id)
+    if not recording:
+        return jsonify({"error": "Upload not found"}), 404
+    
+    try:
+        recording = complete_upload(recording)
+    except RecordingError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), e.status_code
+    
+    return jsonify({"recording": recording.to_dict()}), 200
+
+@recording_routes.route("/api/recordings/<int:recording_id>", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def play_recording(recording_id):
+    """Serve a recording with HTTP Range support for seeking"""
+    recording = db.session.get(Recording, recording_id)
+    if not recording or recording.status != "complete":
+        return jsonify({"error": "Recording not found"}), 404
+    
+    interview = db.session.get(Interview, recording.interview_id) if recording.interview_id else None
+    user_id = get_jwt_identity()
+    if str(recording.owner_id) != str(user_id) and not (interview and _is_participant(interview, user_id)):
+        return jsonify({"error": "Recording not found"}), 404
+    
+    # conditional=True answers Range and If-None-Match requests; the file is
+    # streamed with the server's file wrapper (sendfile where available)
+    response = send_file(
+        recording_path(recording),
+        mimetype=recording.content_type if is_media_type(recording.content_type) else "application/octet-stream",
+        conditional=True,
+        etag=recording.sha256
+    )
+    
+    # Recordings are per-user: browsers may cache them, shared caches may not
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["Content-Security-Policy"] = "default-src 'none'; sandbox"
+    return response
+
+@recording_routes.route("/api/recordings/<int:recording_id>", methods=["DELETE"])
+@jwt_required()
+def remove_recording(recording_id):
+    """Delete a recording uploaded by the current user"""
+    recording = db.session.get(Recording, recording_id)
+    if not recording or str(recording.owner_id) != str(get_jwt_identity()):
+        return jsonify({"error": "Recording not found"}), 404
+    
+    delete_recording(recording)
+    return jsonify({"status": "deleted"})
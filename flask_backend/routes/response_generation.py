@@ -3,12 +3,163 @@
 AI response generation routes
 """
 
+import math
 from flask import Blueprint, request, jsonify
-from utils.openai_client import get_openai_client, is_api_key_configured
+from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_request
+from utils.conversation_store import delete_conversation, get_conversation
+from utils.jwt_manager import request_authenticated
+from utils.openai_client import get_openai_client, is_api_key_configured, upstream_timeout
+from utils.response_cache import cached_response_key, response_cache
+from utils.sentences import SentenceBuffer
+from utils.single_flight import coalesce, flight_key
+from utils.streaming import sse_event, sse_response
+from utils.upstream_scheduler import UpstreamBusyError, estimate_chat_tokens, resolve_priority, schedule
 
 # Create blueprint for response generation routes
 response_routes = Blueprint('response', __name__)
 
+# Fixed system prompt for stored conversations; the current question goes in
+# the user message so the prompt prefix stays identical across turns
+CONVERSATION_SYSTEM_PROMPT = """
+You are an AI interviewer conducting a job interview. Your name is AI Interviewer.
+Each candidate message starts with the question you are currently asking.
+Respond naturally to the candidate's answer. Keep your response brief (2-3 sentences maximum).
+Be conversational but professional. Ask thoughtful follow-up questions when appropriate,
+using what the candidate said earlier in the interview.
+You must respond in complete sentences, even if the candidate's answer is unclear.
+If the candidate's answer shows they are done with this topic, end with "Let's move on to the next question."
+If the candidate's answer is unclear, ask them to clarify.
+IMPORTANT: Don't repeat yourself. Never say "Thank you for sharing" or similar phrases repeatedly.
+"""
+
+def conversation_user_content(data):
+    """User message stored in a conversation for one turn"""
+    return f'Current question: "{data.get("currentQuestion", "")}"\n\nCandidate: {data["transcript"]}'
+
+class CompletionOptionsError(ValueError):
+    """Raised for request options that can't be sent upstream"""
+
+def completion_settings(options):
+    """
+    Temperature and token limit from request options, as numbers. Every
+    caller validates options here before building a cache key from them.
+    """
+    if not isinstance(options, dict):
+        raise CompletionOptionsError("options must be an object")
+    try:
+        temperature = float(options.get("temperature", 0.7))
+        max_tokens = int(options.get("maxTokens", 250))
+    except (TypeError, ValueError):
+        raise CompletionOptionsError("temperature and maxTokens must be numbers")
+    if not 0 <= temperature <= 2:
+        raise CompletionOptionsError("temperature must be between 0 and 2")
+    if max_tokens < 1:
+        raise CompletionOptionsError("maxTokens must be positive")
+    return temperature, max_tokens
+
+def build_completion_params(data, conversation=None):
+    """
+    Build Chat Completions parameters from a generate-response payload.
+    Raises CompletionOptionsError for invalid options.
+    """
+    transcript = data["transcript"]
+    current_question = data.get("currentQuestion", "")
+    options = data.get("options", {})
+    temperature, max_tokens = completion_settings(options)
+    
+    # Create system prompt
+    system_prompt = options.get("systemPrompt") or f"""
+        You are an AI interviewer conducting a job interview. 
+        Your name is AI Interviewer. You are currently asking: "{current_question}"
+        Respond naturally to the candidate's answer. Keep your response brief (2-3 sentences maximum).
+        Be conversational but professional. Ask thoughtful follow-up questions when appropriate.
+        You must respond in complete sentences, even if the candidate's answer is unclear.
+        If the candidate's answer shows they are done with this topic, end with "Let's move on to the next question."
+        If the candidate's answer is unclear, ask them to clarify.
+        IMPORTANT: Don't repeat yourself. Never say "Thank you for sharing" or similar phrases repeatedly.
+        """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": transcript}
+    ]
+    
+    # Stored conversations: memo and earlier turns after a fixed system prompt
+    if conversation is not None:
+        messages = conversation.build_messages(
+            options.get("systemPrompt") or CONVERSATION_SYSTEM_PROMPT, conversation_user_content(data)
+        )
+    
+    return {
+        "model": options.get("model", "gpt-4o-mini"),
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "timeout": upstream_timeout("chat")
+    }
+
+def completion_flight_key(params):
+    """Single-flight key covering everything sent upstream except the timeout"""
+    return flight_key("chat", {k: v for k, v in params.items() if k != "timeout"})
+
+def create_completion(client, params, priority, stream=False):
+    """Send a chat completion through the upstream scheduler"""
+    return schedule(
+        lambda: client.chat.completions.create(stream=stream, **params),
+        params["model"], estimate_chat_tokens(params), priority
+    )
+
+def iter_completion_deltas(client, params, priority):
+    """Yield the text fragments of a streamed chat completion"""
+    stream = create_completion(client, params, priority, stream=True)
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def stream_completion_events(client, params, priority, cache_key=None, on_done=None, on_sentence=None,
+                             done_event="done"):
+    """Stream a chat completion as token and sentence events"""
+    sentences = SentenceBuffer()
+    sentence_index = 0
+    chunks = []
+    
+    try:
+        cached = response_cache.get(cache_key) if cache_key else None
+        deltas = [cached] if cached is not None else iter_completion_deltas(client, params, priority)
+        
+        for delta in deltas:
+            chunks.append(delta)
+            yield sse_event("token", {"text": delta})
+            
+            # Emit complete sentences so the client can start TTS early
+            for sentence in sentences.feed(delta):
+                if on_sentence:
+                    on_sentence(sentence_index, sentence)
+                yield sse_event("sentence", {"index": sentence_index, "text": sentence})
+                sentence_index += 1
+        
+        tail = sentences.flush()
+        if tail:
+            if on_sentence:
+                on_sentence(sentence_index, tail)
+            yield sse_event("sentence", {"index": sentence_index, "text": tail})
+        
+        response_text = "".join(chunks)
+        if cache_key and cached is None:
+            response_cache.set(cache_key, response_text)
+        if on_done:
+            on_done(response_text)
+        
+        yield sse_event(done_event, {"response": response_text})
+    
+    except Exception as e:
+        print(f"AI response streaming error: {str(e)}")
+        yield sse_event("error", {"error": str(e)})
+
+def conversation_owner():
+    """Identity of the authenticated user, or None; stored conversations require one"""
+    verify_jwt_in_request(optional=True)
+    return get_jwt_identity()
+
 @response_routes.route("/api/generate-response", methods=["POST"])
 def generate_response():
     """Generate AI response using OpenAI GPT"""
@@ -22,39 +173,76 @@ def generate_response():
     
     data = request.json
     
-    if not data or "transcript" not in data:
+    if not isinstance(data, dict) or "transcript" not in data:
         return jsonify({"error": "Missing transcript"}), 400
     
+    # History is kept server-side when the client names a conversation
+    conversation = None
+    if data.get("conversationId"):
+        owner_id = conversation_owner()
+        if owner_id is None:
+            return jsonify({"error": "Stored conversations require authentication"}), 401
+        conversation = get_conversation(data["conversationId"], owner_id)
+    
     try:
-        transcript = data["transcript"]
-        current_question = data.get("currentQuestion", "")
+        params = build_completion_params(data, conversation)
         options = data.get("options", {})
+        cache_key = cached_response_key(params, options)
+        priority = resolve_priority(options.get("priority"), request_authenticated())
         
-        # Create system prompt
-        system_prompt = options.get("systemPrompt") or f"""
-        You are an AI interviewer conducting a job interview. 
-        Your name is AI Interviewer. You are currently asking: "{current_question}"
-        Respond naturally to the candidate's answer. Keep your response brief (2-3 sentences maximum).
-        Be conversational but professional. Ask thoughtful follow-up questions when appropriate.
-        You must respond in complete sentences, even if the candidate's answer is unclear.
-        If the candidate's answer shows they are done with this topic, end with "Let's move on to the next question."
-        If the candidate's answer is unclear, ask them to clarify.
-        IMPORTANT: Don't repeat yourself. Never say "Thank you for sharing" or similar phrases repeatedly.
-        """
+        def record_turn(response_text):
+            if conversation is not None:
+                conversation.record(conversation_user_content(data), response_text, client)
         
-        # Call OpenAI Chat Completions API
-        response = client.chat.completions.create(
-            model=options.get("model", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": transcript}
-            ],
-            temperature=options.get("temperature", 0.7),
-            max_tokens=options.get("maxTokens", 250)
-        )
+        # Opt-in streaming mode: tokens and sentence boundaries as Server-Sent Events
+        if options.get("stream"):
+            return sse_response(stream_completion_events(client, params, priority, cache_key, record_turn))
+        
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                record_turn(cached)
+                return jsonify({"response": cached, "cached": True})
+        
+        def fetch():
+            # Call OpenAI Chat Completions API
+            response = create_completion(client, params, priority)
+            return response.choices[0].message.content
+        
+        # Identical concurrent requests share one upstream call
+        response_text = coalesce(completion_flight_key(params), fetch)
+        
+        if cache_key:
+            response_cache.set(cache_key, response_text)
+        record_turn(response_text)
         
-        return jsonify({"response": response.choices[0].message.content})
+        return jsonify({"response": response_text})
+    
+    except CompletionOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    except UpstreamBusyError as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(math.ceil(e.retry_after))}
     
     except Exception as e:
         print(f"AI response generation error: {str(e)}")
         return jsonify({"error": str(e)}), 500
+
+@response_routes.route("/api/conversations/<conversation_id>", methods=["GET"])
+@jwt_required()
+def get_conversation_state(conversation_id):
+    """Inspect the stored memo and history size of one of the user's conversations"""
+    conversation = get_conversation(conversation_id, get_jwt_identity(), create=False)
+    if not conversation:
+        return jsonify({"error": "Conversation not found"}), 404
+    
+    return jsonify(conversation.to_dict())
+
+@response_routes.route("/api/conversations/<conversation_id>", methods=["DELETE"])
+@jwt_required()
+def reset_conversation(conversation_id):
+    """Forget one of the user's conversations"""
+    if not delete_conversation(conversation_id, get_jwt_identity()):
+        return jsonify({"error": "Conversation not found"}), 404
+    
+    return jsonify({"status": "deleted"})
@@ -4,12 +4,32 @@ Text-to-speech conversion routes
 """
 
 import base64
-from flask import Blueprint, request, jsonify
+import math
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from utils.openai_client import get_openai_client, is_api_key_configured
+from utils.question_audio import get_question_audio
+from utils.sentences import split_sentences
+from utils.speech import AUDIO_MIME_TYPES, STREAMABLE_FORMATS, iter_speech, speech_params, synthesize_speech
+from utils.jwt_manager import request_authenticated
+from utils.upstream_scheduler import UpstreamBusyError, limit_priority
 
 # Create blueprint for TTS routes
 tts_routes = Blueprint('tts', __name__)
 
+def stream_audio(audio_chunks, first_chunk):
+    """
+    Yield the already synthesized first chunk, then the rest as they complete.
+    A failure after the headers were sent is re-raised, so the server aborts
+    the response and the client sees an error instead of truncated audio.
+    """
+    yield first_chunk
+    try:
+        for chunk in audio_chunks:
+            yield chunk
+    except Exception as e:
+        print(f"TTS streaming error: {str(e)}")
+        raise
+
 @tts_routes.route("/api/text-to-speech", methods=["POST"])
 def text_to_speech():
     """Convert text to speech using OpenAI TTS API"""
@@ -28,21 +48,45 @@ def text_to_speech():
     
     try:
         text = data["text"]
-        options = data.get("options", {})
+        options = limit_priority(data.get("options", {}), request_authenticated())
+        response_format = speech_params(options)["response_format"]
+        if options.get("stream") and response_format not in STREAMABLE_FORMATS:
+            return jsonify({"error": f"Streaming supports only {' and '.join(STREAMABLE_FORMATS)} audio"}), 400
+        
+        # Question audio synthesized ahead of a scheduled interview
+        prewarmed = get_question_audio(data["interviewId"], text, options) if data.get("interviewId") else None
+        if prewarmed is not None:
+            if options.get("stream"):
+                mime_type = AUDIO_MIME_TYPES.get(speech_params(options)["response_format"], "application/octet-stream")
+                return Response(prewarmed, mimetype=mime_type, headers={"X-Sentence-Count": "1"})
+            return jsonify({"audio_data": base64.b64encode(prewarmed).decode("utf-8"), "prewarmed": True})
+        
+        # Opt-in streaming mode: synthesize sentence by sentence and stream raw audio
+        if options.get("stream"):
+            sentences = split_sentences(text) or [text]
+            audio_chunks = iter_speech(client, sentences, options)
+            
+            # Wait for the first sentence so upstream errors still surface as JSON
+            first_chunk = next(audio_chunks)
+            
+            mime_type = AUDIO_MIME_TYPES.get(speech_params(options)["response_format"], "application/octet-stream")
+            return Response(
+                stream_with_context(stream_audio(audio_chunks, first_chunk)),
+                mimetype=mime_type,
+                headers={"X-Sentence-Count": str(len(sentences))}
+            )
         
         # Call OpenAI TTS API with more natural-sounding voice
-        response = client.audio.speech.create(
-            model=options.get("model", "tts-1-hd"),
-            voice=options.get("voice", "nova"),  # Using nova for a more natural voice
-            input=text,
-            speed=options.get("speed", 1.0)
-        )
+        audio = synthesize_speech(client, text, options)
         
         # Convert audio to base64
-        audio_base64 = base64.b64encode(response.content).decode("utf-8")
+        audio_base64 = base64.b64encode(audio).decode("utf-8")
         
         return jsonify({"audio_data": audio_base64})
     
+    except UpstreamBusyError as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(math.ceil(e.retry_after))}
+    
     except Exception as e:
         print(f"TTS error: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -3,14 +3,48 @@
 Audio transcription routes
 """
 
-import base64
-import io
+import math
 from flask import Blueprint, request, jsonify
-from utils.openai_client import get_openai_client, is_api_key_configured
+from utils.openai_client import get_openai_client, is_api_key_configured, upstream_timeout
+from utils.audio_upload import AudioUploadError, read_audio_upload
+from utils.audio_transcode import prepare_for_whisper
+from utils.vad import transcribe_with_vad
+from utils.jwt_manager import request_authenticated
+from utils.upstream_scheduler import UpstreamBusyError, limit_priority, resolve_priority, schedule
+from utils.transcription_sessions import TRANSCRIPTION_FINISH_MAX_TIMEOUT, close_session, create_session, get_session
 
 # Create blueprint for transcription routes
 transcription_routes = Blueprint('transcription', __name__)
 
+def transcribe_file(client, audio_file, options, priority):
+    """Transcribe an uploaded audio file and close it afterwards"""
+    try:
+        # Long recordings with pauses: transcribe only the speech, in parallel
+        segmented = transcribe_with_vad(client, audio_file, options, priority)
+        if segmented is not None:
+            return segmented
+        
+        # Shrink the upload to mono 16 kHz Opus with silence trimmed
+        audio_file = prepare_for_whisper(audio_file, options)
+        
+        # Call OpenAI Whisper API
+        response = schedule(
+            lambda: client.audio.transcriptions.create(
+                file=audio_file,
+                model="whisper-1",
+                language=options.get("language"),
+                prompt=options.get("prompt"),
+                temperature=options.get("temperature", 0.2),
+                timeout=upstream_timeout("transcription")
+            ),
+            "whisper-1", priority=priority
+        )
+        
+        return {"text": response.text}
+    
+    finally:
+        audio_file[1].close()
+
 @transcription_routes.route("/api/transcribe", methods=["POST"])
 def transcribe_audio():
     """Transcribe audio using OpenAI Whisper API"""
@@ -22,32 +56,92 @@ def transcribe_audio():
     if not client:
         return jsonify({"error": "OpenAI client initialization failed"}), 500
     
-    data = request.json
-    
-    if not data or "audio_data" not in data:
-        return jsonify({"error": "Missing audio data"}), 400
+    # Accept raw audio/* bodies, multipart uploads or base64 JSON
+    try:
+        audio_file, options = read_audio_upload(request)
+    except AudioUploadError as e:
+        return jsonify({"error": str(e)}), e.status_code
     
     try:
-        # Decode base64 audio data
-        audio_bytes = base64.b64decode(data["audio_data"])
-        
-        # Create temporary file for OpenAI API
-        audio_file = io.BytesIO(audio_bytes)
-        
-        # Get transcription options
-        options = data.get("options", {})
-        
-        # Call OpenAI Whisper API
-        response = client.audio.transcriptions.create(
-            file=audio_file,
-            model="whisper-1",
-            language=options.get("language"),
-            prompt=options.get("prompt"),
-            temperature=options.get("temperature", 0.2)
-        )
-        
-        return jsonify({"text": response.text})
+        priority = resolve_priority(options.get("priority"), request_authenticated())
+        return jsonify(transcribe_file(client, audio_file, options, priority))
+    
+    except UpstreamBusyError as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(math.ceil(e.retry_after))}
     
     except Exception as e:
         print(f"Transcription error: {str(e)}")
         return jsonify({"error": str(e)}), 500
+
+@transcription_routes.route("/api/transcribe/sessions", methods=["POST"])
+def create_transcription_session():
+    """Open a real-time transcription session"""
+    
+    if not is_api_key_configured():
+        return jsonify({"error": "OpenAI API key not configured"}), 401
+    
+    data = request.get_json(silent=True) or {}
+    session = create_session(limit_priority(data.get("options", {}), request_authenticated()))
+    
+    return jsonify(session.to_dict()), 201
+
+@transcription_routes.route("/api/transcribe/sessions/<session_id>/chunks", methods=["POST"])
+def append_transcription_chunk(session_id):
+    """Append an audio chunk to a session and transcribe it in the background"""
+    
+    session = get_session(session_id)
+    if not session:
+        return jsonify({"error": "Transcription session not found"}), 404
+    
+    client = get_openai_client()
+    if not client:
+        return jsonify({"error": "OpenAI client initialization failed"}), 500
+    
+    try:
+        audio_file, _ = read_audio_upload(request)
+    except AudioUploadError as e:
+        return jsonify({"error": str(e)}), e.status_code
+    
+    sequence = session.append(audio_file)
+    
+    return jsonify({**session.to_dict(), "sequence": sequence}), 202
+
+@transcription_routes.route("/api/transcribe/sessions/<session_id>", methods=["GET"])
+def get_transcription_session(session_id):
+    """Get the running transcript for a session"""
+    
+    session = get_session(session_id)
+    if not session:
+        return jsonify({"error": "Transcription session not found"}), 404
+    
+    return jsonify(session.to_dict())
+
+@transcription_routes.route("/api/transcribe/sessions/<session_id>/finish", methods=["POST"])
+def finish_transcription_session(session_id):
+    """Wait for outstanding chunks and return the final transcript"""
+    
+    session = get_session(session_id)
+    if not session:
+        return jsonify({"error": "Transcription session not found"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    timeout = data.get("timeout", 30)
+    if (not isinstance(timeout, (int, float)) or isinstance(timeout, bool)
+            or not 0 <= timeout <= TRANSCRIPTION_FINISH_MAX_TIMEOUT):
+        return jsonify({"error": f"timeout must be a number of seconds up to {TRANSCRIPTION_FINISH_MAX_TIMEOUT:g}"}), 400
+    
+    if not session.wait(timeout=timeout):
+        return jsonify({**session.to_dict(), "error": "Timed out waiting for transcription"}), 504
+    
+    result = session.to_dict()
+    close_session(session_id)
+    return jsonify(result)
+
+@transcription_routes.route("/api/transcribe/sessions/<session_id>", methods=["DELETE"])
+def delete_transcription_session(session_id):
+    """Discard a transcription session"""
+    
+    if not close_session(session_id):
+        return jsonify({"error": "Transcription session not found"}), 404
+    
+    return jsonify({"message": "Transcription session closed"})
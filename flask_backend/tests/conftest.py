@@ -0,0 +1,108 @@
+"""
+Shared fixtures: a Flask app on a temporary SQLite database, backed by the
+fake OpenAI server from benchmarks/fake_openai.py
+
+Settings are read from the environment when modules are imported, so they
+are set here before the app is imported.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from fake_openai import FakeConfig, base_url, start_fake_openai
+
+fake_openai = start_fake_openai(0, FakeConfig(
+    chat_latency=0.01, token_interval=0, speech_latency=0.01, transcription_latency=0.01, jitter=0
+))
+data_dir = tempfile.mkdtemp(prefix="interview-tests-")
+
+os.environ.update({
+    "DATABASE_URI": f"sqlite:///{os.path.join(data_dir, 'test.db')}",
+    "OPENAI_BASE_URL": base_url(fake_openai),
+    "OPENAI_API_KEY": "test",
+    "JWT_SECRET_KEY": "test-secret-key-with-enough-bytes-for-hs256",
+    "JOB_WORKERS": "0",
+    "START_BACKGROUND_THREADS": "false",
+    "AUTO_CREATE_SCHEMA": "true",
+    "PASSWORD_HASH_WORKERS": "0",
+    "BCRYPT_ROUNDS": "4",
+    "AUDIO_TRANSCODE_ENABLED": "false",
+    "VAD_ENABLED": "false",
+    "TTS_CACHE_ENABLED": "false",
+    "RESPONSE_CACHE_ENABLED": "false",
+    "RECORDINGS_DIR": os.path.join(data_dir, "recordings"),
+    "QUESTION_AUDIO_DIR": os.path.join(data_dir, "question_audio"),
+    "TRANSCRIPTION_SESSIONS_DIR": os.path.join(data_dir, "transcription_sessions"),
+    "AUTH_PROFILE_CACHE_TTL": "0"
+})
+
+PASSWORD = "correct horse battery staple"
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+    return create_app({"TESTING": True})
+
+@pytest.fixture(autouse=True)
+def database(app):
+    from models.user import db
+    with app.app_context():
+        db.create_all()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app, database):
+    """Create a candidate or employer directly (registration validates email DNS)"""
+    from models.candidate import Candidate
+    from models.employer import Employer
+
+    def make(email, kind="candidate"):
+        model = Candidate if kind == "candidate" else Employer
+        with app.app_context():
+            user = model(email=email, first_name="Test", last_name="User")
+            user.set_password(PASSWORD)
+            database.session.add(user)
+            database.session.commit()
+            return user.id
+    return make
+
+@pytest.fixture
+def make_interview(app, database):
+    """Create a pending interview scheduled for tomorrow"""
+    from models.interview import Interview
+
+    def make(employer_id, candidate_id=None, **fields):
+        with app.app_context():
+            interview = Interview(
+                title="Backend Engineer",
+                employer_id=employer_id,
+                candidate_id=candidate_id,
+                scheduled_at=datetime.utcnow() + timedelta(days=1),
+                **fields
+            )
+            database.session.add(interview)
+            database.session.commit()
+            return interview.id
+    return make
+
+@pytest.fixture
+def login(client):
+    """Log in and return the token response"""
+    def login_as(email):
+        response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        assert response.status_code == 200, response.json
+        return response.json
+    return login_as
+
+def auth_header(token):
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import threading
+import time
+
+import asgi
+
+# Registered before the app serves its first request
+asgi.flask_app.add_url_rule("/test/slow", "test_slow", lambda: (time.sleep(0.3), threading.current_thread().name)[1])
+
+
+def scope(path, method="GET", headers=()):
+    return {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http", "path": path,
+        "root_path": "", "query_string": b"", "headers": list(headers), "server": ("testserver", 80)
+    }
+
+
+async def call(path, method="GET", body=b"", headers=()):
+    """Run one request through the ASGI app and return (status, body)"""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app(scope(path, method, headers), receive, send)
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def test_pass_through_requests_run_concurrently():
+    async def run():
+        started = time.monotonic()
+        results = await asyncio.gather(*(call("/test/slow") for _ in range(4)))
+        return time.monotonic() - started, results
+
+    elapsed, results = asyncio.run(run())
+    assert all(status == 200 for status, _ in results)
+    assert len({body for _, body in results}) == 4
+    assert elapsed < 1
+
+
+def test_json_bodies_must_be_objects():
+    async def run():
+        headers = [(b"content-type", b"application/json")]
+        return [
+            await call("/api/text-to-speech", "POST", json.dumps(body).encode(), headers)
+            for body in (["text"], {"text": "Hi", "options": []}, {"text": "Hi", "options": "x"})
+        ]
+
+    assert [status for status, _ in asyncio.run(run())] == [400, 400, 400]
+
+
+def test_chunked_json_body_is_limited(monkeypatch):
+    monkeypatch.setattr(asgi.AsyncRequest.read, "__defaults__", (16,))
+
+    async def run():
+        messages = [{"type": "http.request", "body": b'{"text": "', "more_body": True}] * 3
+        messages.append({"type": "http.request", "body": b'"}', "more_body": False})
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi.app(scope("/api/generate-response", "POST"), receive, send)
+        return sent[0]["status"]
+
+    assert asyncio.run(run()) == 413
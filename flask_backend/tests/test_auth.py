@@ -0,0 +1,65 @@
+from conftest import auth_header
+
+def test_login_me_logout(client, make_user, login):
+    make_user("candidate@example.com")
+    tokens = login("candidate@example.com")
+    headers = auth_header(tokens["access_token"])
+
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json["user"]["email"] == "candidate@example.com"
+
+    response = client.post("/api/auth/logout", headers=headers, json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    refresh = client.post("/api/auth/refresh", headers=auth_header(tokens["refresh_token"]))
+    assert refresh.status_code == 401
+
+def test_refresh_issues_working_token(client, make_user, login):
+    make_user("refresh@example.com")
+    tokens = login("refresh@example.com")
+
+    response = client.post("/api/auth/refresh", headers=auth_header(tokens["refresh_token"]))
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=auth_header(response.json["access_token"])).status_code == 200
+
+def test_wrong_password(client, make_user):
+    make_user("wrong@example.com")
+    response = client.post("/api/auth/login", json={"email": "wrong@example.com", "password": "nope"})
+    assert response.status_code == 401
+
+def test_logout_rejects_access_token_as_refresh_token(client, make_user, login):
+    make_user("type@example.com")
+    tokens = login("type@example.com")
+    other = login("type@example.com")
+
+    response = client.post(
+        "/api/auth/logout", headers=auth_header(tokens["access_token"]),
+        json={"refresh_token": other["access_token"]}
+    )
+    assert response.status_code == 400
+    assert client.get("/api/auth/me", headers=auth_header(other["access_token"])).status_code == 200
+
+def test_concurrent_revocation_is_idempotent(app, client, make_user, login, monkeypatch):
+    from flask_jwt_extended import decode_token
+    from utils import token_denylist as denylist_module
+
+    make_user("race@example.com")
+    tokens = login("race@example.com")
+    response = client.post("/api/auth/logout", headers=auth_header(tokens["access_token"]))
+    assert response.status_code == 200
+
+    class RacedQuery:
+        # The other logout inserts its row after this one checked for it
+        def filter_by(self, **kwargs):
+            return self
+
+        def first(self):
+            return None
+
+    with app.app_context():
+        claims = decode_token(tokens["access_token"], allow_expired=True)
+        monkeypatch.setattr(denylist_module.RevokedToken, "query", RacedQuery())
+        denylist_module.token_denylist.revoke(claims["jti"], claims["exp"], "access")
+        assert denylist_module.token_denylist.is_revoked(claims["jti"])
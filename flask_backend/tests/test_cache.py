@@ -0,0 +1,21 @@
+from utils.cache import LRUCache
+
+
+def test_overwrite_replaces_the_old_size():
+    cache = LRUCache(max_bytes=10)
+    cache.set("a", b"12345678")
+    cache.set("a", b"123")
+    assert cache.stats()["bytes"] == 3
+
+    # Room for another entry without evicting the overwritten one
+    cache.set("b", b"1234567")
+    assert cache.get("a") == b"123"
+    assert cache.stats()["evictions"] == 0
+
+
+def test_oversized_overwrite_drops_the_stale_value():
+    cache = LRUCache(max_bytes=4)
+    cache.set("a", b"1234")
+    assert cache.set("a", b"12345") is False
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
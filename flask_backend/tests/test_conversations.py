@@ -0,0 +1,61 @@
+from conftest import auth_header
+
+
+def test_stored_conversations_require_authentication(client):
+    response = client.post("/api/generate-response", json={"transcript": "Hello there", "conversationId": "1"})
+    assert response.status_code == 401
+
+
+def test_conversations_are_private_to_their_owner(client, make_user, login):
+    make_user("first@example.com")
+    make_user("second@example.com")
+    first = auth_header(login("first@example.com")["access_token"])
+    second = auth_header(login("second@example.com")["access_token"])
+
+    response = client.post(
+        "/api/generate-response",
+        json={"transcript": "I built a billing service.", "currentQuestion": "Tell me about yourself.",
+              "conversationId": "interview-1"},
+        headers=first
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/conversations/interview-1", headers=first).get_json()["turns"] == 2
+    assert client.get("/api/conversations/interview-1").status_code == 401
+    assert client.get("/api/conversations/interview-1", headers=second).status_code == 404
+    assert client.delete("/api/conversations/interview-1", headers=second).status_code == 404
+    assert client.delete("/api/conversations/interview-1", headers=first).status_code == 200
+
+
+def test_history_is_shared_through_the_database(client, app, make_user, login, monkeypatch):
+    import time
+    from utils import conversation_store
+
+    monkeypatch.setattr(conversation_store, "CONVERSATION_TOKEN_BUDGET", 10)
+    monkeypatch.setattr(conversation_store, "CONVERSATION_KEEP_TOKENS", 10)
+    make_user("candidate@example.com")
+    headers = auth_header(login("candidate@example.com")["access_token"])
+
+    for answer in ("I built a billing service.", "I also led the payments team."):
+        response = client.post(
+            "/api/generate-response",
+            json={"transcript": answer, "currentQuestion": "Tell me about yourself.", "conversationId": "shared"},
+            headers=headers
+        )
+        assert response.status_code == 200
+
+    # The summary runs in the background and stores its memo with the turns
+    for _ in range(100):
+        state = client.get("/api/conversations/shared", headers=headers).get_json()
+        if state["summaries"]:
+            break
+        time.sleep(0.05)
+    assert state["memo"] and not state["summarizing"]
+    assert state["turns"] == 2
+
+    # A fresh lookup, as another worker would make, sees the same history
+    with app.app_context():
+        owner_id = client.get("/api/auth/me", headers=headers).get_json()["user"]["id"]
+        messages = conversation_store.Conversation("shared", owner_id).build_messages("system", "next")
+    assert "Notes on the interview so far" in messages[1]["content"]
+    assert len(messages) == 5
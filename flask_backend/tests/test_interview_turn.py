@@ -0,0 +1,79 @@
+import io
+import json
+
+from conftest import auth_header
+
+
+def sse_events(body):
+    """Parse a text/event-stream body into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def upload(**fields):
+    return {"audio": (io.BytesIO(b"RIFF" + b"0" * 64), "answer.wav"), **fields}
+
+
+def test_turn_streams_transcript_reply_and_audio(client):
+    response = client.post(
+        "/api/interview-turn",
+        data=upload(currentQuestion="Tell me about a project.", options=json.dumps({"speech": {"format": "opus"}})),
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    events = sse_events(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == "transcript"
+    assert names[-1] == "done"
+    assert "error" not in names
+
+    transcript = events[0][1]["text"]
+    assert "billing service" in transcript
+    done = events[-1][1]
+    assert done["transcript"] == transcript and done["response"]
+
+    # Every sentence of the reply is spoken, in order, in the requested format
+    audio = [data for name, data in events if name == "audio"]
+    assert [data["index"] for data in audio] == list(range(len(audio)))
+    assert audio and all(data["mime_type"] == "audio/ogg" for data in audio)
+
+
+def test_stored_conversation_requires_its_owner(client, make_user, login):
+    response = client.post(
+        "/api/interview-turn", data=upload(conversationId="turns"), content_type="multipart/form-data"
+    )
+    assert response.status_code == 401
+
+    make_user("candidate@example.com")
+    headers = auth_header(login("candidate@example.com")["access_token"])
+    response = client.post(
+        "/api/interview-turn", data=upload(conversationId="turns"), content_type="multipart/form-data",
+        headers=headers
+    )
+    assert sse_events(response.get_data(as_text=True))[-1][0] == "done"
+    assert client.get("/api/conversations/turns", headers=headers).get_json()["turns"] == 2
+
+
+def test_option_sections_must_be_objects(client):
+    for section in ("transcription", "response", "speech"):
+        response = client.post(
+            "/api/interview-turn",
+            data={"audio": (io.BytesIO(b"RIFF" + b"0" * 64), "answer.wav"), "options": json.dumps({section: "fast"})},
+            content_type="multipart/form-data"
+        )
+        assert response.status_code == 400
+        assert section in response.get_json()["error"]
+
+    response = client.post("/api/interview-turn", json={"audio_data": "UklGRg==", "options": ["batch"]})
+    assert response.status_code == 400
+
+
+def test_json_body_must_be_an_object(client):
+    response = client.post("/api/interview-turn", json=[{"audio_data": "UklGRg=="}])
+    assert response.status_code == 400
+    assert "object" in response.get_json()["error"]
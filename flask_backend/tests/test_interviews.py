@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from conftest import auth_header
+
+
+def test_employer_listing_pages_newest_first(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    other_id = make_user("other@example.com", kind="employer")
+    start = datetime(2026, 1, 1)
+    ids = [make_interview(employer_id, created_at=start + timedelta(hours=hour)) for hour in range(5)]
+    make_interview(other_id, created_at=start)
+    headers = auth_header(login("employer@example.com")["access_token"])
+
+    seen = []
+    cursor = None
+    while True:
+        query = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/employers/me/interviews", query_string=query, headers=headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page["interviews"]) <= 2
+        seen.extend(item["id"] for item in page["interviews"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Another employer's interview never shows up
+    assert seen == ids[::-1]
+
+
+def test_listing_filters_and_validation(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    candidate_id = make_user("candidate@example.com")
+    make_interview(employer_id, candidate_id, status="completed", created_at=datetime(2026, 1, 1))
+    pending_id = make_interview(employer_id, candidate_id, created_at=datetime(2026, 2, 1))
+    headers = auth_header(login("candidate@example.com")["access_token"])
+
+    response = client.get("/api/candidates/me/interviews", query_string={"status": "pending"}, headers=headers)
+    assert [item["id"] for item in response.get_json()["interviews"]] == [pending_id]
+
+    response = client.get("/api/candidates/me/interviews", query_string={"created_to": "2026-01-15"}, headers=headers)
+    assert [item["status"] for item in response.get_json()["interviews"]] == ["completed"]
+
+    for query in ({"cursor": "not-a-cursor"}, {"limit": "ten"}, {"created_from": "yesterday"}):
+        assert client.get("/api/candidates/me/interviews", query_string=query, headers=headers).status_code == 400
+    assert client.get("/api/candidates/me/interviews").status_code == 401
+
+
+def test_listing_is_limited_to_the_matching_role(client, make_user, login):
+    make_user("employer@example.com", kind="employer")
+    make_user("candidate@example.com")
+    employer = auth_header(login("employer@example.com")["access_token"])
+    candidate = auth_header(login("candidate@example.com")["access_token"])
+
+    assert client.get("/api/candidates/me/interviews", headers=employer).status_code == 403
+    assert client.get("/api/employers/me/interviews", headers=candidate).status_code == 403
+    assert client.get("/api/employers/me/interviews", headers=employer).status_code == 200
@@ -0,0 +1,53 @@
+import json
+
+from utils import metrics
+
+
+def test_scrape_sums_every_worker_snapshot(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_snapshot_file", {"pid": None, "path": None})
+    route = "/api/metrics-test"
+    metrics.http_requests.inc("GET", route, "200", value=2)
+
+    # Another worker's snapshot, written by its flusher
+    other = metrics.Registry()
+    other.counter("http_requests_total", "", ("method", "route", "status")).inc("GET", route, "200", value=3)
+    other.histogram("db_query_duration_seconds", "").observe(0.02)
+    (tmp_path / "99999-other.json").write_text(json.dumps(other.snapshot()))
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert f'http_requests_total{{method="GET",route="{route}",status="200"}} 5' in body
+
+    # The scraped worker wrote its own snapshot too
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    metrics.clear_snapshots()
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_file_responses_keep_the_server_file_wrapper(app, client, make_user, make_interview, login):
+    from wsgiref.util import FileWrapper
+    from werkzeug.test import EnvironBuilder
+    from conftest import auth_header
+
+    employer_id = make_user("employer@example.com", kind="employer")
+    interview_id = make_interview(employer_id)
+    headers = auth_header(login("employer@example.com")["access_token"])
+    upload_id = client.post(
+        f"/api/interviews/{interview_id}/recordings", json={}, headers=headers
+    ).get_json()["upload"]["upload_id"]
+    client.patch(f"/api/recordings/uploads/{upload_id}", data=b"x" * 100, headers={**headers, "Upload-Offset": "0"})
+    recording_id = client.post(
+        f"/api/recordings/uploads/{upload_id}/complete", headers=headers
+    ).get_json()["recording"]["id"]
+
+    route = "/api/recordings/<int:recording_id>"
+    before = metrics.http_requests.values.get(("GET", route, "200"), 0)
+    environ = EnvironBuilder(f"/api/recordings/{recording_id}", headers=headers).get_environ()
+    environ["wsgi.file_wrapper"] = FileWrapper
+
+    body = app.wsgi_app(environ, lambda status, response_headers, exc_info=None: None)
+    # Passed through unwrapped so the server can sendfile it
+    assert isinstance(body, FileWrapper)
+    assert b"".join(body) == b"x" * 100
+    body.close()
+    assert metrics.http_requests.values.get(("GET", route, "200"), 0) == before + 1
@@ -0,0 +1,17 @@
+import gc
+
+from utils.openai_client import OpenAIClientManager
+
+
+def test_evicted_client_is_closed_once_released():
+    manager = OpenAIClientManager(max_keys=1)
+    client = manager.get("first-key")
+    http_client = manager.http_clients[client]
+
+    manager.get("second-key")
+    # A request still holding the evicted client can finish with it
+    assert not http_client.is_closed
+
+    del client
+    gc.collect()
+    assert http_client.is_closed
@@ -0,0 +1,35 @@
+from conftest import auth_header
+from utils.job_queue import claim_next_job, run_job
+from utils.question_audio import INTERVIEW_QUESTIONS, QUESTION_SPEECH_OPTIONS
+
+
+def test_prewarmed_audio_is_served_for_the_page_prompts(app, client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    interview_id = make_interview(employer_id)
+    headers = auth_header(login("employer@example.com")["access_token"])
+
+    response = client.post(f"/api/interviews/{interview_id}/question-audio", json={}, headers=headers)
+    assert response.status_code == 202
+    with app.app_context():
+        run_job(claim_next_job("test"))
+
+    # The interview page sends its voice settings and the interview id
+    response = client.post("/api/text-to-speech", json={
+        "text": INTERVIEW_QUESTIONS[0], "options": QUESTION_SPEECH_OPTIONS, "interviewId": interview_id
+    })
+    assert response.status_code == 200
+    assert response.get_json().get("prewarmed") is True
+
+
+def test_forced_rebuilds_are_rate_limited(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    interview_id = make_interview(employer_id)
+    headers = auth_header(login("employer@example.com")["access_token"])
+
+    job_ids = {
+        client.post(
+            f"/api/interviews/{interview_id}/question-audio", json={"force": True}, headers=headers
+        ).get_json()["job"]["id"]
+        for _ in range(3)
+    }
+    assert len(job_ids) == 1
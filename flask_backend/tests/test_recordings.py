@@ -0,0 +1,124 @@
+from conftest import auth_header
+
+
+def test_upload_and_play(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    candidate_id = make_user("candidate@example.com")
+    interview_id = make_interview(employer_id, candidate_id)
+    headers = auth_header(login("candidate@example.com")["access_token"])
+    body = b"\x1aE\xdf\xa3" + b"0" * 2048
+
+    response = client.post(
+        f"/api/interviews/{interview_id}/recordings",
+        json={"size": len(body), "content_type": "video/webm;codecs=vp8,opus"},
+        headers=headers
+    )
+    assert response.status_code == 201
+    upload_id = response.get_json()["upload"]["upload_id"]
+
+    response = client.patch(
+        f"/api/recordings/uploads/{upload_id}", data=body, headers={**headers, "Upload-Offset": "0"}
+    )
+    assert response.status_code == 200
+    response = client.post(f"/api/recordings/uploads/{upload_id}/complete", headers=headers)
+    assert response.status_code == 200
+    recording_id = response.get_json()["recording"]["id"]
+
+    response = client.get(f"/api/recordings/{recording_id}", headers={**headers, "Range": "bytes=0-3"})
+    assert response.status_code == 206
+    assert response.data == body[:4]
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert "private" in response.headers["Cache-Control"]
+    assert "public" not in response.headers["Cache-Control"]
+
+
+def test_rejects_non_media_content_type(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    candidate_id = make_user("candidate@example.com")
+    interview_id = make_interview(employer_id, candidate_id)
+    headers = auth_header(login("candidate@example.com")["access_token"])
+
+    for content_type in ("text/html", "image/svg+xml", "video/webm\r\nX-Injected: 1"):
+        response = client.post(
+            f"/api/interviews/{interview_id}/recordings",
+            json={"size": 10, "content_type": content_type},
+            headers=headers
+        )
+        assert response.status_code == 400
+
+
+def test_resume_reports_bytes_on_disk(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    candidate_id = make_user("candidate@example.com")
+    interview_id = make_interview(employer_id, candidate_id)
+    headers = auth_header(login("candidate@example.com")["access_token"])
+
+    response = client.post(f"/api/interviews/{interview_id}/recordings", json={}, headers=headers)
+    upload_id = response.get_json()["upload"]["upload_id"]
+
+    # Bytes written before a dropped connection never reach the database
+    from utils.recording_store import part_path
+    with open(part_path(upload_id), "wb") as part:
+        part.write(b"x" * 100)
+
+    response = client.get(f"/api/recordings/uploads/{upload_id}", headers=headers)
+    assert response.get_json()["offset"] == 100
+    assert response.headers["Upload-Offset"] == "100"
+
+    response = client.patch(
+        f"/api/recordings/uploads/{upload_id}", data=b"y" * 10, headers={**headers, "Upload-Offset": "0"}
+    )
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 100
+
+    response = client.patch(
+        f"/api/recordings/uploads/{upload_id}", data=b"y" * 10, headers={**headers, "Upload-Offset": "100"}
+    )
+    assert response.get_json()["offset"] == 110
+
+
+def test_chunks_are_not_limited_by_max_content_length(app, client, make_user, make_interview, login, monkeypatch):
+    employer_id = make_user("employer@example.com", kind="employer")
+    candidate_id = make_user("candidate@example.com")
+    interview_id = make_interview(employer_id, candidate_id)
+    headers = auth_header(login("candidate@example.com")["access_token"])
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", 64)
+
+    response = client.post(
+        f"/api/interviews/{interview_id}/recordings", json={"content_type": "x" * 100}, headers=headers
+    )
+    assert response.status_code == 413
+    assert "error" in response.get_json()
+
+    response = client.post(f"/api/interviews/{interview_id}/recordings", json={}, headers=headers)
+    upload_id = response.get_json()["upload"]["upload_id"]
+    response = client.patch(
+        f"/api/recordings/uploads/{upload_id}", data=b"y" * 100, headers={**headers, "Upload-Offset": "0"}
+    )
+    assert response.get_json()["offset"] == 100
+
+
+def test_chunk_writes_are_locked_across_processes(client, make_user, make_interview, login):
+    import fcntl
+    from utils.recording_store import part_path
+
+    employer_id = make_user("employer@example.com", kind="employer")
+    candidate_id = make_user("candidate@example.com")
+    interview_id = make_interview(employer_id, candidate_id)
+    headers = auth_header(login("candidate@example.com")["access_token"])
+    response = client.post(f"/api/interviews/{interview_id}/recordings", json={}, headers=headers)
+    upload_id = response.get_json()["upload"]["upload_id"]
+
+    # Another worker is writing a chunk of this upload
+    with open(part_path(upload_id), "ab") as part:
+        fcntl.flock(part, fcntl.LOCK_EX)
+        response = client.patch(
+            f"/api/recordings/uploads/{upload_id}", data=b"y" * 10, headers={**headers, "Upload-Offset": "0"}
+        )
+        assert response.status_code == 409
+        assert client.post(f"/api/recordings/uploads/{upload_id}/complete", headers=headers).status_code == 409
+
+    response = client.patch(
+        f"/api/recordings/uploads/{upload_id}", data=b"y" * 10, headers={**headers, "Upload-Offset": "0"}
+    )
+    assert response.get_json()["offset"] == 10
@@ -0,0 +1,36 @@
+import pytest
+
+
+def test_numeric_string_options_are_coerced(client):
+    response = client.post(
+        "/api/generate-response",
+        json={"transcript": "I like testing.", "options": {"temperature": "0", "maxTokens": "50"}}
+    )
+    assert response.status_code == 200
+
+
+def test_invalid_temperature_is_rejected(client):
+    for temperature in ("warm", None, 3):
+        response = client.post(
+            "/api/generate-response", json={"transcript": "I like testing.", "options": {"temperature": temperature}}
+        )
+        assert response.status_code == 400
+
+
+def test_non_object_options_are_rejected(client):
+    for options in ("fast", [1], 3):
+        response = client.post("/api/generate-response", json={"transcript": "I like testing.", "options": options})
+        assert response.status_code == 400
+    assert client.post("/api/generate-response", json=["transcript"]).status_code == 400
+
+
+def test_non_object_options_are_rejected_before_the_cache(client, monkeypatch):
+    from routes.response_generation import CompletionOptionsError, completion_settings
+    from utils import response_cache
+
+    monkeypatch.setattr(response_cache, "response_cache", response_cache.ResponseCache(10, 60))
+    response = client.post("/api/generate-response", json={"transcript": "I like testing.", "options": ["cache"]})
+    assert response.status_code == 400
+
+    with pytest.raises(CompletionOptionsError):
+        completion_settings("fast")
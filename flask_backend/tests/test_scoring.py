@@ -0,0 +1,29 @@
+import pytest
+
+from conftest import auth_header
+from utils.interview_scoring import is_allowed_recording_url, open_recording
+
+
+@pytest.mark.parametrize("recording_url", [
+    "/etc/passwd",
+    "file:///etc/passwd",
+    "http://169.254.169.254/latest/meta-data/",
+    "https://example.com/recording.webm"
+])
+def test_open_recording_refuses_other_sources(recording_url):
+    assert not is_allowed_recording_url(recording_url)
+    with pytest.raises(ValueError):
+        open_recording(recording_url)
+
+
+def test_score_rejects_disallowed_recording_url(client, make_user, make_interview, login):
+    employer_id = make_user("employer@example.com", kind="employer")
+    interview_id = make_interview(employer_id, recording_url="/etc/passwd")
+    headers = auth_header(login("employer@example.com")["access_token"])
+
+    response = client.post(f"/api/interviews/{interview_id}/score", json={}, headers=headers)
+    assert response.status_code == 400
+
+    # A transcript in the body doesn't touch the recording
+    response = client.post(f"/api/interviews/{interview_id}/score", json={"transcript": "Hi"}, headers=headers)
+    assert response.status_code == 202
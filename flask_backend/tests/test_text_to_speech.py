@@ -0,0 +1,31 @@
+import pytest
+
+from utils import speech
+
+
+def test_streaming_is_limited_to_concatenable_formats(client):
+    response = client.post("/api/text-to-speech", json={"text": "One. Two.", "options": {"stream": True, "format": "wav"}})
+    assert response.status_code == 400
+
+    response = client.post("/api/text-to-speech", json={"text": "One. Two.", "options": {"stream": True}})
+    assert response.status_code == 200
+    assert response.mimetype == "audio/mpeg"
+    assert response.data
+
+
+def test_mid_stream_failure_aborts_the_response(client, monkeypatch):
+    synthesize = speech.synthesize_speech
+
+    def fail_second_sentence(client, text, options):
+        if text.startswith("Second"):
+            raise RuntimeError("upstream failed")
+        return synthesize(client, text, options)
+
+    monkeypatch.setattr(speech, "synthesize_speech", fail_second_sentence)
+    response = client.post(
+        "/api/text-to-speech", json={"text": "First sentence here. Second sentence here.", "options": {"stream": True}},
+        buffered=False
+    )
+    assert response.status_code == 200
+    with pytest.raises(RuntimeError):
+        response.get_data()
@@ -0,0 +1,55 @@
+import io
+
+
+def test_multipart_chunks_are_transcribed_after_the_request(client):
+    response = client.post("/api/transcribe/sessions", json={"options": {"language": "en"}})
+    assert response.status_code == 201
+    session_id = response.get_json()["session_id"]
+
+    for _ in range(2):
+        response = client.post(
+            f"/api/transcribe/sessions/{session_id}/chunks",
+            data={"audio": (io.BytesIO(b"RIFF" + b"\0" * 512), "chunk.wav", "audio/wav")},
+            content_type="multipart/form-data"
+        )
+        assert response.status_code == 202
+
+    response = client.post(f"/api/transcribe/sessions/{session_id}/finish", json={"timeout": 10})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["chunks_transcribed"] == 2
+    assert body["errors"] == []
+    assert body["text"]
+
+
+def test_finish_rejects_invalid_timeout(client):
+    session_id = client.post("/api/transcribe/sessions", json={}).get_json()["session_id"]
+
+    for timeout in ("soon", -1, 3600, True):
+        response = client.post(f"/api/transcribe/sessions/{session_id}/finish", json={"timeout": timeout})
+        assert response.status_code == 400
+
+
+def test_chunks_left_by_another_worker_are_picked_up_on_finish(client):
+    import fcntl
+    from utils.transcription_sessions import get_session
+
+    session_id = client.post("/api/transcribe/sessions", json={}).get_json()["session_id"]
+    session = get_session(session_id)
+
+    # Another worker holds the drain lock, then exits before draining
+    with open(session._path("drain.lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        response = client.post(
+            f"/api/transcribe/sessions/{session_id}/chunks",
+            data={"audio": (io.BytesIO(b"RIFF" + b"\0" * 512), "chunk.wav", "audio/wav")},
+            content_type="multipart/form-data"
+        )
+        assert response.status_code == 202
+        session.drain()
+        assert client.get(f"/api/transcribe/sessions/{session_id}").get_json()["chunks_transcribed"] == 0
+
+    response = client.post(f"/api/transcribe/sessions/{session_id}/finish", json={"timeout": 10})
+    assert response.status_code == 200
+    assert response.get_json()["chunks_transcribed"] == 1
+    assert get_session(session_id) is None
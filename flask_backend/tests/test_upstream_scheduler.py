@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+from utils.upstream_scheduler import (
+    PRIORITY_BATCH, PRIORITY_DEFAULT, PRIORITY_INTERACTIVE, UpstreamScheduler, limit_priority, resolve_priority
+)
+
+
+def test_only_named_priorities_are_accepted():
+    assert resolve_priority("batch") == PRIORITY_BATCH
+    assert resolve_priority("default") == PRIORITY_DEFAULT
+    assert resolve_priority(-100) == PRIORITY_INTERACTIVE
+    assert resolve_priority("urgent") == PRIORITY_INTERACTIVE
+
+
+def test_interactive_requires_authentication():
+    assert resolve_priority("interactive", authenticated=False) == PRIORITY_DEFAULT
+    assert resolve_priority(None, authenticated=False) == PRIORITY_DEFAULT
+    assert resolve_priority("batch", authenticated=False) == PRIORITY_BATCH
+    assert limit_priority({"priority": "interactive", "voice": "nova"}, False) == {
+        "priority": "default", "voice": "nova"
+    }
+
+
+def test_async_waiter_wakes_when_the_queue_moves():
+    # One request per minute: the second waiter is only admitted once the
+    # first, queued ahead of it, gives up its place
+    scheduler = UpstreamScheduler({"model": {"rpm": 1}}, queue_timeout=5)
+    scheduler.acquire("model")
+
+    async def wait_behind_cancelled_ticket():
+        holder = threading.Event()
+
+        def block_head():
+            with scheduler.condition:
+                ticket = scheduler._enqueue("model", 0, PRIORITY_INTERACTIVE)
+            holder.wait()
+            with scheduler.condition:
+                scheduler._dequeue(ticket)
+                # Refill so the async waiter can be admitted
+                scheduler._state("model").requests.tokens = 1
+
+        thread = threading.Thread(target=block_head)
+        thread.start()
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(scheduler.acquire_async("model", priority=PRIORITY_DEFAULT))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        started = time.monotonic()
+        holder.set()
+        await asyncio.wait_for(waiter, 1)
+        thread.join()
+        return time.monotonic() - started
+
+    assert asyncio.run(wait_behind_cancelled_ticket()) < 1
+
+
+def test_retry_after_beyond_the_deadline_fails_fast():
+    import httpx
+    import openai
+    import pytest
+    from utils.upstream_scheduler import UpstreamBusyError
+
+    response = httpx.Response(429, headers={"retry-after": "60"}, request=httpx.Request("POST", "http://upstream"))
+    calls = []
+
+    def rate_limited():
+        calls.append(1)
+        raise openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+    scheduler = UpstreamScheduler({"model": {"rpm": 0}}, queue_timeout=1)
+    started = time.monotonic()
+    with pytest.raises(UpstreamBusyError) as excinfo:
+        scheduler.call(rate_limited, "model")
+    assert time.monotonic() - started < 0.5
+    assert excinfo.value.retry_after == 60
+    assert len(calls) == 1
+
+
+def test_budgets_are_shared_between_processes():
+    scheduler = UpstreamScheduler({"model": {"rpm": 600, "tpm": 90000}}, processes=3)
+    state = scheduler._state("model")
+    assert state.requests.capacity == 200
+    assert state.tokens.capacity == 30000
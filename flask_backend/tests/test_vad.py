@@ -0,0 +1,70 @@
+import io
+import time
+import numpy as np
+import pytest
+
+from utils import vad
+
+
+def test_segments_from_mapped_pcm_match_float_samples(tmp_path, monkeypatch):
+    # Small windows so the recording spans several of them
+    monkeypatch.setattr(vad, "VAD_WINDOW_SECONDS", 7)
+    rng = np.random.default_rng(0)
+    sample_rate = 16000
+    samples = np.concatenate([
+        rng.normal(0, 0.001, sample_rate * 20),
+        rng.normal(0, 0.3, sample_rate * 15),
+        rng.normal(0, 0.001, sample_rate * 10)
+    ]).astype(np.float32)
+
+    path = tmp_path / "audio.pcm"
+    path.write_bytes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    mapped = np.memmap(path, dtype=np.int16, mode="r")
+
+    segments = vad.speech_segments(mapped)
+    assert segments == vad.speech_segments(samples)
+    assert len(segments) == 1
+    assert segments[0][0] == pytest.approx(20, abs=1)
+    assert segments[0][1] == pytest.approx(35, abs=1)
+
+
+def test_short_recordings_are_not_decoded(monkeypatch):
+    monkeypatch.setattr(vad, "vad_available", lambda: True)
+    monkeypatch.setattr(vad, "probe_duration", lambda audio_file, timeout: 5.0)
+
+    def decode(audio_file, timeout):
+        raise AssertionError("decoded a recording shorter than VAD_MIN_DURATION")
+
+    monkeypatch.setattr(vad, "decoded_pcm", decode)
+    audio_file = ("answer.webm", io.BytesIO(b"audio"), "audio/webm")
+    assert vad.transcribe_with_vad(None, audio_file) is None
+
+
+def test_failed_segment_cancels_the_rest(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import contextmanager
+
+    monkeypatch.setattr(vad, "vad_available", lambda: True)
+    monkeypatch.setattr(vad, "probe_duration", lambda audio_file, timeout: None)
+    monkeypatch.setattr(vad, "vad_executor", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(vad, "speech_segments", lambda samples: [(0, 10), (20, 30), (40, 50)])
+
+    @contextmanager
+    def decoded(audio_file, timeout):
+        yield np.zeros(16000 * 60, dtype=np.int16)
+
+    monkeypatch.setattr(vad, "decoded_pcm", decoded)
+    calls = []
+
+    def transcribe(client, samples, start, end, options, priority):
+        calls.append(start)
+        if start:
+            time.sleep(0.2)
+        raise RuntimeError("upstream failed")
+
+    monkeypatch.setattr(vad, "_transcribe_segment", transcribe)
+    audio_file = ("answer.webm", io.BytesIO(b"audio"), "audio/webm")
+    with pytest.raises(RuntimeError):
+        vad.transcribe_with_vad(None, audio_file, {"vad": True})
+    # The second segment may already have been picked up, the last never is
+    assert calls[0] == 0 and 40 not in calls
@@ -0,0 +1,188 @@
+
+"""
+Audio preprocessing before Whisper uploads
+
+Browser recordings are often WebM/Opus inside a video container, recorded in
+stereo at 48 kHz. Whisper only needs mono 16 kHz speech, so ffmpeg extracts the
+audio track, downmixes and resamples it, trims leading and trailing silence and
+re-encodes it as low-bitrate Opus. Any failure, or a result that isn't
+smaller, falls back to the original upload.
+"""
+
+import contextlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+FFMPEG_BINARY = os.environ.get("FFMPEG_PATH") or shutil.which("ffmpeg")
+FFPROBE_BINARY = os.environ.get("FFPROBE_PATH") or shutil.which("ffprobe")
+AUDIO_TRANSCODE_ENABLED = os.environ.get("AUDIO_TRANSCODE_ENABLED", "true").lower() == "true"
+
+# Concurrent ffmpeg processes and the time budget for one upload
+AUDIO_TRANSCODE_WORKERS = int(os.environ.get("AUDIO_TRANSCODE_WORKERS", os.cpu_count() or 2))
+AUDIO_TRANSCODE_TIMEOUT = float(os.environ.get("AUDIO_TRANSCODE_TIMEOUT", 20))
+# Budget for full interview recordings transcoded by background jobs
+AUDIO_TRANSCODE_BATCH_TIMEOUT = float(os.environ.get("AUDIO_TRANSCODE_BATCH_TIMEOUT", 300))
+
+AUDIO_TRANSCODE_SAMPLE_RATE = 16000
+AUDIO_TRANSCODE_BITRATE = os.environ.get("AUDIO_TRANSCODE_BITRATE", "24k")
+AUDIO_TRANSCODE_SILENCE_DB = int(os.environ.get("AUDIO_TRANSCODE_SILENCE_DB", -45))
+
+# Short clips gain little from transcoding, send them as they are
+AUDIO_TRANSCODE_MIN_BYTES = int(os.environ.get("AUDIO_TRANSCODE_MIN_BYTES", 64 * 1024))
+
+COPY_CHUNK_BYTES = 64 * 1024
+
+ffmpeg_slots = threading.BoundedSemaphore(max(1, AUDIO_TRANSCODE_WORKERS))
+
+class TranscodeError(Exception):
+    """Raised when ffmpeg fails, is unavailable or runs out of time"""
+
+def ffmpeg_available():
+    return FFMPEG_BINARY is not None
+
+def run_ffmpeg(args, timeout=AUDIO_TRANSCODE_TIMEOUT, stdout=subprocess.DEVNULL):
+    """
+    Run ffmpeg with the given arguments in one of the bounded process slots.
+    Waiting for a slot counts against the same time budget.
+    """
+    if not ffmpeg_available():
+        raise TranscodeError("ffmpeg is not installed")
+
+    deadline = time.monotonic() + timeout
+    if not ffmpeg_slots.acquire(timeout=timeout):
+        raise TranscodeError("No ffmpeg slot available within the time budget")
+    try:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TranscodeError("Time budget exhausted before ffmpeg started")
+        result = subprocess.run(
+            [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", *args],
+            stdout=stdout, stderr=subprocess.PIPE, timeout=remaining
+        )
+    except subprocess.TimeoutExpired:
+        raise TranscodeError("ffmpeg exceeded the time budget")
+    finally:
+        ffmpeg_slots.release()
+
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip()[-500:]
+        raise TranscodeError(message or f"ffmpeg exited with status {result.returncode}")
+    return result
+
+def probe_duration(audio_file, timeout=AUDIO_TRANSCODE_TIMEOUT):
+    """
+    Duration in seconds of an OpenAI file tuple read from the container
+    metadata with ffprobe, without decoding the audio. Returns None when
+    ffprobe is unavailable or the container doesn't record a duration.
+    """
+    if FFPROBE_BINARY is None:
+        return None
+
+    filename, fileobj = audio_file[0], audio_file[1]
+    try:
+        with input_path(fileobj, filename) as path:
+            result = subprocess.run(
+                [FFPROBE_BINARY, "-v", "error", "-show_entries", "format=duration",
+                 "-of", "default=noprint_wrappers=1:nokey=1", path],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=timeout
+            )
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"Audio probe error: {str(e)}")
+        return None
+
+    try:
+        return float(result.stdout.decode("utf-8", "replace").strip())
+    except ValueError:
+        # WebM from MediaRecorder often has no duration ("N/A")
+        return None
+
+@contextlib.contextmanager
+def input_path(fileobj, filename):
+    """
+    Yield a path ffmpeg can seek in. Files already on disk are used as they
+    are; in-memory or spooled uploads are copied to a temporary file.
+    """
+    name = getattr(fileobj, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        yield name
+        return
+
+    suffix = os.path.splitext(filename or "")[1] or ".webm"
+    position = fileobj.tell()
+    with tempfile.NamedTemporaryFile(suffix=suffix) as copy:
+        shutil.copyfileobj(fileobj, copy, COPY_CHUNK_BYTES)
+        copy.flush()
+        fileobj.seek(position)
+        yield copy.name
+
+def _file_size(fileobj):
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(position)
+    return size
+
+def _trim_filter():
+    # silenceremove only trims the start, so reverse to trim the end as well
+    trim = (f"silenceremove=start_periods=1:start_duration=0.1:"
+            f"start_threshold={AUDIO_TRANSCODE_SILENCE_DB}dB")
+    return f"{trim},areverse,{trim},areverse"
+
+def transcode_for_whisper(audio_file, timeout=AUDIO_TRANSCODE_TIMEOUT):
+    """
+    Convert an OpenAI file tuple (filename, file object, content type) to mono
+    16 kHz Opus with silence trimmed. Returns a new tuple backed by a temporary
+    file, or raises TranscodeError.
+    """
+    filename, fileobj, _ = audio_file
+    output = tempfile.NamedTemporaryFile(suffix=".ogg")
+    try:
+        with input_path(fileobj, filename) as path:
+            run_ffmpeg([
+                "-i", path,
+                "-vn", "-map", "0:a:0",
+                "-ac", "1", "-ar", str(AUDIO_TRANSCODE_SAMPLE_RATE),
+                "-af", _trim_filter(),
+                "-c:a", "libopus", "-b:a", AUDIO_TRANSCODE_BITRATE, "-application", "voip",
+                output.name
+            ], timeout=timeout)
+    except Exception:
+        output.close()
+        raise
+
+    output.seek(0)
+    return ("audio.ogg", output, "audio/ogg")
+
+def prepare_for_whisper(audio_file, options=None, timeout=AUDIO_TRANSCODE_TIMEOUT):
+    """
+    Transcode an upload for Whisper when it helps, otherwise return it as is.
+    When a transcoded file is returned the original file object is closed,
+    so callers only need to close the file in the returned tuple.
+    """
+    options = options or {}
+    if not AUDIO_TRANSCODE_ENABLED or not ffmpeg_available() or options.get("preprocess") is False:
+        return audio_file
+
+    fileobj = audio_file[1]
+    original_size = _file_size(fileobj)
+    if original_size < AUDIO_TRANSCODE_MIN_BYTES:
+        return audio_file
+
+    try:
+        transcoded = transcode_for_whisper(audio_file, timeout)
+    except (TranscodeError, OSError) as e:
+        print(f"Audio transcoding skipped: {str(e)}")
+        return audio_file
+
+    # An empty result means the whole clip was silence; let Whisper decide
+    transcoded_size = _file_size(transcoded[1])
+    if transcoded_size == 0 or transcoded_size >= original_size:
+        transcoded[1].close()
+        return audio_file
+
+    fileobj.close()
+    return transcoded
@@ -0,0 +1,148 @@
+
+"""
+Helpers for reading audio uploads without extra in-memory copies
+"""
+
+import base64
+import io
+import json
+import os
+import tempfile
+
+# Largest audio upload accepted by the transcription routes
+MAX_AUDIO_UPLOAD_BYTES = int(os.environ.get("MAX_AUDIO_UPLOAD_BYTES", 50 * 1024 * 1024))
+
+# Uploads larger than this are spooled to a temporary file instead of memory
+AUDIO_SPOOL_BYTES = int(os.environ.get("AUDIO_SPOOL_BYTES", 1024 * 1024))
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# File extensions Whisper uses to detect the audio format
+AUDIO_EXTENSIONS = {
+    "audio/webm": "webm",
+    "video/webm": "webm",
+    "audio/ogg": "ogg",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/mp4": "m4a",
+    "video/mp4": "mp4",
+    "audio/x-m4a": "m4a",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/flac": "flac"
+}
+
+class AudioUploadError(Exception):
+    """Raised when an audio upload is missing, malformed or too large"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def audio_filename(mime_type, default="webm"):
+    """Build a filename whose extension matches the audio content type"""
+    base_type = (mime_type or "").split(";")[0].strip().lower()
+    return f"audio.{AUDIO_EXTENSIONS.get(base_type, default)}"
+
+def _parse_options(value):
+    """Parse a JSON options string sent alongside a binary upload"""
+    if not value:
+        return {}
+    try:
+        options = json.loads(value)
+    except ValueError:
+        raise AudioUploadError("Invalid options JSON")
+    if not isinstance(options, dict):
+        raise AudioUploadError("Invalid options JSON")
+    return options
+
+def query_options(args):
+    """Collect transcription options passed as query parameters"""
+    options = _parse_options(args.get("options"))
+    for name in ("language", "prompt"):
+        if name in args:
+            options[name] = args[name]
+    if "temperature" in args:
+        options["temperature"] = args.get("temperature", type=float)
+    return options
+
+def _spool_stream(stream, max_bytes):
+    """Copy a request body stream into a spooled temporary file"""
+    spool = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPOOL_BYTES)
+    size = 0
+    try:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise AudioUploadError("Audio upload too large", 413)
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    
+    spool.seek(0)
+    return spool, size
+
+def copy_audio_file(audio_file, max_bytes=MAX_AUDIO_UPLOAD_BYTES):
+    """
+    Copy an OpenAI file tuple into a spooled file owned by the caller, for
+    audio used after the request ends (multipart uploads are closed with it)
+    """
+    filename, fileobj, content_type = audio_file
+    fileobj.seek(0)
+    spool, _ = _spool_stream(fileobj, max_bytes)
+    return (filename, spool, content_type)
+
+def read_audio_upload(req, max_bytes=MAX_AUDIO_UPLOAD_BYTES):
+    """
+    Read audio from a raw audio/* body, a multipart form or base64 JSON.
+    Returns an OpenAI file tuple (filename, file object, content type)
+    and the transcription options. The caller should close the file object.
+    """
+    if req.content_length is not None and req.content_length > max_bytes:
+        raise AudioUploadError("Audio upload too large", 413)
+    
+    mime_type = req.mimetype or ""
+    
+    # Raw audio body, streamed straight into a spooled file
+    if mime_type.startswith("audio/") or mime_type.startswith("video/"):
+        spool, size = _spool_stream(req.stream, max_bytes)
+        if size == 0:
+            spool.close()
+            raise AudioUploadError("Missing audio data")
+        return (audio_filename(mime_type), spool, mime_type), query_options(req.args)
+    
+    # Multipart form: werkzeug already spools large files to disk
+    if mime_type == "multipart/form-data":
+        upload = req.files.get("audio") or req.files.get("file")
+        if upload is None:
+            raise AudioUploadError("Missing audio data")
+        
+        upload.stream.seek(0, os.SEEK_END)
+        if upload.stream.tell() > max_bytes:
+            upload.close()
+            raise AudioUploadError("Audio upload too large", 413)
+        upload.stream.seek(0)
+        
+        options = _parse_options(req.form.get("options"))
+        filename = upload.filename or audio_filename(upload.mimetype)
+        return (filename, upload.stream, upload.mimetype), options
+    
+    # Legacy JSON body with base64 encoded audio
+    data = req.get_json(silent=True)
+    if not isinstance(data, dict) or "audio_data" not in data:
+        raise AudioUploadError("Missing audio data")
+    if not isinstance(data.get("options", {}), dict):
+        raise AudioUploadError("Invalid options")
+    
+    try:
+        audio_bytes = base64.b64decode(data["audio_data"])
+    except ValueError:
+        raise AudioUploadError("Invalid base64 audio data")
+    
+    mime_type = data.get("mime_type", "")
+    return (audio_filename(mime_type), io.BytesIO(audio_bytes), mime_type or None), data.get("options", {})
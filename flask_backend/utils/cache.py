@@ -0,0 +1,105 @@
+
+"""
+Thread-safe in-process LRU cache with optional TTL and byte budget
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """LRU cache bounded by entry count and/or total size in bytes"""
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (value, size, expires_at)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Return a cached value and mark it as recently used"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value, evicting least recently used entries as needed"""
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        
+        with self.lock:
+            # The replaced value no longer counts towards the byte budget
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            
+            # Too large to cache; the old value is stale either way
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            
+            self.entries[key] = (value, size, expires_at)
+            self.total_bytes += size
+            
+            while self.entries and (
+                (self.max_entries is not None and len(self.entries) > self.max_entries) or
+                (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        """Drop all entries"""
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
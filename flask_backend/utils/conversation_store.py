@@ -0,0 +1,204 @@
+
+"""
+Server-side conversation history for generate-response
+
+Each conversation keeps its recent turns verbatim and folds older turns into a
+short memo once the history exceeds a token budget, so prompt size stays flat
+over a long interview. Messages are laid out as a fixed system prompt, then the
+memo, then the turns in order, so consecutive requests share the longest
+possible prefix and can hit the upstream prompt cache. The memo only changes
+when a summary completes.
+
+Conversations belong to the authenticated user that created them and are
+looked up by (owner, id), so one user's ids never reach another's history.
+They are stored in the conversations table, so every worker process and
+replica sees the same history.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from models.conversation import StoredConversation
+from models.user import db
+from utils.openai_client import upstream_timeout
+from utils.upstream_scheduler import PRIORITY_BATCH, estimate_chat_tokens, schedule
+
+# Tokens of verbatim history kept before older turns are summarized
+CONVERSATION_TOKEN_BUDGET = int(os.environ.get("CONVERSATION_TOKEN_BUDGET", 3000))
+# Tokens of recent history left verbatim after a summary
+CONVERSATION_KEEP_TOKENS = int(os.environ.get("CONVERSATION_KEEP_TOKENS", 1000))
+# Hard limit on history sent upstream while a summary is still running
+CONVERSATION_MAX_HISTORY_TOKENS = int(os.environ.get("CONVERSATION_MAX_HISTORY_TOKENS", 6000))
+
+CONVERSATION_TTL = int(os.environ.get("CONVERSATION_TTL", 3 * 3600))
+# A summary still marked as running after this long is assumed lost (e.g. its worker exited)
+CONVERSATION_SUMMARY_TIMEOUT = int(os.environ.get("CONVERSATION_SUMMARY_TIMEOUT", 300))
+CONVERSATION_SUMMARY_MODEL = os.environ.get("CONVERSATION_SUMMARY_MODEL", "gpt-4o-mini")
+CONVERSATION_SUMMARY_WORKERS = int(os.environ.get("CONVERSATION_SUMMARY_WORKERS", 2))
+
+MAX_CONVERSATION_ID_LENGTH = 128
+
+SUMMARY_PROMPT = """
+You maintain notes for an AI interviewer during a job interview.
+Update the existing notes with the new exchanges below. Keep every fact the
+candidate shared (experience, skills, projects, numbers), the questions already
+asked and any follow-ups that are still open. Write at most 200 words of terse
+bullet points. Respond with the updated notes only.
+"""
+
+summary_executor = ThreadPoolExecutor(max_workers=CONVERSATION_SUMMARY_WORKERS, thread_name_prefix="conversation-summary")
+
+def estimate_tokens(message):
+    """Rough token count of one chat message"""
+    return len(message["content"] or "") // 4 + 4
+
+def summarize_turns(client, memo, turns):
+    """Fold turns into the memo with a low-priority completion"""
+    exchanges = "\n\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    params = {
+        "model": CONVERSATION_SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Existing notes:\n{memo or '(none)'}\n\nNew exchanges:\n{exchanges}"}
+        ],
+        "temperature": 0.2,
+        "max_tokens": 400
+    }
+    response = schedule(
+        lambda: client.chat.completions.create(timeout=upstream_timeout("chat"), **params),
+        CONVERSATION_SUMMARY_MODEL, estimate_chat_tokens(params), PRIORITY_BATCH
+    )
+    return response.choices[0].message.content.strip()
+
+class Conversation:
+    """Memo plus recent turns of one interview conversation, stored in the database"""
+
+    def __init__(self, conversation_id, owner_id):
+        self.id = conversation_id
+        self.owner_id = owner_id
+
+    def _row(self, for_update=False):
+        query = StoredConversation.query.filter_by(owner_id=self.owner_id, conversation_id=self.id)
+        if for_update:
+            query = query.with_for_update()
+        return query.first()
+
+    @staticmethod
+    def history_tokens(turns):
+        return sum(estimate_tokens(turn) for turn in turns)
+
+    @staticmethod
+    def _summarizing(row):
+        return (row.summary_started_at is not None and
+                row.summary_started_at > datetime.utcnow() - timedelta(seconds=CONVERSATION_SUMMARY_TIMEOUT))
+
+    def build_messages(self, system_prompt, user_content):
+        """Prompt messages with a prefix that only grows between summaries"""
+        row = self._row()
+        memo, history = (row.memo, row.turns_data) if row is not None else ("", [])
+        messages = [{"role": "system", "content": system_prompt}]
+        if memo:
+            messages.append({"role": "system", "content": f"Notes on the interview so far:\n{memo}"})
+
+        # Drop the oldest exchanges if summaries have fallen behind
+        while len(history) > 2 and self.history_tokens(history) > CONVERSATION_MAX_HISTORY_TOKENS:
+            history = history[2:]
+
+        return messages + history + [{"role": "user", "content": user_content}]
+
+    def record(self, user_content, reply, client):
+        """Append a completed exchange and summarize older turns if over budget"""
+        row = self._row(for_update=True)
+        if row is None:
+            # Deleted while the reply was being generated
+            db.session.rollback()
+            return
+        turns = row.turns_data + [{"role": "user", "content": user_content}, {"role": "assistant", "content": reply}]
+        row.turns = json.dumps(turns)
+
+        summarize = None
+        if not self._summarizing(row) and self.history_tokens(turns) > CONVERSATION_TOKEN_BUDGET:
+            # Summarize whole exchanges from the front until the rest fits
+            count = 0
+            while count < len(turns) - 2 and self.history_tokens(turns[count:]) > CONVERSATION_KEEP_TOKENS:
+                count += 2
+            if count:
+                row.summary_started_at = datetime.utcnow()
+                summarize = (row.memo, turns[:count])
+        db.session.commit()
+
+        if summarize is not None:
+            summary_executor.submit(self._summarize, current_app._get_current_object(), client, *summarize)
+
+    def _summarize(self, app, client, memo, turns):
+        try:
+            new_memo = summarize_turns(client, memo, turns)
+        except Exception as e:
+            print(f"Conversation summary error: {str(e)}")
+            new_memo = None
+
+        with app.app_context():
+            try:
+                row = self._row(for_update=True)
+                if row is None:
+                    return
+                if new_memo is not None:
+                    # Turns are only appended, so the summarized ones are still at the front
+                    row.memo = new_memo
+                    row.turns = json.dumps(row.turns_data[len(turns):])
+                    row.summaries += 1
+                row.summary_started_at = None
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Conversation summary error: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def to_dict(self):
+        row = self._row()
+        turns = row.turns_data if row is not None else []
+        return {
+            "conversation_id": self.id,
+            "memo": row.memo if row is not None else "",
+            "turns": len(turns),
+            "history_tokens": self.history_tokens(turns),
+            "summaries": row.summaries if row is not None else 0,
+            "summarizing": row is not None and self._summarizing(row)
+        }
+
+def _conversation_filter(conversation_id, owner_id):
+    return {"owner_id": int(owner_id), "conversation_id": str(conversation_id)[:MAX_CONVERSATION_ID_LENGTH]}
+
+def get_conversation(conversation_id, owner_id, create=True):
+    """Look up one of the owner's conversations; expired ones start over"""
+    key = _conversation_filter(conversation_id, owner_id)
+    cutoff = datetime.utcnow() - timedelta(seconds=CONVERSATION_TTL)
+    row = StoredConversation.query.filter_by(**key).first()
+    if row is not None and row.updated_at is not None and row.updated_at < cutoff:
+        db.session.delete(row)
+        db.session.commit()
+        row = None
+
+    if row is None:
+        if not create:
+            return None
+        # Creating a conversation also clears out everyone's expired ones
+        StoredConversation.query.filter(StoredConversation.updated_at < cutoff).delete()
+        db.session.add(StoredConversation(**key))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Created by a concurrent request for the same conversation
+            db.session.rollback()
+    return Conversation(key["conversation_id"], key["owner_id"])
+
+def delete_conversation(conversation_id, owner_id):
+    deleted = StoredConversation.query.filter_by(**_conversation_filter(conversation_id, owner_id)).delete()
+    db.session.commit()
+    return deleted > 0
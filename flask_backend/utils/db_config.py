@@ -0,0 +1,68 @@
+
+"""
+Database engine configuration from environment variables
+"""
+
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Server-side statement timeout for PostgreSQL (0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 0))
+
+# SQLite pragmas for single-node deployments
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+def _is_memory_sqlite(url):
+    return url.database in (None, "", ":memory:")
+
+def engine_options(database_uri):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    url = make_url(database_uri)
+    
+    # In-memory SQLite uses a single shared connection, so pooling doesn't apply
+    if url.get_backend_name() == "sqlite" and _is_memory_sqlite(url):
+        return {}
+    
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+    
+    if url.get_backend_name() == "sqlite":
+        # Wait for the write lock instead of failing with "database is locked"
+        options["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000, "check_same_thread": False}
+    else:
+        options["pool_recycle"] = DB_POOL_RECYCLE
+        # Reuse the most recently returned connection so idle ones can expire
+        options["pool_use_lifo"] = True
+        if url.get_backend_name() == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    
+    return options
+
+def configure_engine(engine):
+    """Apply per-connection settings, such as SQLite pragmas, to an engine"""
+    if engine.dialect.name != "sqlite" or _is_memory_sqlite(engine.url):
+        return
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.close()
@@ -0,0 +1,163 @@
+
+"""
+Post-interview scoring pipeline run by the background job queue
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from urllib.parse import urlsplit
+import httpx
+
+from models.interview import Interview
+from models.user import db
+from utils.audio_transcode import AUDIO_TRANSCODE_BATCH_TIMEOUT, prepare_for_whisper
+from utils.audio_upload import AUDIO_SPOOL_BYTES, MAX_AUDIO_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES, audio_filename
+from utils.job_queue import JobRetryLater, job_handler, save_progress
+from utils.openai_client import get_openai_client, upstream_timeout
+from utils.recording_store import resolve_recording_path
+from utils.upstream_scheduler import PRIORITY_BATCH, estimate_chat_tokens, schedule
+from utils.vad import transcribe_with_vad
+
+SCORING_MODEL = os.environ.get("SCORING_MODEL", "gpt-4o-mini")
+
+# Hosts remote recordings may be downloaded from, comma separated; recordings
+# uploaded to this backend are always allowed, anything else is refused
+RECORDING_URL_HOSTS = {
+    host.strip().lower() for host in os.environ.get("RECORDING_URL_HOSTS", "").split(",") if host.strip()
+}
+
+# Longest transcript sent to the scoring model
+MAX_SCORING_TRANSCRIPT_CHARS = 60000
+
+SCORING_PROMPT = """
+You are an expert interviewer reviewing a completed job interview.
+Interview title: {title}
+Interview description: {description}
+
+Read the transcript of the candidate's interview and evaluate their answers.
+Respond with a JSON object with exactly two keys:
+"score": a number from 0 to 100 rating the candidate's overall performance,
+"feedback": a concise paragraph of constructive feedback for the employer.
+"""
+
+def is_allowed_recording_url(recording_url):
+    """Whether a recording URL is a stored recording or on an allowed host"""
+    if resolve_recording_path(recording_url):
+        return True
+    parts = urlsplit(recording_url or "")
+    return parts.scheme in ("http", "https") and (parts.hostname or "") in RECORDING_URL_HOSTS
+
+def open_recording(recording_url):
+    """Open a stored recording, or one on an allowed host, as a file object"""
+    # Recordings uploaded to this backend are read straight from the store
+    local_path = resolve_recording_path(recording_url)
+    if local_path:
+        return open(local_path, "rb")
+    
+    # Never read local paths or arbitrary URLs named by a user
+    if not is_allowed_recording_url(recording_url):
+        raise ValueError("Recording URL is not a stored recording or on an allowed host")
+    
+    # Stream remote recordings into a spooled file instead of memory; redirects
+    # are not followed since they could lead off the allowed hosts
+    spool = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPOOL_BYTES)
+    try:
+        with httpx.stream("GET", recording_url, timeout=upstream_timeout("transcription")) as response:
+            response.raise_for_status()
+            size = 0
+            for chunk in response.iter_bytes(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_AUDIO_UPLOAD_BYTES:
+                    raise ValueError("Recording is too large to transcribe")
+                spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    
+    spool.seek(0)
+    return spool
+
+def transcribe_recording(client, recording_url):
+    """Transcribe a full interview recording at batch priority"""
+    extension = os.path.splitext(recording_url.split("?")[0])[1].lstrip(".") or "webm"
+    with open_recording(recording_url) as recording:
+        audio_file = (audio_filename(f"audio/{extension}", extension), recording, None)
+        
+        # Skip long pauses by transcribing only the speech segments
+        segmented = transcribe_with_vad(
+            client, audio_file, priority=PRIORITY_BATCH, timeout=AUDIO_TRANSCODE_BATCH_TIMEOUT
+        )
+        if segmented is not None:
+            return segmented["text"]
+        
+        audio_file = prepare_for_whisper(audio_file, timeout=AUDIO_TRANSCODE_BATCH_TIMEOUT)
+        try:
+            response = schedule(
+                lambda: client.audio.transcriptions.create(
+                    file=audio_file,
+                    model="whisper-1",
+                    timeout=upstream_timeout("transcription")
+                ),
+                "whisper-1", priority=PRIORITY_BATCH
+            )
+        finally:
+            audio_file[1].close()
+    return response.text
+
+def score_transcript(client, interview, transcript):
+    """Ask the LLM for a score and feedback on an interview transcript"""
+    params = {
+        "model": SCORING_MODEL,
+        "messages": [
+            {"role": "system", "content": SCORING_PROMPT.format(
+                title=interview.title, description=interview.description or "")},
+            {"role": "user", "content": transcript[:MAX_SCORING_TRANSCRIPT_CHARS]}
+        ],
+        "temperature": 0.2,
+        "max_tokens": 600
+    }
+    response = schedule(
+        lambda: client.chat.completions.create(
+            response_format={"type": "json_object"}, timeout=upstream_timeout("chat"), **params
+        ),
+        SCORING_MODEL, estimate_chat_tokens(params), PRIORITY_BATCH
+    )
+    
+    evaluation = json.loads(response.choices[0].message.content)
+    score = max(0.0, min(100.0, float(evaluation["score"])))
+    return score, str(evaluation["feedback"]).strip()
+
+@job_handler("score_interview")
+def score_interview(job):
+    """Transcribe the recording, generate feedback and a score, and update the interview"""
+    payload = job.payload_data
+    interview = db.session.get(Interview, payload["interview_id"])
+    if interview is None:
+        raise ValueError(f"Interview {payload['interview_id']} not found")
+    
+    # Already scored: retries and duplicate requests are no-ops
+    if interview.score is not None and interview.feedback and not payload.get("force"):
+        return {"interview_id": interview.id, "score": interview.score, "skipped": True}
+    
+    client = get_openai_client()
+    if not client:
+        raise JobRetryLater("OpenAI API key not configured", delay=300)
+    
+    transcript = payload.get("transcript") or job.progress_data.get("transcript")
+    if not transcript:
+        if not interview.recording_url:
+            raise ValueError(f"Interview {interview.id} has no recording or transcript")
+        transcript = transcribe_recording(client, interview.recording_url)
+        save_progress(job, transcript=transcript)
+    
+    score, feedback = score_transcript(client, interview, transcript)
+    
+    interview.score = score
+    interview.feedback = feedback
+    interview.status = 'completed'
+    interview.completed_at = interview.completed_at or datetime.utcnow()
+    db.session.commit()
+    
+    return {"interview_id": interview.id, "score": score}
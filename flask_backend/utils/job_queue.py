@@ -0,0 +1,177 @@
+
+"""
+Durable background job queue backed by the application database
+
+Jobs are rows in the `jobs` table. Worker threads claim them with a
+conditional UPDATE, so any number of workers and processes can share the
+queue safely. Failed jobs are retried with backoff up to max_attempts, and
+running jobs whose worker died are reclaimed after JOB_LOCK_TIMEOUT.
+"""
+
+import json
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.job import Job
+from models.user import db
+
+# Worker threads started inside each web process (0 to use `flask --app app work-jobs` instead)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 1))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 2))
+JOB_LOCK_TIMEOUT = int(os.environ.get("JOB_LOCK_TIMEOUT", 900))
+JOB_RETRY_BASE_DELAY = int(os.environ.get("JOB_RETRY_BASE_DELAY", 30))
+
+# Registered job handlers by kind
+job_handlers = {}
+
+# Workers started in this process
+running_workers = []
+
+class JobRetryLater(Exception):
+    """Raised by a handler to reschedule its job without counting a failure"""
+
+    def __init__(self, message, delay=JOB_RETRY_BASE_DELAY):
+        super().__init__(message)
+        self.delay = delay
+
+def job_handler(kind):
+    """Register a function(job) as the handler for a job kind"""
+    def decorator(fn):
+        job_handlers[kind] = fn
+        return fn
+    return decorator
+
+def enqueue_job(kind, payload, idempotency_key=None, owner_id=None, max_attempts=3, run_after=None):
+    """
+    Queue a job and return it. When a job with the same idempotency key
+    already exists, that job is returned instead of creating a duplicate.
+    """
+    if idempotency_key:
+        existing = Job.query.filter_by(idempotency_key=idempotency_key).first()
+        if existing:
+            return existing
+    
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        idempotency_key=idempotency_key,
+        owner_id=owner_id,
+        max_attempts=max_attempts,
+        run_after=run_after or datetime.utcnow()
+    )
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request queued the same job concurrently
+        db.session.rollback()
+        return Job.query.filter_by(idempotency_key=idempotency_key).first()
+    return job
+
+def save_progress(job, **progress):
+    """Checkpoint finished steps so a retried job can skip them"""
+    job.progress = json.dumps({**job.progress_data, **progress})
+    db.session.commit()
+
+def claim_next_job(worker_id):
+    """Atomically claim the next runnable job, or return None"""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=JOB_LOCK_TIMEOUT)
+    runnable = or_(
+        and_(Job.status == 'queued', Job.run_after <= now),
+        and_(Job.status == 'running', Job.locked_at < stale)
+    )
+    
+    candidates = db.session.execute(
+        select(Job.id).where(runnable).order_by(Job.run_after, Job.id).limit(5)
+    ).scalars().all()
+    
+    for job_id in candidates:
+        # Only one worker's conditional update can match the row
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, runnable)
+            .values(status='running', locked_by=worker_id, locked_at=now,
+                    attempts=Job.attempts + 1, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(Job, job_id)
+    return None
+
+def run_job(job):
+    """Run a claimed job and record its outcome"""
+    handler = job_handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind: {job.kind}")
+        result = handler(job)
+        job.status = 'succeeded'
+        job.result = json.dumps(result) if result is not None else None
+        job.error = None
+        job.completed_at = datetime.utcnow()
+    except JobRetryLater as e:
+        db.session.rollback()
+        job.status = 'queued'
+        job.attempts -= 1
+        job.error = str(e)
+        job.run_after = datetime.utcnow() + timedelta(seconds=e.delay)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Job {job.id} ({job.kind}) error: {str(e)}")
+        job.error = f"{str(e)}\n{traceback.format_exc(limit=5)}"
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.completed_at = datetime.utcnow()
+        else:
+            job.status = 'queued'
+            job.run_after = datetime.utcnow() + timedelta(seconds=JOB_RETRY_BASE_DELAY * 2 ** (job.attempts - 1))
+    
+    job.locked_by = None
+    job.locked_at = None
+    db.session.commit()
+
+class JobWorker(threading.Thread):
+    """Thread that polls for jobs and runs them inside an app context"""
+
+    def __init__(self, app, index=0):
+        super().__init__(name=f"job-worker-{index}", daemon=True)
+        self.app = app
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            ran_job = False
+            with self.app.app_context():
+                try:
+                    job = claim_next_job(self.worker_id)
+                    if job is not None:
+                        run_job(job)
+                        ran_job = True
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Job worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+            
+            # Keep draining while there is work, otherwise poll
+            if not ran_job:
+                self.stopped.wait(JOB_POLL_INTERVAL)
+
+    def stop(self):
+        self.stopped.set()
+
+def start_job_workers(app, count=JOB_WORKERS):
+    """Start background worker threads for this process, once"""
+    if not running_workers:
+        running_workers.extend(JobWorker(app, index) for index in range(count))
+        for worker in running_workers:
+            worker.start()
+    return running_workers
@@ -0,0 +1,53 @@
+"""
+JWTManager that remembers recently verified tokens
+"""
+
+import os
+import time
+from flask_jwt_extended import JWTManager, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.config import config
+
+from utils.cache import LRUCache
+
+JWT_VERIFY_CACHE_SIZE = int(os.environ.get("JWT_VERIFY_CACHE_SIZE", 10000))
+JWT_VERIFY_CACHE_TTL = int(os.environ.get("JWT_VERIFY_CACHE_TTL", 300))
+
+class CachingJWTManager(JWTManager):
+    """Skip signature verification and claim parsing for tokens seen recently
+
+    Only the decode step is cached. Revocation is still checked on every
+    request by the token_in_blocklist_loader, and a cached token is rejected
+    as soon as its exp claim has passed.
+    """
+
+    def __init__(self, app=None, cache_size=JWT_VERIFY_CACHE_SIZE, cache_ttl=JWT_VERIFY_CACHE_TTL, **kwargs):
+        self.verified_tokens = LRUCache(max_entries=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # CSRF double-submit checks compare per-request values, so never cache them
+        if self.verified_tokens is None or csrf_value is not None:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        
+        claims = self.verified_tokens.get(encoded_token)
+        if claims is not None:
+            expires = claims.get("exp")
+            if allow_expired or expires is None or time.time() <= expires + config.leeway:
+                return claims
+            # Let the full decode raise the usual ExpiredSignatureError
+            self.verified_tokens.pop(encoded_token)
+        
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        self.verified_tokens.set(encoded_token, claims)
+        return claims
+
+    def verify_cache_stats(self):
+        return self.verified_tokens.stats() if self.verified_tokens is not None else None
+
+def request_authenticated():
+    """Whether the current request carries a valid access token (for optional auth)"""
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    return get_jwt_identity() is not None
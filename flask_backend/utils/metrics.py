@@ -0,0 +1,454 @@
+
+"""
+In-process metrics exported in the Prometheus text format
+
+Counters and histograms are plain dicts guarded by one lock per metric, so
+recording a sample costs a dict lookup and a few additions. Three sources feed
+them: a WSGI middleware that times every request until its body has been
+sent, httpx event hooks that time upstream OpenAI calls (time to first byte
+and total), and SQLAlchemy cursor events that count queries per request.
+
+Values are kept per process. When METRICS_MULTIPROC_DIR is set, each process
+writes a snapshot of its values to that directory every
+METRICS_FLUSH_INTERVAL seconds (and whenever it serves a scrape), and a scrape
+of any worker sums the snapshots of every process. Snapshots of workers that
+have exited are kept, so counters never go backwards when a worker restarts.
+"""
+
+import bisect
+import contextvars
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import httpx
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Directory shared by all worker processes for aggregated metrics (empty: per process)
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, *labels, value=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.values.items())
+
+    def merge(self, totals, items):
+        """Add (labels, value) pairs, e.g. from another process, into totals"""
+        for labels, value in items:
+            labels = tuple(labels)
+            totals[labels] = totals.get(labels, 0) + value
+
+    def render(self, items=None):
+        if items is None:
+            items = self.snapshot()
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items]
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.values = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return [(labels, list(series)) for labels, series in self.values.items()]
+
+    def merge(self, totals, items):
+        """Add (labels, series) pairs, e.g. from another process, into totals"""
+        for labels, series in items:
+            # Snapshots written with other buckets can't be combined
+            if len(series) != len(self.buckets) + 2:
+                continue
+            total = totals.setdefault(tuple(labels), [0] * len(series))
+            for index, value in enumerate(series):
+                total[index] += value
+
+    def render(self, items=None):
+        if items is None:
+            items = self.snapshot()
+        lines = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self):
+        """Values of every metric, in a JSON-serializable form"""
+        return {metric.name: [[list(labels), value] for labels, value in metric.snapshot()] for metric in self.metrics}
+
+    def render(self, snapshots=None):
+        """Render this process's values, or the sum of the given snapshots"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if snapshots is None:
+                lines.extend(metric.render())
+            else:
+                totals = {}
+                for snapshot in snapshots:
+                    metric.merge(totals, snapshot.get(metric.name, []))
+                lines.extend(metric.render(list(totals.items())))
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from request start until the response body was sent", ("method", "route"))
+http_request_size = registry.histogram(
+    "http_request_size_bytes", "Request body size", ("route",), SIZE_BUCKETS)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size", ("route",), SIZE_BUCKETS)
+
+db_queries = registry.histogram(
+    "http_request_db_queries", "Database queries issued while handling a request", ("route",), COUNT_BUCKETS)
+db_request_time = registry.histogram(
+    "http_request_db_seconds", "Time spent in database queries per request", ("route",))
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Duration of individual database queries")
+
+upstream_requests = registry.counter(
+    "upstream_requests_total", "Upstream OpenAI HTTP requests", ("path", "status"))
+upstream_ttfb = registry.histogram(
+    "upstream_ttfb_seconds", "Time until upstream response headers arrived", ("path",))
+upstream_duration = registry.histogram(
+    "upstream_duration_seconds", "Time until the upstream response body was fully read", ("path",))
+upstream_request_size = registry.histogram(
+    "upstream_request_size_bytes", "Upstream request body size", ("path",), SIZE_BUCKETS)
+upstream_response_size = registry.histogram(
+    "upstream_response_size_bytes", "Upstream response body size", ("path",), SIZE_BUCKETS)
+
+# Per-request database counters, set by the middleware for the current request
+request_stats = contextvars.ContextVar("request_stats", default=None)
+
+def observe_request(method, route, status, duration, request_bytes, response_bytes, stats=None):
+    """Record one handled HTTP request"""
+    http_requests.inc(method, route, str(status))
+    http_request_duration.observe(duration, method, route)
+    http_request_size.observe(request_bytes, route)
+    http_response_size.observe(response_bytes, route)
+    if stats is not None:
+        db_queries.observe(stats["queries"], route)
+        db_request_time.observe(stats["seconds"], route)
+
+def _content_length(headers):
+    value = headers.get("content-length") if headers else None
+    return int(value) if value and str(value).isdigit() else 0
+
+class _ResponseBody:
+    """Response iterable that records metrics once it has been sent"""
+
+    def __init__(self, iterable, on_close):
+        self.iterable = iterable
+        self.on_close = on_close
+        self.bytes = 0
+
+    def __iter__(self):
+        for chunk in self.iterable:
+            self.bytes += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, "close"):
+                self.iterable.close()
+        finally:
+            self.on_close(self.bytes)
+
+class MetricsMiddleware:
+    """WSGI middleware timing every request until its body has been sent"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        stats = {"queries": 0, "seconds": 0.0}
+        token = request_stats.set(stats)
+        response = {"status": 500}
+
+        def capture_start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = headers
+            return start_response(status, headers, exc_info)
+
+        def finish(response_bytes):
+            # Flask stores the matched rule pattern, which keeps label cardinality bounded
+            route = environ.get("metrics.route", "unmatched")
+            observe_request(environ.get("REQUEST_METHOD", "GET"), route, response["status"],
+                            time.perf_counter() - start, _content_length({"content-length": environ.get("CONTENT_LENGTH")}),
+                            response_bytes, stats)
+            try:
+                request_stats.reset(token)
+            except ValueError:
+                pass
+
+        try:
+            iterable = self.wsgi_app(environ, capture_start_response)
+        except Exception:
+            finish(0)
+            raise
+        
+        # Files are returned as the server's file wrapper so it can use
+        # sendfile; wrapping them would hide that, so only hook close()
+        file_wrapper = environ.get("wsgi.file_wrapper")
+        if isinstance(file_wrapper, type) and isinstance(iterable, file_wrapper):
+            close = getattr(iterable, "close", None)
+            
+            def close_and_record():
+                try:
+                    if close is not None:
+                        close()
+                finally:
+                    finish(_content_length(dict((k.lower(), v) for k, v in response.get("headers", []))))
+            
+            iterable.close = close_and_record
+            return iterable
+        return _ResponseBody(iterable, finish)
+
+def init_app(app):
+    """Wrap a Flask app with the metrics middleware and record route patterns"""
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app)
+
+    @app.before_request
+    def record_route():
+        if request.url_rule is not None:
+            request.environ["metrics.route"] = request.url_rule.rule
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_query_duration.observe(elapsed)
+    stats = request_stats.get()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["seconds"] += elapsed
+
+_sqlalchemy_instrumented = False
+
+def instrument_sqlalchemy():
+    """Time every query on every engine"""
+    global _sqlalchemy_instrumented
+    if _sqlalchemy_instrumented:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _sqlalchemy_instrumented = True
+
+class _TimedStream:
+    """Wrap an httpx response stream to time and size the full body"""
+
+    def __init__(self, stream, path, start):
+        self.stream = stream
+        self.path = path
+        self.start = start
+        self.bytes = 0
+        self.finished = False
+
+    def _finish(self):
+        if not self.finished:
+            self.finished = True
+            upstream_duration.observe(time.perf_counter() - self.start, self.path)
+            upstream_response_size.observe(self.bytes, self.path)
+
+class _TimedSyncStream(_TimedStream, httpx.SyncByteStream):
+    def __iter__(self):
+        for chunk in self.stream:
+            self.bytes += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            self._finish()
+
+class _TimedAsyncStream(_TimedStream, httpx.AsyncByteStream):
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self.bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            self._finish()
+
+def _on_upstream_request(request):
+    request.extensions["metrics_start"] = time.perf_counter()
+    upstream_request_size.observe(_content_length(request.headers), request.url.path)
+
+def _on_upstream_response(response, stream_class=_TimedSyncStream):
+    path = response.request.url.path
+    start = response.request.extensions.get("metrics_start", time.perf_counter())
+    upstream_requests.inc(path, str(response.status_code))
+    upstream_ttfb.observe(time.perf_counter() - start, path)
+    response.stream = stream_class(response.stream, path, start)
+
+async def _on_upstream_request_async(request):
+    _on_upstream_request(request)
+
+async def _on_upstream_response_async(response):
+    _on_upstream_response(response, _TimedAsyncStream)
+
+def upstream_event_hooks(is_async=False):
+    """httpx event hooks recording upstream timings"""
+    if is_async:
+        return {"request": [_on_upstream_request_async], "response": [_on_upstream_response_async]}
+    return {"request": [_on_upstream_request], "response": [_on_upstream_response]}
+
+# Snapshot file of this process; renamed after a fork so workers don't share it
+_snapshot_file = {"pid": None, "path": None}
+
+def _snapshot_path():
+    if _snapshot_file["pid"] != os.getpid():
+        _snapshot_file["pid"] = os.getpid()
+        # A restarted worker may reuse a pid, so the name also gets a random part
+        _snapshot_file["path"] = os.path.join(METRICS_MULTIPROC_DIR, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json")
+    return _snapshot_file["path"]
+
+def write_snapshot():
+    """Write this process's values to the shared directory atomically"""
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=METRICS_MULTIPROC_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(tmp_path, _snapshot_path())
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def read_snapshots():
+    snapshots = []
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+def clear_snapshots():
+    """Remove snapshots left by a previous server run (call before workers start)"""
+    if METRICS_MULTIPROC_DIR:
+        for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json")):
+            os.remove(path)
+
+class MetricsFlusher(threading.Thread):
+    """Thread that writes this process's snapshot to the shared directory"""
+
+    def __init__(self, interval=METRICS_FLUSH_INTERVAL):
+        super().__init__(name="metrics-flusher", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                write_snapshot()
+            except Exception as e:
+                print(f"Metrics flush error: {str(e)}")
+
+    def stop(self):
+        self.stopped.set()
+
+running_flushers = []
+
+def start_metrics_flusher():
+    """Start the flusher thread for this process, once, when metrics are shared"""
+    if not running_flushers and METRICS_MULTIPROC_DIR and METRICS_FLUSH_INTERVAL > 0:
+        flusher = MetricsFlusher()
+        flusher.start()
+        running_flushers.append(flusher)
+    return running_flushers
+
+def render_metrics():
+    """This process's metrics, or every process's when METRICS_MULTIPROC_DIR is set"""
+    if not METRICS_MULTIPROC_DIR:
+        return registry.render()
+    # The scraped worker's own values are always current
+    write_snapshot()
+    return registry.render(read_snapshots())
@@ -3,45 +3,192 @@
 Shared OpenAI client utilities
 """
 
+import asyncio
 import os
-from openai import OpenAI
+import threading
+import weakref
+from collections import OrderedDict
+import httpx
+
+from utils.metrics import upstream_event_hooks
+
+# Optional alternative API endpoint (proxies, local stand-ins)
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+
+# HTTP connection pool settings shared by every client
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 100))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", 60))
+OPENAI_HTTP2 = os.environ.get("OPENAI_HTTP2", "false").lower() == "true"
+# Retries are handled by the upstream scheduler, so the SDK does not retry by default
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", 0))
+
+# Number of distinct API keys kept with a warm client
+OPENAI_MAX_CLIENT_KEYS = int(os.environ.get("OPENAI_MAX_CLIENT_KEYS", 8))
+
+# Per-call timeouts in seconds, by kind of upstream call
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", 5))
+UPSTREAM_TIMEOUTS = {
+    "chat": float(os.environ.get("OPENAI_TIMEOUT_CHAT", 30)),
+    "speech": float(os.environ.get("OPENAI_TIMEOUT_SPEECH", 30)),
+    "transcription": float(os.environ.get("OPENAI_TIMEOUT_TRANSCRIPTION", 120))
+}
+
+def upstream_timeout(kind):
+    """Timeout to pass to a single OpenAI call of the given kind"""
+    return httpx.Timeout(UPSTREAM_TIMEOUTS[kind], connect=OPENAI_CONNECT_TIMEOUT)
+
+def _http2_enabled():
+    if not OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("OPENAI_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+        return False
+
+# Close tasks of evicted async clients, kept referenced until they finish
+closing_tasks = set()
+
+def _close_http_client(http_client, loop):
+    """Close an evicted client's connection pool, on its event loop if async"""
+    def close_async():
+        task = loop.create_task(http_client.aclose())
+        closing_tasks.add(task)
+        task.add_done_callback(closing_tasks.discard)
+    
+    try:
+        if loop is None:
+            http_client.close()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(close_async)
+    except Exception as e:
+        print(f"Error closing evicted OpenAI client: {str(e)}")
+
+class OpenAIClientManager:
+    """Thread-safe pool of OpenAI clients keyed by API key"""
+
+    def __init__(self, max_keys=OPENAI_MAX_CLIENT_KEYS):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.clients = OrderedDict()
+        self.async_clients = OrderedDict()
+        # Connection pool of each client, closed when the client is evicted
+        self.http_clients = weakref.WeakKeyDictionary()
+        self.limits = httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+        )
+        self.http2 = _http2_enabled()
+
+    def _build(self, api_key, is_async):
+        # The SDK takes most of a second to import, so load it with the first client
+        from openai import AsyncOpenAI, OpenAI
+        
+        timeout = httpx.Timeout(max(UPSTREAM_TIMEOUTS.values()), connect=OPENAI_CONNECT_TIMEOUT)
+        if is_async:
+            http_client = httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=timeout,
+                                            event_hooks=upstream_event_hooks(is_async=True))
+            client = AsyncOpenAI(api_key=api_key, base_url=OPENAI_BASE_URL,
+                                 max_retries=OPENAI_MAX_RETRIES, http_client=http_client)
+            self.http_clients[client] = http_client
+            return client
+        http_client = httpx.Client(limits=self.limits, http2=self.http2, timeout=timeout,
+                                   event_hooks=upstream_event_hooks())
+        client = OpenAI(api_key=api_key, base_url=OPENAI_BASE_URL,
+                        max_retries=OPENAI_MAX_RETRIES, http_client=http_client)
+        self.http_clients[client] = http_client
+        return client
+
+    def get(self, api_key, is_async=False):
+        """Return the pooled client for an API key, creating it on first use"""
+        pool = self.async_clients if is_async else self.clients
+        with self.lock:
+            client = pool.get(api_key)
+            if client is not None:
+                pool.move_to_end(api_key)
+                return client
+            
+            client = self._build(api_key, is_async)
+            pool[api_key] = client
+            
+            # Least recently used keys are dropped from the pool; requests that
+            # still hold their client keep using it until they finish
+            while len(pool) > self.max_keys:
+                _, evicted = pool.popitem(last=False)
+                self._close_when_released(evicted, is_async)
+            return client
+
+    def _close_when_released(self, client, is_async):
+        """
+        Close an evicted client's connections once the last request holding
+        it lets go (the SDK's resources refer back to the client, so this
+        happens at the next garbage collection after that)
+        """
+        loop = None
+        if is_async:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+        weakref.finalize(client, _close_http_client, self.http_clients[client], loop)
+
+    def clients_for_shutdown(self):
+        """Remove and return every pooled async client"""
+        with self.lock:
+            clients = list(self.async_clients.values())
+            self.async_clients.clear()
+            return clients
+
+# Global client manager
+client_manager = OpenAIClientManager()
 
 # Global OpenAI API key storage
 openai_api_key = os.environ.get("OPENAI_API_KEY", "")
-
-# Global OpenAI client
-client = None
+api_key_lock = threading.Lock()
 
 def get_openai_client():
-    """Get or initialize the OpenAI client"""
-    global client, openai_api_key
+    """Get the pooled OpenAI client for the configured API key"""
+    api_key = openai_api_key
+    if not api_key:
+        return None
     
-    if openai_api_key and client is None:
-        try:
-            # Initialize client without any extra parameters that might cause issues
-            client = OpenAI(api_key=openai_api_key)
-        except Exception as e:
-            print(f"Error initializing OpenAI client: {str(e)}")
-            return None
+    try:
+        return client_manager.get(api_key)
+    except Exception as e:
+        print(f"Error initializing OpenAI client: {str(e)}")
+        return None
+
+def get_async_openai_client():
+    """Get the pooled async OpenAI client for the configured API key"""
+    api_key = openai_api_key
+    if not api_key:
+        return None
     
-    return client
+    try:
+        return client_manager.get(api_key, is_async=True)
+    except Exception as e:
+        print(f"Error initializing async OpenAI client: {str(e)}")
+        return None
 
 def set_api_key(key):
-    """Set the OpenAI API key and initialize client"""
-    global openai_api_key, client
-    
-    # Store the API key
-    openai_api_key = key.strip()
+    """Set the OpenAI API key and return its client"""
+    global openai_api_key
     
+    api_key = key.strip()
     try:
-        # Initialize the client with the new API key only
-        client = OpenAI(api_key=openai_api_key)
-        return client
+        # Clients for other keys stay pooled, so their warm connections survive
+        client = client_manager.get(api_key)
     except Exception as e:
         print(f"Error setting API key: {str(e)}")
         return None
+    
+    with api_key_lock:
+        openai_api_key = api_key
+    return client
 
 def is_api_key_configured():
     """Check if API key is configured"""
-    global openai_api_key
     return bool(openai_api_key)
@@ -0,0 +1,150 @@
+
+"""
+Pluggable password hashing run on a bounded process pool
+
+Hashing is CPU-bound by design. Running it in worker processes keeps a burst
+of logins from pinning the cores that serve the I/O-bound AI routes, and the
+pending-work limit turns overload into a fast 503 instead of a stalled worker.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Algorithm for new hashes: "bcrypt" or "werkzeug"
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "bcrypt")
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+# werkzeug method string, e.g. "scrypt" or "pbkdf2:sha256:600000"
+WERKZEUG_HASH_METHOD = os.environ.get("WERKZEUG_HASH_METHOD", "scrypt")
+
+# Web server processes on this host, each with its own hash pool (set by gunicorn.conf.py)
+WEB_WORKER_PROCESSES = max(int(os.environ.get("WEB_WORKER_PROCESSES", 1)), 1)
+
+# Worker processes for hashing per web process (0 hashes inline in the
+# request thread); by default all pools together use half the cores
+PASSWORD_HASH_WORKERS = int(os.environ.get(
+    "PASSWORD_HASH_WORKERS", max((os.cpu_count() or 2) // (2 * WEB_WORKER_PROCESSES), 1)
+))
+
+# Hashes allowed to wait for a worker before new requests are turned away (per web process)
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 16))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
+class PasswordHashBusyError(Exception):
+    """Raised when too many password hashes are already queued"""
+
+class BcryptHasher:
+    """bcrypt with a configurable cost factor"""
+    name = "bcrypt"
+
+    def __init__(self, rounds=BCRYPT_ROUNDS):
+        self.rounds = rounds
+
+    def hash(self, password):
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(self.rounds)).decode("ascii")
+
+    @staticmethod
+    def identifies(password_hash):
+        return password_hash.startswith(("$2a$", "$2b$", "$2y$"))
+
+    @staticmethod
+    def verify(password, password_hash):
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("ascii"))
+
+    def needs_rehash(self, password_hash):
+        # bcrypt hashes look like $2b$12$..., where 12 is the cost factor
+        return not self.identifies(password_hash) or int(password_hash.split("$")[2]) != self.rounds
+
+class WerkzeugHasher:
+    """werkzeug's scrypt/pbkdf2 hashes with a configurable method string"""
+    name = "werkzeug"
+
+    def __init__(self, method=WERKZEUG_HASH_METHOD):
+        self.method = method
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    @staticmethod
+    def identifies(password_hash):
+        return password_hash.startswith(("scrypt:", "pbkdf2:"))
+
+    @staticmethod
+    def verify(password, password_hash):
+        return check_password_hash(password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        if not self.identifies(password_hash):
+            return True
+        method = password_hash.split("$", 1)[0]
+        # A bare algorithm name ("scrypt") accepts werkzeug's default parameters
+        if ":" not in self.method:
+            return method.split(":", 1)[0] != self.method
+        return method != self.method
+
+HASHERS = {
+    "bcrypt": BcryptHasher,
+    "werkzeug": WerkzeugHasher
+}
+
+def get_hasher(name=PASSWORD_HASHER):
+    """Hasher used for new passwords"""
+    return HASHERS[name]()
+
+def _hash_in_worker(password):
+    return get_hasher().hash(password)
+
+def _verify_in_worker(password, password_hash):
+    for hasher in HASHERS.values():
+        if hasher.identifies(password_hash):
+            return hasher.verify(password, password_hash)
+    return False
+
+# Process pool, created on first use so forked web workers each get their own
+hash_pool = None
+hash_pool_lock = threading.Lock()
+pending_hashes = threading.BoundedSemaphore(max(PASSWORD_HASH_MAX_PENDING, 1))
+
+def _pool_context():
+    """
+    Start hash workers from a clean process rather than forking the web
+    worker, which holds threads, locks and open connections mid-use
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def _get_pool():
+    global hash_pool
+    with hash_pool_lock:
+        if hash_pool is None:
+            hash_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, mp_context=_pool_context())
+        return hash_pool
+
+def _run(fn, *args):
+    """Run a hashing function on the pool, or inline when the pool is disabled"""
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    
+    if not pending_hashes.acquire(timeout=PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise PasswordHashBusyError("Too many concurrent password checks, please retry")
+    try:
+        return _get_pool().submit(fn, *args).result()
+    finally:
+        pending_hashes.release()
+
+def hash_password(password):
+    """Hash a password with the configured hasher"""
+    return _run(_hash_in_worker, password)
+
+def verify_password(password, password_hash):
+    """Check a password against a hash from any supported hasher"""
+    return _run(_verify_in_worker, password, password_hash)
+
+def needs_rehash(password_hash):
+    """Whether a stored hash was made with a different hasher or cost"""
+    return get_hasher().needs_rehash(password_hash)
@@ -0,0 +1,209 @@
+
+"""
+Question audio synthesized ahead of scheduled interviews
+
+A scheduler thread scans interviews starting within the lookahead window and
+queues an idempotent job per interview. The job synthesizes the questions and
+fixed transition messages the interview page speaks, with the page's voice
+settings, through the regular TTS path at batch priority, and stores the audio
+per interview on disk. The page names the interview when it asks for these
+prompts, and the text-to-speech routes serve the stored files, so no TTS call
+is made while the candidate is waiting.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from models.interview import Interview
+from models.user import db
+from utils.job_queue import JobRetryLater, enqueue_job, job_handler
+from utils.openai_client import get_openai_client
+from utils.speech import speech_params, synthesize_speech
+from utils.tts_cache import speech_cache_key
+from utils.upstream_scheduler import UpstreamBusyError
+
+QUESTION_AUDIO_DIR = os.environ.get(
+    "QUESTION_AUDIO_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "question_audio")
+)
+
+# Interviews starting within this many hours are warmed up
+QUESTION_AUDIO_LOOKAHEAD_HOURS = int(os.environ.get("QUESTION_AUDIO_LOOKAHEAD_HOURS", 24))
+# Audio is deleted this many hours after the scheduled start, or once the interview is no longer pending
+QUESTION_AUDIO_RETENTION_HOURS = int(os.environ.get("QUESTION_AUDIO_RETENTION_HOURS", 12))
+QUESTION_AUDIO_SCAN_INTERVAL = int(os.environ.get("QUESTION_AUDIO_SCAN_INTERVAL", 300))
+
+# Re-synthesis on demand is allowed once per interval per interview
+QUESTION_AUDIO_FORCE_INTERVAL = int(os.environ.get("QUESTION_AUDIO_FORCE_INTERVAL", 600))
+
+# Questions spoken by the interview page (src/hooks/useInterviewQuestions.tsx)
+INTERVIEW_QUESTIONS = [
+    "Tell me a little about yourself and your background.",
+    "What interests you about this position?",
+    "What are your greatest strengths that make you suitable for this role?",
+    "Can you describe a challenging situation you faced at work and how you handled it?",
+    "Where do you see yourself professionally in five years?"
+]
+
+# Fixed messages spoken by the interview page between questions
+TRANSITION_MESSAGES = [
+    "Now let's move on to a coding challenge. Please switch to the coding tab to solve the problem.",
+    "Thank you for your time. The interview is now complete."
+]
+
+# Voice settings the interview page speaks prompts with (src/utils/speechUtils.ts)
+QUESTION_SPEECH_OPTIONS = {"model": "tts-1-hd", "voice": "nova", "speed": 1.0}
+
+def interview_prompts():
+    """Every text the interview page speaks that is known before the interview"""
+    return INTERVIEW_QUESTIONS + TRANSITION_MESSAGES
+
+def _audio_path(interview_id, text, options):
+    params = speech_params(options)
+    return os.path.join(QUESTION_AUDIO_DIR, str(int(interview_id)), f"{speech_cache_key(text, **params)}.audio")
+
+def get_question_audio(interview_id, text, options):
+    """Pre-synthesized audio for this interview, text and voice settings, or None"""
+    try:
+        with open(_audio_path(interview_id, text, options), "rb") as f:
+            return f.read()
+    except (FileNotFoundError, ValueError, TypeError):
+        return None
+
+def _store_audio(path, audio):
+    """Write audio atomically so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def delete_question_audio(interview_id):
+    shutil.rmtree(os.path.join(QUESTION_AUDIO_DIR, str(int(interview_id))), ignore_errors=True)
+
+def enqueue_question_audio(interview, options=None, force=False):
+    """
+    Queue warmup of an interview's question audio, once per scheduled time.
+    A forced rebuild is queued at most once per QUESTION_AUDIO_FORCE_INTERVAL;
+    repeated requests within the interval return the same job.
+    """
+    scheduled = interview.scheduled_at.isoformat() if interview.scheduled_at else "unscheduled"
+    idempotency_key = f"prewarm_question_audio:{interview.id}:{scheduled}"
+    if force:
+        window = int(datetime.utcnow().timestamp() // max(QUESTION_AUDIO_FORCE_INTERVAL, 1))
+        idempotency_key = f"{idempotency_key}:force:{window}"
+    return enqueue_job(
+        "prewarm_question_audio",
+        {"interview_id": interview.id, "options": options or QUESTION_SPEECH_OPTIONS, "force": force},
+        idempotency_key=idempotency_key,
+        owner_id=interview.employer_id
+    )
+
+@job_handler("prewarm_question_audio")
+def prewarm_question_audio(job):
+    """Synthesize and store the audio of every known prompt of an interview"""
+    payload = job.payload_data
+    interview = db.session.get(Interview, payload["interview_id"])
+    if interview is None:
+        raise ValueError(f"Interview {payload['interview_id']} not found")
+
+    client = get_openai_client()
+    if not client:
+        raise JobRetryLater("OpenAI API key not configured", delay=300)
+
+    # Batch priority keeps warmup behind live interview traffic; the TTS cache
+    # is skipped since these files are served from the store
+    options = {**payload.get("options", {}), "priority": "batch", "noCache": True}
+    prompts = interview_prompts()
+    synthesized = 0
+
+    for text in prompts:
+        path = _audio_path(interview.id, text, options)
+        # Files written by an earlier attempt are kept
+        if os.path.exists(path) and not payload.get("force"):
+            continue
+        try:
+            audio = synthesize_speech(client, text, options)
+        except UpstreamBusyError as e:
+            raise JobRetryLater(str(e), delay=max(60, int(e.retry_after)))
+        _store_audio(path, audio)
+        synthesized += 1
+
+    return {"interview_id": interview.id, "prompts": len(prompts), "synthesized": synthesized}
+
+def schedule_question_audio(now=None):
+    """Queue warmup for pending interviews starting within the lookahead window"""
+    now = now or datetime.utcnow()
+    upcoming = Interview.query.filter(
+        Interview.status == 'pending',
+        Interview.scheduled_at >= now,
+        Interview.scheduled_at < now + timedelta(hours=QUESTION_AUDIO_LOOKAHEAD_HOURS)
+    ).all()
+    for interview in upcoming:
+        enqueue_question_audio(interview)
+    return len(upcoming)
+
+def purge_question_audio(now=None):
+    """Delete stored audio of interviews that are over or no longer pending"""
+    if not os.path.isdir(QUESTION_AUDIO_DIR):
+        return 0
+    now = now or datetime.utcnow()
+    stored_ids = [int(name) for name in os.listdir(QUESTION_AUDIO_DIR) if name.isdigit()]
+    if not stored_ids:
+        return 0
+
+    cutoff = now - timedelta(hours=QUESTION_AUDIO_RETENTION_HOURS)
+    active = {
+        interview_id for interview_id, in db.session.query(Interview.id).filter(
+            Interview.id.in_(stored_ids),
+            Interview.status == 'pending',
+            db.or_(Interview.scheduled_at.is_(None), Interview.scheduled_at >= cutoff)
+        )
+    }
+    removed = 0
+    for interview_id in stored_ids:
+        if interview_id not in active:
+            delete_question_audio(interview_id)
+            removed += 1
+    return removed
+
+class QuestionAudioScheduler(threading.Thread):
+    """Thread that queues question audio warmup for upcoming interviews"""
+
+    def __init__(self, app, interval=QUESTION_AUDIO_SCAN_INTERVAL):
+        super().__init__(name="question-audio-scheduler", daemon=True)
+        self.app = app
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    schedule_question_audio()
+                    purge_question_audio()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Question audio scheduler error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self.stopped.set()
+
+running_schedulers = []
+
+def start_question_audio_scheduler(app):
+    """Start the scheduler thread for this process, once"""
+    if not running_schedulers and QUESTION_AUDIO_SCAN_INTERVAL > 0:
+        scheduler = QuestionAudioScheduler(app)
+        scheduler.start()
+        running_schedulers.append(scheduler)
+    return running_schedulers
@@ -0,0 +1,275 @@
+
+"""
+On-disk store for interview recordings
+
+Uploads arrive as resumable chunks that are appended straight to a partial
+file, never buffered in memory. On completion the file is hashed and moved to
+a content-addressed blob, so the same recording uploaded twice is stored once.
+Playback is served from the blob by the recordings routes with Range support.
+A sweeper thread removes abandoned uploads and, when a retention period is
+configured, old recordings.
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from models.user import db
+from models.interview import Interview
+from models.recording import Recording
+
+RECORDINGS_DIR = os.environ.get(
+    "RECORDINGS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "recordings")
+)
+
+# Largest recording and largest single chunk accepted
+RECORDING_MAX_BYTES = int(os.environ.get("RECORDING_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+RECORDING_MAX_CHUNK_BYTES = int(os.environ.get("RECORDING_MAX_CHUNK_BYTES", 64 * 1024 * 1024))
+
+# Completed recordings older than this are deleted (0 keeps them forever)
+RECORDING_RETENTION_DAYS = int(os.environ.get("RECORDING_RETENTION_DAYS", 0))
+# Unfinished uploads idle for longer than this are discarded
+RECORDING_UPLOAD_TTL_HOURS = int(os.environ.get("RECORDING_UPLOAD_TTL_HOURS", 24))
+RECORDING_SWEEP_INTERVAL = int(os.environ.get("RECORDING_SWEEP_INTERVAL", 3600))
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# Recordings are served with their upload's content type, so only audio and
+# video types (with parameters such as codecs) are accepted
+MEDIA_TYPE = re.compile(
+    r'^(audio|video)/[a-z0-9][a-z0-9.+-]*(\s*;\s*[a-z0-9-]+=("[a-z0-9.,= -]*"|[a-z0-9.,-]+))*$',
+    re.IGNORECASE
+)
+
+class RecordingError(Exception):
+    """Raised when a recording upload is rejected"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def is_media_type(content_type):
+    """Whether a content type is an audio or video type that is safe to serve"""
+    return bool(content_type) and len(content_type) <= 100 and MEDIA_TYPE.match(content_type) is not None
+
+def part_path(upload_id):
+    return os.path.join(RECORDINGS_DIR, "uploads", f"{upload_id}.part")
+
+def blob_path(sha256):
+    return os.path.join(RECORDINGS_DIR, "blobs", sha256[:2], sha256)
+
+def recording_path(recording):
+    """Path of the file holding a recording's current bytes"""
+    return blob_path(recording.sha256) if recording.status == "complete" else part_path(recording.upload_id)
+
+@contextmanager
+def _locked_part(upload_id):
+    """
+    Open an upload's partial file holding an exclusive lock on it. flock
+    works across worker processes, so only one chunk is written at a time
+    and completion can't move the file mid-write.
+    """
+    path = part_path(upload_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RecordingError("Another chunk for this upload is in progress", 409)
+        yield fd
+    finally:
+        os.close(fd)
+
+def _current_offset(upload_id):
+    try:
+        return os.path.getsize(part_path(upload_id))
+    except FileNotFoundError:
+        return 0
+
+def upload_offset(recording):
+    """
+    Bytes received for an upload. While uploading this is the size of the
+    partial file, which includes bytes written before a dropped connection
+    that never reached the database.
+    """
+    if recording.status != "uploading":
+        return recording.size
+    return _current_offset(recording.upload_id)
+
+def append_chunk(recording, offset, stream, length=None):
+    """
+    Append a chunk read from a stream at the given offset. The offset must
+    match the bytes already received; the new offset is returned. Bytes
+    written before a dropped connection are kept, so the client can resume
+    from the offset reported by the server.
+    """
+    if recording.status != "uploading":
+        raise RecordingError("Upload is already complete", 409)
+    if length is not None and length > RECORDING_MAX_CHUNK_BYTES:
+        raise RecordingError("Chunk too large", 413)
+
+    with _locked_part(recording.upload_id) as fd:
+        # Another worker may have completed the upload before the lock was taken
+        db.session.refresh(recording)
+        if recording.status != "uploading":
+            # Opening the file recreated it after it was moved to the blob store
+            os.remove(part_path(recording.upload_id))
+            raise RecordingError("Upload is already complete", 409)
+
+        # The size is read under the lock, so it can't change before the write
+        current = os.fstat(fd).st_size
+        if offset != current:
+            raise RecordingError(f"Offset mismatch, expected {current}", 409)
+
+        written = 0
+        while True:
+            chunk = stream.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            if written + len(chunk) > RECORDING_MAX_CHUNK_BYTES or current + written + len(chunk) > RECORDING_MAX_BYTES:
+                os.ftruncate(fd, current)
+                raise RecordingError("Recording too large", 413)
+            os.pwrite(fd, chunk, current + written)
+            written += len(chunk)
+
+        recording.size = current + written
+        db.session.commit()
+        return recording.size
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def complete_upload(recording):
+    """Hash the uploaded file, move it into the blob store and attach it to the interview"""
+    if recording.status == "complete":
+        return recording
+
+    path = part_path(recording.upload_id)
+    if not os.path.exists(path):
+        raise RecordingError("No data uploaded")
+    with _locked_part(recording.upload_id) as fd:
+        size = os.fstat(fd).st_size
+        if size == 0:
+            raise RecordingError("No data uploaded")
+        if recording.expected_size is not None and size != recording.expected_size:
+            raise RecordingError(f"Upload incomplete, received {size} of {recording.expected_size} bytes", 409)
+
+        sha256 = _hash_file(path)
+        target = blob_path(sha256)
+        if os.path.exists(target):
+            # Same content already stored
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+
+    recording.sha256 = sha256
+    recording.size = size
+    recording.status = "complete"
+    recording.completed_at = datetime.utcnow()
+    if recording.interview_id:
+        interview = db.session.get(Interview, recording.interview_id)
+        if interview:
+            interview.recording_url = recording.url
+    db.session.commit()
+    return recording
+
+def resolve_recording_path(recording_url):
+    """Local file for a /api/recordings/<id> URL, or None for other URLs"""
+    prefix = "/api/recordings/"
+    if not recording_url or not recording_url.startswith(prefix):
+        return None
+    recording_id = recording_url[len(prefix):].split("?")[0]
+    if not recording_id.isdigit():
+        return None
+
+    recording = db.session.get(Recording, int(recording_id))
+    if not recording or recording.status != "complete":
+        raise FileNotFoundError(f"Recording {recording_id} is not available")
+    return blob_path(recording.sha256)
+
+def delete_recording(recording):
+    """Delete a recording, and its blob once no other recording uses it"""
+    if recording.status == "complete":
+        shared = Recording.query.filter(Recording.sha256 == recording.sha256, Recording.id != recording.id).count()
+        if not shared:
+            try:
+                os.remove(blob_path(recording.sha256))
+            except FileNotFoundError:
+                pass
+        Interview.query.filter_by(recording_url=recording.url).update({"recording_url": None})
+    else:
+        try:
+            os.remove(part_path(recording.upload_id))
+        except FileNotFoundError:
+            pass
+    db.session.delete(recording)
+    db.session.commit()
+
+def sweep_recordings():
+    """Remove abandoned uploads and recordings past their retention period"""
+    now = datetime.utcnow()
+    removed = 0
+
+    stale = Recording.query.filter(
+        Recording.status == "uploading",
+        Recording.updated_at < now - timedelta(hours=RECORDING_UPLOAD_TTL_HOURS)
+    ).all()
+    for recording in stale:
+        delete_recording(recording)
+        removed += 1
+
+    if RECORDING_RETENTION_DAYS > 0:
+        expired = Recording.query.filter(
+            Recording.status == "complete",
+            Recording.completed_at < now - timedelta(days=RECORDING_RETENTION_DAYS)
+        ).all()
+        for recording in expired:
+            delete_recording(recording)
+            removed += 1
+    return removed
+
+class RecordingSweeper(threading.Thread):
+    """Thread that sweeps the recording store periodically"""
+
+    def __init__(self, app, interval=RECORDING_SWEEP_INTERVAL):
+        super().__init__(name="recording-sweeper", daemon=True)
+        self.app = app
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    removed = sweep_recordings()
+                    if removed:
+                        print(f"Recording sweeper removed {removed} recordings")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Recording sweeper error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self.stopped.set()
+
+running_sweepers = []
+
+def start_recording_sweeper(app):
+    """Start the sweeper thread for this process, once"""
+    if not running_sweepers and RECORDING_SWEEP_INTERVAL > 0:
+        sweeper = RecordingSweeper(app)
+        sweeper.start()
+        running_sweepers.append(sweeper)
+    return running_sweepers
@@ -0,0 +1,81 @@
+
+"""
+Exact-match cache for generated interviewer responses
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from utils.cache import LRUCache
+
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 3600))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+
+# Sampled (temperature > 0) responses are only cached when explicitly allowed
+RESPONSE_CACHE_ALLOW_SAMPLED = os.environ.get("RESPONSE_CACHE_ALLOW_SAMPLED", "false").lower() == "true"
+
+def normalize_text(text):
+    """Normalize case, whitespace and edge punctuation so trivial variants match"""
+    text = re.sub(r"\s+", " ", (text or "").casefold()).strip()
+    return text.strip(" .,!?;:'\"")
+
+def response_cache_key(params):
+    """Hash the normalized prompt messages and sampling settings"""
+    payload = json.dumps([
+        params["model"],
+        params["temperature"],
+        params["max_tokens"],
+        [[m["role"], normalize_text(m["content"])] for m in params["messages"]]
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """TTL and LRU bounded cache of chat completion text"""
+
+    def __init__(self, max_entries, ttl, allow_sampled=False):
+        self.entries = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.allow_sampled = allow_sampled
+        self.lock = threading.Lock()
+        self.bypasses = 0
+
+    def key_for(self, params, options):
+        """Cache key for a request, or None if it must go upstream"""
+        cacheable = params["temperature"] <= 0 or self.allow_sampled or options.get("cache") is True
+        if options.get("cache") is False or not cacheable:
+            with self.lock:
+                self.bypasses += 1
+            return None
+        return response_cache_key(params)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, response):
+        self.entries.set(key, response)
+
+    def stats(self):
+        """Return hit rate and eviction counters"""
+        stats = self.entries.stats()
+        lookups = stats["hits"] + stats["misses"]
+        with self.lock:
+            stats["bypasses"] = self.bypasses
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+# Global response cache, disabled unless RESPONSE_CACHE_ENABLED is set
+response_cache = ResponseCache(
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL, RESPONSE_CACHE_ALLOW_SAMPLED
+) if RESPONSE_CACHE_ENABLED else None
+
+def get_response_cache_stats():
+    """Return response cache counters, or None when caching is disabled"""
+    return response_cache.stats() if response_cache is not None else None
+
+def cached_response_key(params, options):
+    """Cache key for a generate-response request, or None if not cacheable"""
+    if response_cache is None:
+        return None
+    return response_cache.key_for(params, options)
@@ -0,0 +1,56 @@
+
+"""
+Sentence segmentation helpers for streamed AI text
+"""
+
+import re
+
+# Sentence terminator followed by optional closing quotes/brackets and whitespace
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\')\]]*\s+')
+
+# Common abbreviations that end with a period but don't end a sentence
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "vs.", "etc.", "e.g.", "i.e."}
+
+def _is_abbreviation(text):
+    """Check if text ends with a known abbreviation"""
+    words = text.rstrip().split()
+    return bool(words) and words[-1].lower() in ABBREVIATIONS
+
+def split_sentences(text):
+    """Split a block of text into a list of sentences"""
+    buffer = SentenceBuffer()
+    sentences = buffer.feed(text)
+    tail = buffer.flush()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+class SentenceBuffer:
+    """Accumulates streamed text and emits complete sentences as they appear"""
+
+    def __init__(self):
+        self.pending = ""
+
+    def feed(self, text):
+        """Add a text fragment and return any sentences it completed"""
+        self.pending += text
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_BOUNDARY.finditer(self.pending):
+            candidate = self.pending[start:match.end()]
+            if _is_abbreviation(candidate):
+                continue
+            sentence = candidate.strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+
+        self.pending = self.pending[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever text is left once the stream has ended"""
+        sentence = self.pending.strip()
+        self.pending = ""
+        return sentence or None
@@ -0,0 +1,118 @@
+
+"""
+Single-flight coalescing of identical in-flight upstream calls
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+def flight_key(*parts):
+    """Hash the parts of a request that determine its upstream result"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class _Call:
+    """An in-flight call shared by its leader and any followers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Runs one call per key at a time and shares its result with concurrent callers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.async_calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Call fn(), or wait for an identical call already in flight"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """Await fn(), or an identical call already in flight on this event loop"""
+        with self.lock:
+            future = self.async_calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.async_calls[key] = asyncio.get_running_loop().create_future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            return await asyncio.shield(future)
+        
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            with self.lock:
+                del self.async_calls[key]
+
+    def stats(self):
+        """Return in-flight, leader and coalesced counters"""
+        with self.lock:
+            return {
+                "in_flight": len(self.calls) + len(self.async_calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced
+            }
+
+# Global single-flight group for upstream OpenAI calls
+upstream_flights = SingleFlight()
+
+def coalesce(key, fn):
+    """Run fn() through the shared single-flight group"""
+    if not SINGLE_FLIGHT_ENABLED:
+        return fn()
+    return upstream_flights.do(key, fn)
+
+async def coalesce_async(key, fn):
+    """Await fn() through the shared single-flight group"""
+    if not SINGLE_FLIGHT_ENABLED:
+        return await fn()
+    return await upstream_flights.do_async(key, fn)
+
+def get_single_flight_stats():
+    """Return single-flight counters for the health endpoint"""
+    return upstream_flights.stats()
@@ -0,0 +1,124 @@
+
+"""
+Shared text-to-speech synthesis helpers
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.openai_client import upstream_timeout
+from utils.single_flight import coalesce, coalesce_async, flight_key
+from utils.tts_cache import speech_cache_key, tts_cache
+from utils.upstream_scheduler import resolve_priority, schedule, schedule_async
+
+# Bounded worker pool shared by all streaming TTS requests
+TTS_STREAM_WORKERS = int(os.environ.get("TTS_STREAM_WORKERS", 4))
+
+# Maximum number of sentences a single request may have in flight at once
+TTS_STREAM_WINDOW = int(os.environ.get("TTS_STREAM_WINDOW", 3))
+
+# Content types for the audio formats supported by OpenAI TTS
+AUDIO_MIME_TYPES = {
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg",
+    "aac": "audio/aac",
+    "flac": "audio/flac",
+    "wav": "audio/wav",
+    "pcm": "audio/L16"
+}
+
+# Formats whose per-sentence outputs still form one valid stream when
+# concatenated (wav, flac and ogg files each carry their own container header)
+STREAMABLE_FORMATS = ("mp3", "pcm")
+
+tts_executor = ThreadPoolExecutor(max_workers=TTS_STREAM_WORKERS, thread_name_prefix="tts")
+
+def speech_params(options):
+    """Resolve TTS parameters from request options"""
+    return {
+        "model": options.get("model", "tts-1-hd"),
+        "voice": options.get("voice", "nova"),  # Using nova for a more natural voice
+        "speed": options.get("speed", 1.0),
+        "response_format": options.get("format", "mp3")
+    }
+
+def _cache_key(text, params, options):
+    """Cache key for a synthesis request, or None when caching is off"""
+    if tts_cache is None or options.get("noCache"):
+        return None
+    return speech_cache_key(text, **params)
+
+def _request_params(params):
+    """Only send a response format when it differs from the API default"""
+    if params["response_format"] == "mp3":
+        return {k: v for k, v in params.items() if k != "response_format"}
+    return params
+
+def synthesize_speech(client, text, options):
+    """Synthesize a single piece of text and return the raw audio bytes"""
+    params = speech_params(options)
+    
+    # Identical text and voice settings always produce reusable audio
+    cache_key = _cache_key(text, params, options)
+    if cache_key is not None:
+        audio = tts_cache.get(cache_key)
+        if audio is not None:
+            return audio
+    
+    def fetch():
+        response = schedule(
+            lambda: client.audio.speech.create(input=text, timeout=upstream_timeout("speech"), **_request_params(params)),
+            params["model"], priority=resolve_priority(options.get("priority"))
+        )
+        if cache_key is not None:
+            tts_cache.set(cache_key, response.content)
+        return response.content
+    
+    # Concurrent requests for the same audio share one upstream call
+    return coalesce(flight_key("speech", text, params), fetch)
+
+async def synthesize_speech_async(client, text, options):
+    """Async variant of synthesize_speech for the ASGI entry point"""
+    params = speech_params(options)
+    
+    cache_key = _cache_key(text, params, options)
+    if cache_key is not None:
+        audio = tts_cache.get(cache_key)
+        if audio is not None:
+            return audio
+    
+    async def fetch():
+        response = await schedule_async(
+            lambda: client.audio.speech.create(input=text, timeout=upstream_timeout("speech"), **_request_params(params)),
+            params["model"], priority=resolve_priority(options.get("priority"))
+        )
+        if cache_key is not None:
+            tts_cache.set(cache_key, response.content)
+        return response.content
+    
+    return await coalesce_async(flight_key("speech", text, params), fetch)
+
+def iter_speech(client, sentences, options):
+    """Synthesize sentences concurrently and yield their audio in order"""
+    sentences = iter(sentences)
+    pending = deque()
+    
+    def submit_next():
+        sentence = next(sentences, None)
+        if sentence is None:
+            return False
+        pending.append(tts_executor.submit(synthesize_speech, client, sentence, options))
+        return True
+    
+    try:
+        while len(pending) < TTS_STREAM_WINDOW and submit_next():
+            pass
+        
+        while pending:
+            audio = pending.popleft().result()
+            submit_next()
+            yield audio
+    finally:
+        # Client went away or synthesis failed: drop work that hasn't started
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,23 @@
+
+"""
+Helpers for streaming HTTP responses
+"""
+
+import json
+from flask import Response, stream_with_context
+
+def sse_event(event, data):
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Wrap an event generator in a streaming text/event-stream response"""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
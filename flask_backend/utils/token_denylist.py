@@ -0,0 +1,175 @@
+
+"""
+Revocation list for JWTs
+
+Revoked token ids are persisted in the revoked_tokens table and mirrored in
+memory, so checking a token on each request needs no database query. A bloom
+filter sits in front of the in-memory map: most tokens were never revoked and
+are rejected by the filter after a few bit lookups. Other processes pick up
+revocations on the next periodic sync.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from models.user import db
+from models.revoked_token import RevokedToken
+
+# Seconds between pulls of revocations made by other processes
+JWT_DENYLIST_SYNC_INTERVAL = float(os.environ.get("JWT_DENYLIST_SYNC_INTERVAL", 5))
+# Expected number of live revoked tokens and the bloom filter false positive rate
+JWT_DENYLIST_CAPACITY = int(os.environ.get("JWT_DENYLIST_CAPACITY", 100000))
+JWT_DENYLIST_ERROR_RATE = float(os.environ.get("JWT_DENYLIST_ERROR_RATE", 0.001))
+# Seconds between deletions of revocations whose tokens have expired
+JWT_DENYLIST_PURGE_INTERVAL = float(os.environ.get("JWT_DENYLIST_PURGE_INTERVAL", 3600))
+
+class BloomFilter:
+    """Fixed-size bloom filter over string keys"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing: derive all probe positions from one digest
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+def _utc_timestamp(value):
+    """Convert a naive UTC datetime from the database to a timestamp"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+class TokenDenylist:
+    """In-memory revoked JTI map backed by the revoked_tokens table"""
+
+    def __init__(self, capacity=JWT_DENYLIST_CAPACITY, error_rate=JWT_DENYLIST_ERROR_RATE,
+                 sync_interval=JWT_DENYLIST_SYNC_INTERVAL):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        self.revoked = {}  # jti -> expiry timestamp
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.last_id = 0
+        self.last_sync = None
+        self.last_purge = time.monotonic()
+        self.filter_rejections = 0
+        self.false_positives = 0
+
+    def revoke(self, jti, expires_at, token_type="access", user_id=None):
+        """Persist a revocation and apply it to this process immediately"""
+        expires = datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None)
+        if not RevokedToken.query.filter_by(jti=jti).first():
+            db.session.add(RevokedToken(jti=jti, token_type=token_type, user_id=user_id, expires_at=expires))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A concurrent logout revoked the same token first
+                db.session.rollback()
+        self._add(jti, expires_at)
+
+    def is_revoked(self, jti):
+        """Check a token id without touching the database on the hot path"""
+        self._maybe_sync()
+
+        if jti not in self.bloom:
+            self.filter_rejections += 1
+            return False
+        if jti in self.revoked:
+            return True
+        self.false_positives += 1
+        return False
+
+    def _add(self, jti, expires_at):
+        with self.lock:
+            self.revoked[jti] = expires_at
+            self.bloom.add(jti)
+            if len(self.revoked) > self.bloom.capacity:
+                self._rebuild()
+
+    def _rebuild(self):
+        # Bloom filters can't delete, so drop expired ids by building a new one
+        now = time.time()
+        self.revoked = {jti: expiry for jti, expiry in self.revoked.items() if expiry > now}
+        bloom = BloomFilter(max(self.capacity, len(self.revoked) * 2), self.error_rate)
+        for jti in self.revoked:
+            bloom.add(jti)
+        self.bloom = bloom
+
+    def _maybe_sync(self):
+        now = time.monotonic()
+        if self.last_sync is not None and now - self.last_sync < self.sync_interval:
+            return
+
+        # Only one request per interval pays for the query
+        if not self.lock.acquire(blocking=False):
+            return
+        try:
+            self.last_sync = now
+            self._sync()
+        finally:
+            self.lock.release()
+
+    def _sync(self):
+        """Load revocations written since the last sync (by any process)"""
+        try:
+            rows = db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.id > self.last_id,
+                RevokedToken.expires_at > datetime.utcnow()
+            ).order_by(RevokedToken.id).all()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error syncing token denylist: {str(e)}")
+            return
+
+        expired = sum(1 for expiry in self.revoked.values() if expiry <= time.time())
+        for row_id, jti, expires_at in rows:
+            self.revoked[jti] = _utc_timestamp(expires_at)
+            self.bloom.add(jti)
+            self.last_id = row_id
+
+        if time.monotonic() - self.last_purge >= JWT_DENYLIST_PURGE_INTERVAL:
+            self.last_purge = time.monotonic()
+            try:
+                purge_expired_revocations()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error purging revoked tokens: {str(e)}")
+
+        if expired > self.bloom.capacity // 2 or len(self.revoked) > self.bloom.capacity:
+            self._rebuild()
+
+    def stats(self):
+        return {
+            "revoked": len(self.revoked),
+            "filter_rejections": self.filter_rejections,
+            "false_positives": self.false_positives
+        }
+
+def purge_expired_revocations():
+    """Delete revocations for tokens that have expired anyway"""
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    return deleted
+
+token_denylist = TokenDenylist()
+
+def get_token_denylist_stats():
+    return token_denylist.stats()
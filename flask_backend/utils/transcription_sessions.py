@@ -0,0 +1,314 @@
+
+"""
+Incremental transcription sessions for real-time interview answers
+
+Each chunk must be a self-contained audio file (for example one MediaRecorder
+started per chunk, not the timeslices of a single recording). When the chunks
+can be decoded here (numpy and ffmpeg), the end of each chunk is prepended to
+the next one so words cut at a boundary are heard in full, and the words
+repeated by that overlap are removed when the transcripts are merged.
+Otherwise chunks are transcribed as uploaded and only the text is merged.
+
+Session state, queued chunks and the overlap tail are kept on disk in
+TRANSCRIPTION_SESSIONS_DIR, so any worker process can take a chunk or finish
+a session. File locks keep state updates atomic and let one process at a
+time transcribe a session's chunks, in order.
+"""
+
+import fcntl
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from utils.audio_transcode import AUDIO_TRANSCODE_SAMPLE_RATE, TranscodeError
+from utils.audio_upload import copy_audio_file
+from utils.openai_client import get_openai_client, upstream_timeout
+from utils.upstream_scheduler import resolve_priority, schedule
+from utils.vad import decode_pcm, np, pcm_available, wav_file
+
+# Shared by every worker process that serves the session routes
+TRANSCRIPTION_SESSIONS_DIR = os.environ.get("TRANSCRIPTION_SESSIONS_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "transcription_sessions"
+)
+
+# Sessions idle for longer than this are discarded
+TRANSCRIPTION_SESSION_TTL = int(os.environ.get("TRANSCRIPTION_SESSION_TTL", 600))
+
+# Worker pool shared by all sessions in this process
+TRANSCRIPTION_WORKERS = int(os.environ.get("TRANSCRIPTION_WORKERS", 4))
+
+# Longest run of repeated words removed where overlapping chunks meet
+TRANSCRIPTION_OVERLAP_WORDS = int(os.environ.get("TRANSCRIPTION_OVERLAP_WORDS", 12))
+
+# Audio from the end of the previous chunk prepended to each chunk
+TRANSCRIPTION_OVERLAP_SECONDS = float(os.environ.get("TRANSCRIPTION_OVERLAP_SECONDS", 1.0))
+
+# Longest wait allowed when finishing a session
+TRANSCRIPTION_FINISH_MAX_TIMEOUT = float(os.environ.get("TRANSCRIPTION_FINISH_MAX_TIMEOUT", 60))
+
+# Amount of running transcript passed to Whisper as the prompt
+PROMPT_CONTEXT_CHARS = 800
+
+# How often finish() re-reads the state of a session drained by another process
+SESSION_POLL_INTERVAL = 0.05
+
+SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+transcription_executor = ThreadPoolExecutor(max_workers=TRANSCRIPTION_WORKERS, thread_name_prefix="transcribe")
+
+def _normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+def merge_transcripts(running, new_text, max_overlap=TRANSCRIPTION_OVERLAP_WORDS):
+    """Append new_text to running, dropping words repeated by the audio overlap"""
+    new_text = (new_text or "").strip()
+    if not running:
+        return new_text
+    if not new_text:
+        return running
+    
+    running_words = [_normalize_word(w) for w in running.split()[-max_overlap:]]
+    new_words = new_text.split()
+    new_normalized = [_normalize_word(w) for w in new_words]
+    
+    # Longest suffix of the running transcript that the new text starts with
+    for size in range(min(len(running_words), len(new_words)), 0, -1):
+        if running_words[-size:] == new_normalized[:size]:
+            new_words = new_words[size:]
+            break
+    
+    if not new_words:
+        return running
+    return f"{running} {' '.join(new_words)}"
+
+def _transcribe_chunk(client, audio_file, options, prompt):
+    """Run a single Whisper request for one audio chunk"""
+    try:
+        response = schedule(
+            lambda: client.audio.transcriptions.create(
+                file=audio_file,
+                model="whisper-1",
+                language=options.get("language"),
+                prompt=prompt or None,
+                temperature=options.get("temperature", 0.2),
+                timeout=upstream_timeout("transcription")
+            ),
+            "whisper-1", priority=resolve_priority(options.get("priority"))
+        )
+        return response.text
+    finally:
+        audio_file[1].close()
+
+def _with_overlap(audio_file, tail):
+    """
+    Decode a chunk and prepend the previous chunk's tail. Returns the file to
+    transcribe and the tail for the next chunk; chunks that can't be decoded
+    are sent as uploaded and reset the overlap.
+    """
+    if TRANSCRIPTION_OVERLAP_SECONDS <= 0 or not pcm_available():
+        return audio_file, None
+    
+    try:
+        samples = decode_pcm(audio_file)
+    except (TranscodeError, OSError) as e:
+        print(f"Transcription overlap skipped: {str(e)}")
+        audio_file[1].seek(0)
+        return audio_file, None
+    
+    if tail is not None:
+        samples = np.concatenate((tail, samples))
+    audio_file[1].close()
+    
+    tail = samples[-int(TRANSCRIPTION_OVERLAP_SECONDS * AUDIO_TRANSCODE_SAMPLE_RATE):]
+    return wav_file(samples, filename="chunk.wav"), tail
+
+class TranscriptionSession:
+    """Running transcript built from audio chunks transcribed in the background"""
+
+    def __init__(self, session_id):
+        self.id = session_id
+        self.dir = os.path.join(TRANSCRIPTION_SESSIONS_DIR, session_id)
+
+    def _path(self, *names):
+        return os.path.join(self.dir, *names)
+
+    def read_state(self):
+        """Current state; written atomically, so readers need no lock"""
+        with open(self._path("state.json")) as f:
+            return json.load(f)
+
+    def _write_state(self, state):
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path("state.json"))
+
+    @contextmanager
+    def _locked_state(self):
+        """Read, modify and write the state while holding the session's state lock"""
+        with open(self._path("state.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            state = self.read_state()
+            yield state
+            state["last_activity"] = time.time()
+            self._write_state(state)
+
+    def append(self, audio_file):
+        """Queue an audio chunk and start transcribing it in the background"""
+        filename, fileobj, content_type = audio_file
+        # The upload is closed with the request, before the chunk is transcribed
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._path("chunks"), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                fileobj.seek(0)
+                shutil.copyfileobj(fileobj, f)
+        finally:
+            fileobj.close()
+        
+        with self._locked_state() as state:
+            sequence = state["chunks_received"]
+            state["chunks_received"] += 1
+            state["chunks"][str(sequence)] = [filename, content_type]
+            os.replace(tmp_path, self._path("chunks", f"{sequence:06d}"))
+        
+        transcription_executor.submit(self.drain)
+        return sequence
+
+    def drain(self):
+        """
+        Transcribe queued chunks in order, unless another thread or process
+        already does. The holder of the drain lock checks for new chunks after
+        releasing it, so a chunk queued meanwhile is never left behind.
+        """
+        try:
+            while self._has_pending():
+                with open(self._path("drain.lock"), "a") as lock:
+                    try:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return
+                    while self._has_pending():
+                        self._transcribe_next()
+        except FileNotFoundError:
+            # Session closed while it was being transcribed
+            return
+        except Exception as e:
+            print(f"Transcription session error: {str(e)}")
+
+    def _has_pending(self):
+        state = self.read_state()
+        return state["chunks_transcribed"] < state["chunks_received"]
+
+    def _transcribe_next(self):
+        """Transcribe the oldest chunk; the caller holds the drain lock"""
+        state = self.read_state()
+        sequence = state["chunks_transcribed"]
+        filename, content_type = state["chunks"][str(sequence)]
+        prompt = f"{state['options'].get('prompt') or ''} {state['text']}".strip()[-PROMPT_CONTEXT_CHARS:]
+        chunk_path = self._path("chunks", f"{sequence:06d}")
+        overlap_path = self._path("overlap.npy")
+        
+        try:
+            overlap = np.load(overlap_path) if np is not None and os.path.exists(overlap_path) else None
+            audio_file, overlap = _with_overlap((filename, open(chunk_path, "rb"), content_type), overlap)
+            if overlap is not None:
+                with open(overlap_path, "wb") as f:
+                    np.save(f, overlap)
+            elif os.path.exists(overlap_path):
+                os.remove(overlap_path)
+            client = get_openai_client()
+            if not client:
+                raise RuntimeError("OpenAI client initialization failed")
+            text, error = _transcribe_chunk(client, audio_file, state["options"], prompt), None
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            print(f"Transcription session error: {str(e)}")
+            text, error = "", {"sequence": sequence, "error": str(e)}
+        
+        with self._locked_state() as state:
+            state["text"] = merge_transcripts(state["text"], text)
+            state["chunks_transcribed"] += 1
+            state["chunks"].pop(str(sequence), None)
+            if error is not None:
+                state["errors"].append(error)
+        os.remove(chunk_path)
+
+    def wait(self, timeout=None):
+        """Wait until every received chunk has been transcribed, by any process"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        # Picks up chunks left behind by a worker that exited mid-session
+        transcription_executor.submit(self.drain)
+        while self._has_pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(SESSION_POLL_INTERVAL)
+        return True
+
+    def close(self):
+        """Delete the session with any chunks that were never transcribed"""
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def is_expired(self):
+        try:
+            return time.time() - self.read_state()["last_activity"] > TRANSCRIPTION_SESSION_TTL
+        except (FileNotFoundError, ValueError):
+            return True
+
+    def to_dict(self):
+        """Convert session state to dictionary"""
+        state = self.read_state()
+        return {
+            "session_id": self.id,
+            "text": state["text"],
+            "chunks_received": state["chunks_received"],
+            "chunks_transcribed": state["chunks_transcribed"],
+            "done": state["chunks_transcribed"] == state["chunks_received"],
+            "errors": state["errors"]
+        }
+
+def _sweep_expired():
+    if not os.path.isdir(TRANSCRIPTION_SESSIONS_DIR):
+        return
+    for session_id in os.listdir(TRANSCRIPTION_SESSIONS_DIR):
+        session = TranscriptionSession(session_id)
+        if SESSION_ID.match(session_id) and session.is_expired():
+            session.close()
+
+def create_session(options=None):
+    """Open a new transcription session"""
+    _sweep_expired()
+    session = TranscriptionSession(uuid.uuid4().hex)
+    os.makedirs(session._path("chunks"))
+    session._write_state({
+        "options": options or {},
+        "text": "",
+        "chunks_received": 0,
+        "chunks_transcribed": 0,
+        "chunks": {},
+        "errors": [],
+        "last_activity": time.time()
+    })
+    return session
+
+def get_session(session_id):
+    """Look up an open session, or None if unknown or expired"""
+    if not SESSION_ID.match(session_id or ""):
+        return None
+    session = TranscriptionSession(session_id)
+    if session.is_expired():
+        session.close()
+        return None
+    return session
+
+def close_session(session_id):
+    """Delete a session"""
+    session = get_session(session_id)
+    if session is not None:
+        session.close()
+    return session
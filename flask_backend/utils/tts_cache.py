@@ -0,0 +1,158 @@
+
+"""
+Content-addressed cache for synthesized speech audio
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from utils.cache import LRUCache
+
+TTS_CACHE_ENABLED = os.environ.get("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_MEMORY_BYTES = int(os.environ.get("TTS_CACHE_MEMORY_BYTES", 32 * 1024 * 1024))
+TTS_CACHE_DIR = os.environ.get(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "tts")
+)
+TTS_CACHE_DISK_BYTES = int(os.environ.get("TTS_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+
+def speech_cache_key(text, model, voice, speed, response_format="mp3"):
+    """Hash the inputs that fully determine the synthesized audio"""
+    payload = json.dumps([text, model, voice, float(speed), response_format], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class DiskAudioCache:
+    """On-disk audio tier evicting least recently used files over a byte budget"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._scan())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _scan(self):
+        """List cached files as (mtime, path, size), oldest first"""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".audio") and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.path, stat.st_size))
+        files.sort()
+        return files
+
+    def get(self, key):
+        """Read cached audio and refresh its recency, or return None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            return None
+        
+        with self.lock:
+            self.hits += 1
+        return audio
+
+    def set(self, key, audio):
+        """Write audio atomically and evict old files over the budget"""
+        if len(audio) > self.max_bytes:
+            return
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        with self.lock:
+            self.total_bytes += len(audio)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Rescan so files written by other worker processes are accounted for
+        files = self._scan()
+        self.total_bytes = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        with self.lock:
+            return {
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+class TTSCache:
+    """Two-tier (memory, then disk) cache of synthesized speech"""
+
+    def __init__(self, memory_bytes, directory=None, disk_bytes=0):
+        self.memory = LRUCache(max_bytes=memory_bytes)
+        self.disk = DiskAudioCache(directory, disk_bytes) if directory and disk_bytes else None
+
+    def get(self, key):
+        """Return cached audio bytes, promoting disk hits into memory"""
+        audio = self.memory.get(key)
+        if audio is not None or self.disk is None:
+            return audio
+        
+        audio = self.disk.get(key)
+        if audio is not None:
+            self.memory.set(key, audio)
+        return audio
+
+    def set(self, key, audio):
+        """Store audio in both tiers"""
+        self.memory.set(key, audio)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, audio)
+            except OSError as e:
+                print(f"TTS cache write error: {str(e)}")
+
+    def stats(self):
+        """Return per-tier counters for the health endpoint"""
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None
+        }
+
+# Global TTS cache shared by all requests in this process
+tts_cache = None
+if TTS_CACHE_ENABLED:
+    try:
+        tts_cache = TTSCache(TTS_CACHE_MEMORY_BYTES, TTS_CACHE_DIR, TTS_CACHE_DISK_BYTES)
+    except OSError as e:
+        print(f"Error initializing TTS disk cache: {str(e)}")
+        tts_cache = TTSCache(TTS_CACHE_MEMORY_BYTES)
+
+def get_tts_cache_stats():
+    """Return TTS cache counters, or None when caching is disabled"""
+    return tts_cache.stats() if tts_cache is not None else None
@@ -0,0 +1,377 @@
+
+"""
+Rate-limit-aware scheduler for upstream OpenAI calls
+
+Every upstream call waits for per-model request and token budgets (token
+buckets), in priority order, before it is sent. Rate limit and transient
+errors are retried with jittered backoff, honoring any retry-after header.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import sys
+import time
+
+# Priority classes: live interview traffic preempts background work
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BATCH = 2
+
+PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "default": PRIORITY_DEFAULT,
+    "batch": PRIORITY_BATCH
+}
+PRIORITY_NAMES = {level: name for name, level in PRIORITIES.items()}
+
+# Budgets applied to models without an explicit entry (0 disables a limit)
+UPSTREAM_DEFAULT_RPM = int(os.environ.get("UPSTREAM_DEFAULT_RPM", 500))
+UPSTREAM_DEFAULT_TPM = int(os.environ.get("UPSTREAM_DEFAULT_TPM", 0))
+
+# Per-model budgets as JSON, e.g. {"gpt-4o-mini": {"rpm": 500, "tpm": 200000}}
+UPSTREAM_RATE_LIMITS = json.loads(os.environ.get("UPSTREAM_RATE_LIMITS") or "{}")
+
+# Budgets are for the whole deployment; every process enforces its own share.
+# gunicorn.conf.py exports its worker count as WEB_WORKER_PROCESSES
+UPSTREAM_BUDGET_PROCESSES = max(int(
+    os.environ.get("UPSTREAM_BUDGET_PROCESSES") or os.environ.get("WEB_WORKER_PROCESSES") or 1
+), 1)
+
+UPSTREAM_MAX_RETRIES = int(os.environ.get("UPSTREAM_MAX_RETRIES", 4))
+UPSTREAM_RETRY_BASE_DELAY = float(os.environ.get("UPSTREAM_RETRY_BASE_DELAY", 0.5))
+UPSTREAM_RETRY_MAX_DELAY = float(os.environ.get("UPSTREAM_RETRY_MAX_DELAY", 20))
+
+# Longest a request may wait in the queue before it is rejected with 429; kept
+# below the frontend's 15 second request timeout so nobody waits for a call
+# whose client already gave up
+UPSTREAM_QUEUE_TIMEOUT = float(os.environ.get("UPSTREAM_QUEUE_TIMEOUT", 10))
+# Batch work has no client waiting on it and may queue for longer
+UPSTREAM_BATCH_QUEUE_TIMEOUT = float(os.environ.get("UPSTREAM_BATCH_QUEUE_TIMEOUT", 120))
+
+class UpstreamBusyError(Exception):
+    """Raised when an upstream call could not be scheduled or kept hitting rate limits"""
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket refilled continuously up to its capacity"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount tokens are available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+class _Ticket:
+    """A queued request for upstream budget"""
+
+    def __init__(self, priority, sequence, model, tokens):
+        self.priority = priority
+        self.sequence = sequence
+        self.model = model
+        self.tokens = tokens
+        # Set for async waiters: the event loop and event that wake them
+        self.loop = None
+        self.event = None
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+class _ModelState:
+    """Budgets, wait queue and rate limit cool-down for one model"""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.queue = []
+        self.async_waiters = set()
+        self.blocked_until = 0.0
+
+def retry_after_seconds(error):
+    """Read the retry-after delay from an OpenAI error response, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+def _openai_module():
+    # Errors can only come from the SDK once a client has imported it
+    return sys.modules.get("openai")
+
+def is_rate_limit(error):
+    openai = _openai_module()
+    return openai is not None and isinstance(error, openai.RateLimitError)
+
+def is_retryable(error):
+    """Rate limits, server errors, timeouts and dropped connections are retried"""
+    openai = _openai_module()
+    if openai is None:
+        return False
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(UPSTREAM_RETRY_MAX_DELAY, UPSTREAM_RETRY_BASE_DELAY * 2 ** attempt))
+
+class UpstreamScheduler:
+    """Shared scheduler that admits upstream calls by model budget and priority"""
+
+    def __init__(self, limits=None, default_rpm=UPSTREAM_DEFAULT_RPM, default_tpm=UPSTREAM_DEFAULT_TPM,
+                 max_retries=UPSTREAM_MAX_RETRIES, queue_timeout=UPSTREAM_QUEUE_TIMEOUT,
+                 batch_queue_timeout=UPSTREAM_BATCH_QUEUE_TIMEOUT, processes=UPSTREAM_BUDGET_PROCESSES):
+        self.limits = limits or {}
+        self.processes = processes
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.batch_queue_timeout = batch_queue_timeout
+        self.condition = threading.Condition()
+        self.models = {}
+        self.sequence = itertools.count()
+        self.admitted = 0
+        self.retries = 0
+        self.rejected = 0
+        self.rate_limited = 0
+
+    def _state(self, model):
+        state = self.models.get(model)
+        if state is None:
+            limits = self.limits.get(model, {})
+            state = self.models[model] = _ModelState(
+                limits.get("rpm", self.default_rpm) / self.processes,
+                limits.get("tpm", self.default_tpm) / self.processes
+            )
+        return state
+
+    def _deadline(self, priority):
+        timeout = self.batch_queue_timeout if priority >= PRIORITY_BATCH else self.queue_timeout
+        return time.monotonic() + timeout
+
+    def _enqueue(self, model, tokens, priority):
+        ticket = _Ticket(priority, next(self.sequence), model, tokens)
+        heapq.heappush(self._state(model).queue, ticket)
+        return ticket
+
+    def _notify(self, model):
+        """Wake every waiter of a model: threads on the condition, async waiters through their loop"""
+        self.condition.notify_all()
+        for ticket in self._state(model).async_waiters:
+            ticket.loop.call_soon_threadsafe(ticket.event.set)
+
+    def _dequeue(self, ticket):
+        state = self._state(ticket.model)
+        state.async_waiters.discard(ticket)
+        if ticket in state.queue:
+            state.queue.remove(ticket)
+            heapq.heapify(state.queue)
+        self._notify(ticket.model)
+
+    def _poll(self, ticket, now):
+        """Admit ticket and return 0, or return seconds to wait (None: until notified)"""
+        state = self._state(ticket.model)
+        if state.queue[0] is not ticket:
+            return None
+        
+        wait = max(state.blocked_until - now, 0.0)
+        if state.requests is not None:
+            wait = max(wait, state.requests.wait_time(1, now))
+        if state.tokens is not None and ticket.tokens:
+            wait = max(wait, state.tokens.wait_time(ticket.tokens, now))
+        if wait > 0:
+            return wait
+        
+        if state.requests is not None:
+            state.requests.take(1)
+        if state.tokens is not None and ticket.tokens:
+            state.tokens.take(ticket.tokens)
+        heapq.heappop(state.queue)
+        state.async_waiters.discard(ticket)
+        self.admitted += 1
+        self._notify(ticket.model)
+        return 0
+
+    def _reject(self, ticket, wait):
+        self._dequeue(ticket)
+        self.rejected += 1
+        return UpstreamBusyError("Upstream is busy, please retry shortly", retry_after=wait or 1.0)
+
+    def acquire(self, model, tokens=0, priority=PRIORITY_DEFAULT, deadline=None):
+        """Block until the model's budget admits this call"""
+        deadline = deadline or self._deadline(priority)
+        with self.condition:
+            ticket = self._enqueue(model, tokens, priority)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._poll(ticket, now)
+                    if wait == 0:
+                        return
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise self._reject(ticket, wait)
+                    self.condition.wait(min(wait, remaining) if wait is not None else remaining)
+            except BaseException:
+                self._dequeue(ticket)
+                raise
+
+    async def acquire_async(self, model, tokens=0, priority=PRIORITY_DEFAULT, deadline=None):
+        """Wait without blocking the event loop until the model's budget admits this call"""
+        deadline = deadline or self._deadline(priority)
+        with self.condition:
+            ticket = self._enqueue(model, tokens, priority)
+            ticket.loop = asyncio.get_running_loop()
+            ticket.event = asyncio.Event()
+            self._state(model).async_waiters.add(ticket)
+        try:
+            while True:
+                with self.condition:
+                    now = time.monotonic()
+                    wait = self._poll(ticket, now)
+                    if wait == 0:
+                        return
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise self._reject(ticket, wait)
+                    # Cleared under the lock, so a change after this poll still wakes us
+                    ticket.event.clear()
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), min(wait, remaining) if wait is not None else remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self.condition:
+                self._dequeue(ticket)
+            raise
+
+    def _on_error(self, model, error, attempt, deadline):
+        """
+        Record a failed attempt and return the delay before retrying. Raises
+        UpstreamBusyError when the retry would not start before the deadline.
+        """
+        retry_after = retry_after_seconds(error)
+        with self.condition:
+            if is_rate_limit(error):
+                self.rate_limited += 1
+                # Hold back every queued call for this model, not just this one
+                if retry_after:
+                    state = self._state(model)
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+            if attempt >= self.max_retries or not is_retryable(error):
+                if is_rate_limit(error):
+                    raise UpstreamBusyError("Upstream rate limit exceeded", retry_after or 1.0) from error
+                return None
+            delay = retry_after if retry_after is not None else backoff_delay(attempt)
+            if delay >= deadline - time.monotonic():
+                # Sleeping would outlast the caller, so give up now
+                self.rejected += 1
+                raise UpstreamBusyError("Upstream is busy, please retry shortly", delay or 1.0) from error
+            self.retries += 1
+        return min(delay, UPSTREAM_RETRY_MAX_DELAY)
+
+    def call(self, fn, model, tokens=0, priority=PRIORITY_DEFAULT):
+        """
+        Run fn() once budget allows, retrying rate limits and transient errors.
+        Queueing and retries together stay within the priority's queue timeout.
+        """
+        deadline = self._deadline(priority)
+        for attempt in itertools.count():
+            self.acquire(model, tokens, priority, deadline)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._on_error(model, e, attempt, deadline)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def call_async(self, fn, model, tokens=0, priority=PRIORITY_DEFAULT):
+        """Async variant of call for coroutine functions"""
+        deadline = self._deadline(priority)
+        for attempt in itertools.count():
+            await self.acquire_async(model, tokens, priority, deadline)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._on_error(model, e, attempt, deadline)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        """Return queue depth per model and admission counters"""
+        with self.condition:
+            return {
+                "queued": {model: len(state.queue) for model, state in self.models.items() if state.queue},
+                "admitted": self.admitted,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "rejected": self.rejected
+            }
+
+# Global scheduler shared by every upstream OpenAI call in this process
+upstream_scheduler = UpstreamScheduler(UPSTREAM_RATE_LIMITS)
+
+def resolve_priority(value, authenticated=True):
+    """
+    Map a priority name from request options to a priority class. Only the
+    named levels are accepted; anything else means interactive, which is
+    reserved for authenticated callers (others get default priority)
+    """
+    priority = PRIORITIES.get(value, PRIORITY_INTERACTIVE) if isinstance(value, str) else PRIORITY_INTERACTIVE
+    if priority == PRIORITY_INTERACTIVE and not authenticated:
+        return PRIORITY_DEFAULT
+    return priority
+
+def limit_priority(options, authenticated):
+    """Copy of request options naming the priority this caller is allowed"""
+    return {**options, "priority": PRIORITY_NAMES[resolve_priority(options.get("priority"), authenticated)]}
+
+def estimate_chat_tokens(params):
+    """Rough token cost of a chat completion (about 4 characters per token)"""
+    prompt_chars = sum(len(m["content"] or "") for m in params["messages"])
+    return prompt_chars // 4 + params.get("max_tokens", 0)
+
+def schedule(fn, model, tokens=0, priority=PRIORITY_INTERACTIVE):
+    """Run an upstream call through the shared scheduler"""
+    return upstream_scheduler.call(fn, model, tokens, priority)
+
+async def schedule_async(fn, model, tokens=0, priority=PRIORITY_INTERACTIVE):
+    """Await an upstream call through the shared scheduler"""
+    return await upstream_scheduler.call_async(fn, model, tokens, priority)
+
+def get_scheduler_stats():
+    """Return scheduler counters for the health endpoint"""
+    return upstream_scheduler.stats()
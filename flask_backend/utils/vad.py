@@ -0,0 +1,282 @@
+
+"""
+Voice activity detection and segmented transcription
+
+Long answers contain long pauses that are paid for twice, once in upload size
+and once in Whisper processing time. Recordings are decoded to 16 kHz mono PCM
+with ffmpeg and classified frame by frame from short-time energy and
+zero-crossing rate with hysteresis. The speech segments are transcribed in
+parallel, and their timestamps are mapped back onto the original recording.
+
+The PCM is written to a temporary file and memory-mapped, and features are
+computed window by window, so an hour-long recording is never held in memory
+as float samples. Segments of batch work (scoring) are transcribed on their own
+pool so they never queue in front of a live answer.
+"""
+
+import io
+import os
+import subprocess
+import tempfile
+import wave
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from utils.audio_transcode import (
+    AUDIO_TRANSCODE_SAMPLE_RATE, AUDIO_TRANSCODE_TIMEOUT, TranscodeError,
+    ffmpeg_available, input_path, probe_duration, run_ffmpeg
+)
+from utils.openai_client import upstream_timeout
+from utils.upstream_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, schedule
+
+VAD_ENABLED = os.environ.get("VAD_ENABLED", "true").lower() == "true"
+
+# Recordings shorter than this are transcribed in one request
+VAD_MIN_DURATION = float(os.environ.get("VAD_MIN_DURATION", 30))
+# Skip segmentation when it would remove less than this share of the audio
+VAD_MIN_SILENCE_RATIO = float(os.environ.get("VAD_MIN_SILENCE_RATIO", 0.15))
+
+VAD_FRAME_MS = 30
+# Thresholds in dB above the estimated noise floor: speech starts above the
+# high one and only ends after falling below the low one (hysteresis)
+VAD_START_DB = float(os.environ.get("VAD_START_DB", 12))
+VAD_END_DB = float(os.environ.get("VAD_END_DB", 6))
+# Quiet frames with many zero crossings are unvoiced consonants, not silence
+VAD_ZCR_THRESHOLD = float(os.environ.get("VAD_ZCR_THRESHOLD", 0.25))
+
+VAD_HANGOVER_SECONDS = 0.3
+VAD_PADDING_SECONDS = 0.2
+VAD_MIN_SPEECH_SECONDS = 0.25
+# Pauses shorter than this stay inside a segment
+VAD_MERGE_GAP_SECONDS = float(os.environ.get("VAD_MERGE_GAP_SECONDS", 1.0))
+VAD_MAX_SEGMENT_SECONDS = float(os.environ.get("VAD_MAX_SEGMENT_SECONDS", 120))
+
+VAD_TRANSCRIBE_WORKERS = int(os.environ.get("VAD_TRANSCRIBE_WORKERS", 4))
+VAD_BATCH_TRANSCRIBE_WORKERS = int(os.environ.get("VAD_BATCH_TRANSCRIBE_WORKERS", 2))
+
+# Seconds of PCM converted to float at a time when computing features
+VAD_WINDOW_SECONDS = 60
+
+# Live answers and batch work (scoring) use separate pools
+vad_executor = ThreadPoolExecutor(max_workers=VAD_TRANSCRIBE_WORKERS, thread_name_prefix="vad")
+vad_batch_executor = ThreadPoolExecutor(max_workers=VAD_BATCH_TRANSCRIBE_WORKERS, thread_name_prefix="vad-batch")
+
+def pcm_available():
+    """Whether recordings can be decoded to PCM samples here"""
+    return np is not None and ffmpeg_available()
+
+def vad_available():
+    return VAD_ENABLED and pcm_available()
+
+def decode_pcm(audio_file, timeout=AUDIO_TRANSCODE_TIMEOUT):
+    """Decode an OpenAI file tuple to mono float32 samples at 16 kHz"""
+    filename, fileobj = audio_file[0], audio_file[1]
+    with input_path(fileobj, filename) as path:
+        result = run_ffmpeg([
+            "-i", path, "-vn", "-map", "0:a:0",
+            "-ac", "1", "-ar", str(AUDIO_TRANSCODE_SAMPLE_RATE),
+            "-f", "s16le", "pipe:1"
+        ], timeout=timeout, stdout=subprocess.PIPE)
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+@contextmanager
+def decoded_pcm(audio_file, timeout=AUDIO_TRANSCODE_TIMEOUT):
+    """
+    Decode an OpenAI file tuple to 16 kHz mono 16-bit PCM in a temporary file
+    and yield it memory-mapped, so long recordings are paged in as needed
+    """
+    filename, fileobj = audio_file[0], audio_file[1]
+    with tempfile.NamedTemporaryFile(suffix=".pcm") as pcm:
+        with input_path(fileobj, filename) as path:
+            run_ffmpeg([
+                "-i", path, "-vn", "-map", "0:a:0",
+                "-ac", "1", "-ar", str(AUDIO_TRANSCODE_SAMPLE_RATE),
+                "-f", "s16le", pcm.name
+            ], timeout=timeout)
+        if os.path.getsize(pcm.name) < 2:
+            yield np.zeros(0, dtype=np.int16)
+        else:
+            yield np.memmap(pcm.name, dtype=np.int16, mode="r")
+
+def as_float(samples):
+    """Float samples in [-1, 1] from 16-bit PCM; float input is returned as is"""
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    return samples
+
+def frame_features(samples, sample_rate=AUDIO_TRANSCODE_SAMPLE_RATE, frame_ms=VAD_FRAME_MS):
+    """Per-frame energy in dB and zero-crossing rate, one window of samples at a time"""
+    frame_length = int(sample_rate * frame_ms / 1000)
+    count = len(samples) // frame_length
+    window_frames = max(1, int(VAD_WINDOW_SECONDS * 1000 / frame_ms))
+
+    energy = np.empty(count, dtype=np.float32)
+    zcr = np.empty(count, dtype=np.float32)
+    # Windows hold whole frames, so the result doesn't depend on the window size
+    for first in range(0, count, window_frames):
+        last = min(first + window_frames, count)
+        frames = as_float(np.asarray(samples[first * frame_length:last * frame_length]))
+        frames = frames.reshape(last - first, frame_length)
+
+        energy[first:last] = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr[first:last] = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy, zcr
+
+def speech_frames(energy, zcr, frame_ms=VAD_FRAME_MS):
+    """Label frames as speech using energy and ZCR thresholds with hysteresis"""
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool)
+
+    noise_floor = np.percentile(energy, 10)
+    start_level = noise_floor + VAD_START_DB
+    end_level = noise_floor + VAD_END_DB
+    unvoiced = (energy > end_level) & (zcr > VAD_ZCR_THRESHOLD)
+    hangover_frames = max(1, int(VAD_HANGOVER_SECONDS * 1000 / frame_ms))
+
+    labels = np.zeros(len(energy), dtype=bool)
+    active = False
+    quiet = 0
+    for i in range(len(energy)):
+        if not active:
+            active = energy[i] > start_level
+            quiet = 0
+        elif energy[i] > end_level or unvoiced[i]:
+            quiet = 0
+        else:
+            quiet += 1
+            if quiet > hangover_frames:
+                active = False
+        labels[i] = active
+    return labels
+
+def speech_segments(samples, sample_rate=AUDIO_TRANSCODE_SAMPLE_RATE, frame_ms=VAD_FRAME_MS):
+    """Return (start, end) times in seconds of the speech in a recording"""
+    energy, zcr = frame_features(samples, sample_rate, frame_ms)
+    labels = speech_frames(energy, zcr, frame_ms)
+    frame_seconds = frame_ms / 1000
+    duration = len(samples) / sample_rate
+
+    # Runs of speech frames as (start, end) frame indexes
+    edges = np.diff(np.concatenate(([0], labels.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    segments = []
+    for start, end in zip(starts, ends):
+        start_time = max(0.0, float(start) * frame_seconds - VAD_PADDING_SECONDS)
+        end_time = min(duration, float(end) * frame_seconds + VAD_PADDING_SECONDS)
+        if segments and start_time - segments[-1][1] < VAD_MERGE_GAP_SECONDS:
+            segments[-1] = (segments[-1][0], end_time)
+        else:
+            segments.append((start_time, end_time))
+
+    segments = [(s, e) for s, e in segments if e - s >= VAD_MIN_SPEECH_SECONDS]
+
+    # Whisper uploads are capped, so cut very long stretches of speech
+    bounded = []
+    for start, end in segments:
+        while end - start > VAD_MAX_SEGMENT_SECONDS:
+            bounded.append((start, start + VAD_MAX_SEGMENT_SECONDS))
+            start += VAD_MAX_SEGMENT_SECONDS
+        bounded.append((start, end))
+    return bounded
+
+def wav_file(samples, sample_rate=AUDIO_TRANSCODE_SAMPLE_RATE, filename="segment.wav"):
+    """Encode float samples as an in-memory 16-bit WAV file tuple"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    buffer.seek(0)
+    return (filename, buffer, "audio/wav")
+
+def _transcribe_segment(client, samples, start, end, options, priority):
+    sample_rate = AUDIO_TRANSCODE_SAMPLE_RATE
+    segment_file = wav_file(as_float(np.asarray(samples[int(start * sample_rate):int(end * sample_rate)])))
+    response = schedule(
+        lambda: client.audio.transcriptions.create(
+            file=segment_file,
+            model="whisper-1",
+            language=options.get("language"),
+            prompt=options.get("prompt"),
+            temperature=options.get("temperature", 0.2),
+            response_format="verbose_json",
+            timeout=upstream_timeout("transcription")
+        ),
+        "whisper-1", priority=priority
+    )
+
+    # Shift Whisper's segment timestamps by the segment offset
+    parts = getattr(response, "segments", None) or []
+    if not parts:
+        return [{"start": round(start, 2), "end": round(end, 2), "text": response.text.strip()}]
+    return [
+        {"start": round(start + part.start, 2), "end": round(start + part.end, 2), "text": part.text.strip()}
+        for part in parts
+    ]
+
+def transcribe_with_vad(client, audio_file, options=None, priority=PRIORITY_INTERACTIVE,
+                        timeout=AUDIO_TRANSCODE_TIMEOUT):
+    """
+    Transcribe only the speech in a recording, one Whisper call per segment.
+    Returns {"text", "segments", "duration", "speech_duration"}, or None when
+    segmentation isn't available or wouldn't save enough to be worth it.
+    """
+    options = options or {}
+    if not vad_available() or options.get("vad") is False:
+        return None
+
+    # Short recordings are sent whole, so skip the decode when the container
+    # already says how long they are
+    if options.get("vad") is not True:
+        probed = probe_duration(audio_file, timeout)
+        audio_file[1].seek(0)
+        if probed is not None and probed < VAD_MIN_DURATION:
+            return None
+
+    with ExitStack() as stack:
+        try:
+            samples = stack.enter_context(decoded_pcm(audio_file, timeout))
+        except (TranscodeError, OSError) as e:
+            print(f"Voice activity detection skipped: {str(e)}")
+            return None
+        finally:
+            audio_file[1].seek(0)
+
+        duration = len(samples) / AUDIO_TRANSCODE_SAMPLE_RATE
+        if duration < VAD_MIN_DURATION and options.get("vad") is not True:
+            return None
+
+        segments = speech_segments(samples)
+        speech_duration = sum(end - start for start, end in segments)
+        if duration - speech_duration < duration * VAD_MIN_SILENCE_RATIO and options.get("vad") is not True:
+            return None
+
+        # Segments read the mapped PCM, so they finish before it is removed
+        executor = vad_batch_executor if priority >= PRIORITY_BATCH else vad_executor
+        futures = [
+            executor.submit(_transcribe_segment, client, samples, start, end, options, priority)
+            for start, end in segments
+        ]
+        # Stop spending upstream quota on the rest once one segment fails
+        _, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        if pending:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+        stitched = [part for future in futures for part in future.result()]
+
+    return {
+        "text": " ".join(part["text"] for part in stitched if part["text"]),
+        "segments": stitched,
+        "duration": round(duration, 2),
+        "speech_duration": round(speech_duration, 2)
+    }
@@ -73,8 +73,8 @@ const InterviewsSection = ({ upcomingInterviews, pastInterviews }: InterviewsSec
 
   // Handle joining interview
   const handleJoinInterview = (interview: Interview) => {
-    // Navigate to the interview page
-    navigate('/candidate/interview');
+    // Navigate to the interview page; the id lets it use question audio prepared for this interview
+    navigate(`/candidate/interview?interviewId=${interview.id}`);
   };
 
   // Handle rescheduling dialog
@@ -2,13 +2,12 @@
 import { useCallback } from "react";
 import { toast } from "@/hooks/use-toast";
 import { videoRecorder } from "@/utils/videoRecording";
-import { speakText } from "@/utils/speechUtils";
 
 /**
  * Custom hook for managing interview actions
  */
 export function useInterviewActions(
-  isSystemAudioOn: boolean,
+  speakPrompt: (text: string) => Promise<void>,
   questions: string[],
   isRecording: boolean,
   setIsRecording: (value: boolean) => void,
@@ -69,7 +68,7 @@ export function useInterviewActions(
     return new Promise<void>((resolve) => {
       setTimeout(() => {
         // Simulate AI speaking the question
-        speakText(questions[0], isSystemAudioOn)
+        speakPrompt(questions[0])
           .then(() => resolve())
           .catch(err => {
             console.error("Error during AI speech:", err);
@@ -77,7 +76,7 @@ export function useInterviewActions(
           });
       }, 500);
     });
-  }, [questions, isSystemAudioOn]);
+  }, [questions, speakPrompt]);
   
   return {
     endInterview,
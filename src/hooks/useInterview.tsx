@@ -37,7 +37,8 @@ const useInterview = (isSystemAudioOn: boolean) => {
     advanceToNextQuestion,
     questions,
     codingQuestions,
-    resetQuestions
+    resetQuestions,
+    speakPrompt
   } = useInterviewQuestions(isSystemAudioOn, addToTranscript);
   
   // Use AI response hook
@@ -111,7 +112,7 @@ const useInterview = (isSystemAudioOn: boolean) => {
     endInterview,
     speakFirstQuestion
   } = useInterviewActions(
-    isSystemAudioOn,
+    speakPrompt,
     questions,
     isRecording,
     setIsRecording,
@@ -2,7 +2,6 @@
 import { useState, useCallback, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { toast } from "@/hooks/use-toast";
-import { speakText } from "@/utils/speechUtils";
 import { useTranscript } from "@/hooks/useTranscript";
 import { useInterviewQuestions } from "@/hooks/useInterviewQuestions";
 import { useAIResponse } from "@/hooks/useAIResponse";
@@ -32,7 +31,8 @@ export const useInterviewLogic = (isSystemAudioOn: boolean) => {
     setShowCodingChallenge,
     advanceToNextQuestion,
     questions,
-    codingQuestions
+    codingQuestions,
+    speakPrompt
   } = useInterviewQuestions(isSystemAudioOn, addToTranscript);
   
   const { isProcessingAI, processWithOpenAI } = useAIResponse(
@@ -93,7 +93,7 @@ export const useInterviewLogic = (isSystemAudioOn: boolean) => {
         setCurrentCodingQuestion(codingQuestions[0]);
         
         // Simulate AI speaking the question
-        speakText(questions[0], isSystemAudioOn);
+        speakPrompt(questions[0]);
       }
     } catch (error) {
       console.error("Failed to start interview:", error);
@@ -107,7 +107,7 @@ export const useInterviewLogic = (isSystemAudioOn: boolean) => {
     questions, 
     codingQuestions,
     addToTranscript,
-    isSystemAudioOn,
+    speakPrompt,
     setCurrentQuestion,
     setCurrentCodingQuestion,
     startRecording
@@ -1,6 +1,7 @@
 
 import { useState, useCallback } from "react";
-import { speakText } from "@/utils/speechUtils";
+import { useSearchParams } from "react-router-dom";
+import { DEFAULT_SPEECH_OPTIONS, speakText } from "@/utils/speechUtils";
 
 /**
  * Hook for managing interview questions
@@ -9,7 +10,12 @@ const useInterviewQuestions = (
   isSystemAudioOn: boolean,
   addToTranscript: (speaker: string, text: string) => void
 ) => {
+  // Scheduled interview being taken, if opened from the dashboard
+  const [searchParams] = useSearchParams();
+  const interviewId = Number(searchParams.get("interviewId")) || undefined;
+
   // Interview questions - defined statically for this demo
+  // (the backend synthesizes their audio ahead of time, keep flask_backend/utils/question_audio.py in sync)
   const [questions] = useState([
     "Tell me a little about yourself and your background.",
     "What interests you about this position?",
@@ -31,6 +37,13 @@ const useInterviewQuestions = (
   const [currentCodingQuestion, setCurrentCodingQuestion] = useState("");
   const [showCodingChallenge, setShowCodingChallenge] = useState(false);
 
+  /**
+   * Speak a question or fixed message, using audio prepared for this interview when available
+   */
+  const speakPrompt = useCallback((text: string) => {
+    return speakText(text, isSystemAudioOn, { ...DEFAULT_SPEECH_OPTIONS, interviewId });
+  }, [isSystemAudioOn, interviewId]);
+
   /**
    * Advance to the next interview question
    */
@@ -47,14 +60,14 @@ const useInterviewQuestions = (
       addToTranscript("AI Interviewer", nextQuestion);
       
       // Speak the next question
-      speakText(nextQuestion, isSystemAudioOn);
+      speakPrompt(nextQuestion);
       
       // After the third question, introduce coding challenge
       if (currentIndex === 2) {
         setTimeout(() => {
           const codingIntro = "Now let's move on to a coding challenge. Please switch to the coding tab to solve the problem.";
           addToTranscript("AI Interviewer", codingIntro);
-          speakText(codingIntro, isSystemAudioOn);
+          speakPrompt(codingIntro);
           setShowCodingChallenge(true);
         }, 1500);
       }
@@ -62,9 +75,9 @@ const useInterviewQuestions = (
       // End of interview message
       const endMessage = "Thank you for your time. The interview is now complete.";
       addToTranscript("AI Interviewer", endMessage);
-      speakText(endMessage, isSystemAudioOn);
+      speakPrompt(endMessage);
     }
-  }, [currentQuestion, questions, addToTranscript, isSystemAudioOn]);
+  }, [currentQuestion, questions, addToTranscript, speakPrompt]);
   
   /**
    * Reset interview questions to initial state
@@ -85,7 +98,8 @@ const useInterviewQuestions = (
     showCodingChallenge,
     setShowCodingChallenge,
     advanceToNextQuestion,
-    resetQuestions
+    resetQuestions,
+    speakPrompt
   };
 };
 
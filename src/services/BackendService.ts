@@ -23,12 +23,14 @@ interface BackendConfig {
 export class BackendError extends Error {
   public status?: number;
   public attempt?: number;
+  public retryAfter?: number;
   
-  constructor(message: string, status?: number, attempt?: number) {
+  constructor(message: string, status?: number, attempt?: number, retryAfter?: number) {
     super(message);
     this.name = 'BackendError';
     this.status = status;
     this.attempt = attempt;
+    this.retryAfter = retryAfter;
     
     // This is needed for proper inheritance in TypeScript
     Object.setPrototypeOf(this, BackendError.prototype);
@@ -117,6 +119,12 @@ export class BackendService {
             throw new BackendError(errorMessage, response.status, attempt);
           }
           
+          // The backend is queueing upstream calls: wait as long as it asks
+          if (response.status === 429) {
+            const retryAfter = Number(response.headers.get('Retry-After'));
+            throw new BackendError(errorMessage, response.status, attempt, retryAfter > 0 ? retryAfter * 1000 : undefined);
+          }
+          
           throw new BackendError(errorMessage, response.status, attempt);
         }
         
@@ -143,8 +151,9 @@ export class BackendService {
         // Log the error and prepare for retry
         this.log(`Attempt ${attempt} failed for ${endpoint}:`, error);
         
-        // Wait before the next retry with exponential backoff
-        await new Promise(resolve => setTimeout(resolve, delay));
+        // Wait before the next retry with exponential backoff, or the server's Retry-After
+        const retryAfter = error instanceof BackendError ? error.retryAfter : undefined;
+        await new Promise(resolve => setTimeout(resolve, retryAfter ?? delay));
         
         // Increase the delay for the next attempt (with maximum limit)
         delay = Math.min(delay * this.retryConfig.backoffFactor, this.retryConfig.maxDelay);
@@ -215,10 +224,13 @@ export class BackendService {
    * @returns Promise with audio URL
    */
   async textToSpeech(text: string, options: any = {}): Promise<Blob> {
+    // Stored question audio is looked up by interview, outside the TTS options
+    const { interviewId, ...ttsOptions } = options;
+    
     const response = await this.makeRequest<{ audio_data: string }>(
       "text-to-speech", 
       "POST", 
-      { text, options }
+      { text, options: ttsOptions, interviewId }
     );
     
     // Convert base64 back to blob
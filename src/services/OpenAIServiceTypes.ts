@@ -29,4 +29,5 @@ export interface TextToSpeechOptions {
   pitch?: number;
   format?: string;
   model?: string;  // tts-1, tts-1-hd
+  interviewId?: number;  // serve audio synthesized ahead of this interview
 }
@@ -93,11 +93,14 @@ export class BackendService extends BaseApiClient {
    * @returns Promise with audio URL
    */
   async textToSpeech(text: string, options: any = {}): Promise<Blob> {
+    // Stored question audio is looked up by interview, outside the TTS options
+    const { interviewId, ...ttsOptions } = options;
+    
     try {
       const response = await this.makeRequest<{ audio_data: string }>(
         "text-to-speech", 
         "POST", 
-        { text, options }
+        { text, options: ttsOptions, interviewId }
       );
       
       // Convert base64 back to blob
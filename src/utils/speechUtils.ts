@@ -14,6 +14,12 @@ export const getIsSpeaking = (): boolean => {
   return isSpeaking;
 };
 
+/**
+ * Voice settings for interviewer speech. Question audio synthesized ahead of
+ * an interview uses the same settings (flask_backend/utils/question_audio.py)
+ */
+export const DEFAULT_SPEECH_OPTIONS: TextToSpeechOptions = { voice: "nova", speed: 1.0, model: "tts-1-hd" };
+
 /**
  * Speak text using OpenAI TTS
  * @param text Text to speak
@@ -23,7 +29,7 @@ export const getIsSpeaking = (): boolean => {
 export const speakText = async (
   text: string, 
   isSystemAudioOn: boolean,
-  options: TextToSpeechOptions = { voice: "nova", speed: 1.0, model: "tts-1-hd" }
+  options: TextToSpeechOptions = DEFAULT_SPEECH_OPTIONS
 ): Promise<void> => {
   if (!isSystemAudioOn || !text) return Promise.resolve();
   